@@ -0,0 +1,155 @@
+"""体重序列的向量化分析：单位换算、BMI 分级、滑动平均、指数平滑趋势、线性回归预测"""
+import math
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+from utils import BMI_MALE, BMI_FEMALE, KG2UNIT
+
+DAY = 86400
+ROLLING_DAYS = (7, 30) # 滑动平均的窗口（按时间，不按条数）
+HALFLIFE_DAYS = 7 # 指数平滑的半衰期
+REGRESSION_DAYS = 30 # 预测用最近多少天的记录做线性回归
+MAX_ETA_DAYS = 3650 # 比这更远的预测没有意义，当作达不到
+
+# ---------------- 逐列换算 ----------------
+def to_unit(kg, unit):
+	"""kg 数组 → 显示单位，保留 2 位小数（与 to_show_unit 一致）"""
+	return np.round(np.asarray(kg, dtype=float) * KG2UNIT[unit], 2)
+
+def bmi_classes(bmis, sex):
+	"""BMI 数组 → 等级数组；按各档下限 searchsorted，两档之间的空隙归入下面一档，缺失为“未知”"""
+	tbl = BMI_MALE if sex == '男' else BMI_FEMALE
+	lows = np.array([low for low, _, _ in tbl[1:]])
+	levels = np.array([level for _, _, level in tbl] + ['未知'])
+	b = np.asarray(bmis, dtype=float)
+	idx = np.searchsorted(lows, b, side='right')
+	idx[np.isnan(b)] = len(tbl)
+	return levels[idx]
+
+def rolling_mean(times, values, days):
+	"""每个点往前 days 天内（含本点）的平均值；前缀和 + searchsorted，一次算完"""
+	t = np.asarray(times)
+	cs = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+	j = np.searchsorted(t, t - days * DAY, side='left')
+	i = np.arange(1, len(t) + 1)
+	return (cs[i] - cs[j]) / (i - j)
+
+def ewma(times, values, halflife_days=HALFLIFE_DAYS):
+	"""按真实时间间隔衰减的指数加权平均，返回 (结果, 末尾状态)
+
+	第 i 点的值为 Σ e^{(t_j-t_i)/τ}·x_j / Σ e^{(t_j-t_i)/τ}（j ≤ i），分子分母都是前缀和；
+	指数按时间分段换基准，避免跨度很长时 e^x 溢出。末尾状态 (分子, 分母, 末条时间) 供 append 接着算。
+	"""
+	t = np.asarray(times, dtype=float)
+	x = np.asarray(values, dtype=float)
+	tau = halflife_days * DAY / math.log(2)
+	out = np.empty(len(t))
+	num = den = 0.0
+	ref = t[0] if len(t) else 0.0
+	bounds = np.searchsorted(t, np.arange(t[0], t[-1] + 500 * tau, 500 * tau)[1:]) if len(t) else []
+	a = 0
+	for b in [*bounds, len(t)]:
+		if b <= a:
+			continue
+		scale = math.exp((ref - t[a]) / tau)
+		ref = t[a]
+		e = np.exp((t[a:b] - ref) / tau)
+		n = num * scale + np.cumsum(e * x[a:b])
+		d = den * scale + np.cumsum(e)
+		out[a:b] = n / d
+		num, den = n[-1], d[-1]
+		a = b
+	if not len(t):
+		return out, (0.0, 0.0, 0.0)
+	last = math.exp((ref - t[-1]) / tau)
+	return out, (num * last, den * last, t[-1])
+
+# ---------------- 单人分析 ----------------
+class Analysis:
+	"""一个人物整条序列上的分析结果，各列与 Series 下标一一对应
+
+	新记录追加在末尾时 append() 只做 O(log n) 的增量更新；补录到中间返回 False，由调用方整体重算。
+	结果存在 array 里而不是 numpy 数组，追加不用整列复制。
+	"""
+
+	def __init__(self, series, halflife_days=HALFLIFE_DAYS, regression_days=REGRESSION_DAYS):
+		self.series = series
+		self.n = len(series)
+		self.tau = halflife_days * DAY / math.log(2)
+		self.regression_days = regression_days
+		t = np.array(series.times, dtype=np.int64)
+		w = np.array(series.weights, dtype=float)
+
+		self.cs = array('d', [0.0])
+		self.cs.frombytes(np.cumsum(w).tobytes())
+		self.rolling = {days: array('d', rolling_mean(t, w, days).tobytes()) for days in ROLLING_DAYS}
+		trend, self.ew = ewma(t, w, halflife_days)
+		self.trend = array('d', trend.tobytes())
+
+		# 回归只需要窗口内的 n、Σx、Σy、Σx²、Σxy，x 为距首条的天数
+		self.t0 = int(t[0]) if self.n else 0
+		self.j = int(np.searchsorted(t, t[-1] - regression_days * DAY)) if self.n else 0
+		x = (t[self.j:] - self.t0) / DAY
+		y = w[self.j:]
+		self.reg = [len(x), x.sum(), y.sum(), (x * x).sum(), (x * y).sum()]
+
+	def append(self, i):
+		"""第 i 条刚追加到序列末尾；不是末尾（补录）返回 False"""
+		s = self.series
+		if i != self.n or i != len(s) - 1:
+			return False
+		t, w = s.times[i], s.weights[i]
+		self.cs.append(self.cs[-1] + w)
+		for days, out in self.rolling.items():
+			j = bisect_left(s.times, t - days * DAY, 0, i + 1)
+			out.append((self.cs[i + 1] - self.cs[j]) / (i + 1 - j))
+
+		num, den, last = self.ew
+		d = math.exp((last - t) / self.tau) if i else 0.0
+		num, den = num * d + w, den * d + 1
+		self.ew = (num, den, t)
+		self.trend.append(num / den)
+
+		if not i:
+			self.t0 = t
+		self._reg_add(t, w, 1)
+		while s.times[self.j] < t - self.regression_days * DAY:
+			self._reg_add(s.times[self.j], s.weights[self.j], -1)
+			self.j += 1
+		self.n += 1
+		return True
+
+	def _reg_add(self, t, w, sign):
+		x = (t - self.t0) / DAY
+		r = self.reg
+		r[0] += sign
+		r[1] += sign * x
+		r[2] += sign * w
+		r[3] += sign * x * x
+		r[4] += sign * x * w
+
+	def slope(self):
+		"""最近 regression_days 天的线性趋势 (kg/天, 截距)，点数不够返回 None"""
+		n, sx, sy, sxx, sxy = self.reg
+		den = n * sxx - sx * sx
+		if n < 2 or den <= 1e-9:
+			return None
+		b = (n * sxy - sx * sy) / den
+		return b, (sy - b * sx) / n
+
+	def projection(self, target):
+		"""按回归直线推算达到 target(kg) 的时刻，返回 (末条时间, 拟合体重, 预计时间)；趋势背离或太远返回 None"""
+		fit = self.slope()
+		if fit is None or target is None:
+			return None
+		b, a = fit
+		t_now = self.series.times[self.n - 1]
+		w_now = a + b * (t_now - self.t0) / DAY
+		if b == 0:
+			return None
+		days = (target - w_now) / b
+		if not 0 <= days <= MAX_ETA_DAYS:
+			return None
+		return t_now, w_now, t_now + int(days * DAY)
@@ -0,0 +1,140 @@
+"""按人物的列式快照（.slma）：备份用，也让很长的历史冷启动时不必从库里逐行读
+
+文件布局（小端）：
+	头部    HEADER：魔数、格式版本、标志、条数、写入时的数据版本和记录 id 高水位、首条时间、体重基准、备注堆长度、姓名长度
+	姓名    UTF-8
+	时间    uint32 × (n-1)，相邻两条的秒数差（首条时间在头部）
+	体重    int16 或 int32 × n，单位克，减去基准；整段都放得进 int16 时用 int16（标志位 0）
+	备注偏移 uint32 × (n+1)，第 i 条是备注堆的 [offs[i], offs[i+1])
+	备注堆  UTF-8 拼接
+	校验    CRC32（前面所有字节）
+各段按 8 字节对齐。BMI 不存，读入时按人物现在的身高算。
+"""
+import os, mmap, zlib, struct, hashlib
+from array import array
+
+import numpy as np
+
+from series import Series
+from utils import BASE_DIR
+
+ARCHIVE_DIR = os.path.join(BASE_DIR, 'archive')
+MAGIC = b'SLMA'
+FORMAT = 1
+HEADER = struct.Struct('<4sHHIqqqiII')
+WIDE = 1 # 标志位：体重用 int32
+GRAMS = 1000 # 体重定点数的刻度：1 克
+ARCHIVE_MIN = 20000 # 从库里整段读入的序列达到这么多条才顺手写快照，短的直接读库就够快
+
+class ArchiveError(ValueError):
+	"""文件损坏、格式不对或不是这个人的"""
+
+def archive_path(person, node, out_dir=ARCHIVE_DIR):
+	"""node 为库的节点号（RecordStore.node），同名人物在不同的库里各有各的快照"""
+	key = hashlib.sha1(f'{node}\0{person}'.encode('utf-8')).hexdigest()[:20]
+	return os.path.join(out_dir, f'{key}.slma')
+
+def _pad(n):
+	return -n % 8
+
+# ---------------- 写 ----------------
+def write(path, person, s, version, last_id):
+	"""把序列 s 写成快照；version、last_id 为读出 s 时该人的数据版本和全库记录 id 高水位"""
+	n = len(s)
+	times = np.array(s.times, dtype=np.int64)
+	grams = np.rint(np.array(s.weights) * GRAMS).astype(np.int64)
+	base = int(grams.min()) if n else 0
+	grams -= base
+	flags = WIDE if n and grams.max() > np.iinfo(np.int16).max else 0
+	name = person.encode('utf-8')
+	heap = bytes(s.note_heap)
+	parts = [
+		HEADER.pack(MAGIC, FORMAT, flags, n, version, last_id, int(times[0]) if n else 0, base, len(heap), len(name)),
+		name,
+		np.diff(times).astype('<u4').tobytes(),
+		grams.astype('<i4' if flags & WIDE else '<i2').tobytes(),
+		np.array(s.note_offs, dtype='<u4').tobytes(),
+		heap,
+	]
+
+	tmp = f'{path}.{os.getpid()}.tmp'
+	crc = 0
+	with open(tmp, 'wb') as f:
+		for part in parts:
+			part += b'\0' * _pad(len(part))
+			crc = zlib.crc32(part, crc)
+			f.write(part)
+		f.write(struct.pack('<I', crc))
+	os.replace(tmp, path) # 不会留下写了一半的快照
+
+# ---------------- 读 ----------------
+def load(path, person=None, height=None):
+	"""mmap 读入快照，返回 (Series, 姓名, 数据版本, 记录 id 高水位)
+
+	各列在 numpy 里整段解码，再一次性拷进 Series 的数组（Series 之后还要追加，不能直接指向只读的映射）。
+	person 给出时核对姓名；height 为身高 cm，没有时 BMI 记为缺失。
+	"""
+	with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+		layout = _check(mm, person)
+		buf = memoryview(mm)
+		try:
+			return _decode(buf, layout, height)
+		finally:
+			buf.release() # 映射关闭前不能还有视图
+
+def _check(mm, person):
+	"""核对头部、长度和校验和，返回 (头部字段, 姓名, 各段起点)；出错时还没有留下任何视图"""
+	if len(mm) < HEADER.size + 4:
+		raise ArchiveError('文件太短')
+	head = HEADER.unpack_from(mm)
+	magic, fmt, flags, n, _, _, _, _, heap_len, name_len = head
+	if magic != MAGIC or fmt != FORMAT:
+		raise ArchiveError('不是 Slimlet 快照或版本不支持')
+	sizes = (name_len, 4 * max(n - 1, 0), (4 if flags & WIDE else 2) * n, 4 * (n + 1), heap_len)
+	starts = []
+	pos = HEADER.size
+	for size in sizes:
+		starts.append(pos)
+		pos += size + _pad(size)
+	if pos + 4 != len(mm):
+		raise ArchiveError('文件长度与头部不符')
+	with memoryview(mm) as view:
+		crc = zlib.crc32(view[:-4])
+	if crc != struct.unpack_from('<I', mm, pos)[0]:
+		raise ArchiveError('校验和不符，文件已损坏')
+	name = mm[starts[0]:starts[0] + name_len].decode('utf-8')
+	if person is not None and name != person:
+		raise ArchiveError(f'快照属于 {name}，不是 {person}')
+	if struct.unpack_from('<I', mm, starts[3] + 4 * n)[0] != heap_len:
+		raise ArchiveError('备注偏移与备注堆不符')
+	return head, name, starts
+
+def _decode(buf, layout, height):
+	head, name, (_, t_at, w_at, o_at, h_at) = layout
+	_, _, flags, n, version, last_id, t0, base, heap_len, _ = head
+	wtype = '<i4' if flags & WIDE else '<i2'
+	times = np.empty(n, dtype=np.int64)
+	if n:
+		times[0] = t0
+		np.cumsum(np.frombuffer(buf, '<u4', n - 1, t_at), out=times[1:])
+		times[1:] += t0
+	weights = (np.frombuffer(buf, wtype, n, w_at).astype(np.int64) + base) / GRAMS
+	if height:
+		bmis = np.round(weights / (height / 100) ** 2, 2) # 与 utils.calc_bmi 相同
+	else:
+		bmis = np.full(n, np.nan)
+
+	s = Series()
+	s.times.frombytes(times.view(np.uint8))
+	s.weights.frombytes(weights.view(np.uint8))
+	s.bmis.frombytes(bmis.view(np.uint8))
+	s.note_offs = array('I')
+	s.note_offs.frombytes(np.frombuffer(buf, '<u4', n + 1, o_at).astype(np.uint32).view(np.uint8))
+	s.note_heap = bytearray(buf[h_at:h_at + heap_len])
+	return s, name, version, last_id
+
+def read_rows(path):
+	"""逐条产出 (person, time, weight_kg, note)，供 importer 从快照恢复"""
+	s, person, _, _ = load(path)
+	for i in range(len(s)):
+		yield person, s.times[i], s.weights[i], s.note(i)
@@ -0,0 +1,103 @@
+"""合成历史数据：若干人物、每人若干年、每天若干条读数，部分带备注
+
+历史截止到生成当天零点（短维度的窗口终点是“现在”，过去的库画 7 天图是空的）；
+同一种子生成的库除了整体平移的时间以外完全相同。
+
+	python benchmarks/generate.py /tmp/bench.db --preset medium
+	python benchmarks/generate.py /tmp/huge.db --persons 200 --years 10 --per-day 24 --notes 0.05
+"""
+import os, sys, time, random, argparse, datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import RecordStore
+from utils import calc_bmi
+
+# 人数 × 年数 × 每天条数；huge 为 1750 万条，生成要几十分钟
+PRESETS = {
+	'small': dict(persons=3, years=1, per_day=4, notes=0.2),
+	'medium': dict(persons=20, years=5, per_day=6, notes=0.1),
+	'large': dict(persons=50, years=10, per_day=12, notes=0.05),
+	'huge': dict(persons=200, years=10, per_day=24, notes=0.05),
+}
+SOURCE = '合成'
+CHUNK = 50000 # 每批 insert_many 的行数
+NOTES = (
+	'早起空腹', '晚饭后', '跑步 5 公里', '聚餐吃多了', '睡得不好', '出差', '感冒', '游泳一小时',
+	'周末爬山', '没吃晚饭', '喝了很多水', '加班到很晚', '心情不错', '生理期', '少油少盐第一周',
+)
+
+def person_name(i):
+	return f'测试{i:03d}'
+
+def readings(rng, years, per_day, notes, end):
+	"""一个人的 (time, weight_kg, note)：时间等间隔加抖动、严格递增，体重做带回归的随机游走"""
+	step = 86400 / per_day
+	n = int(years * 365.25 * per_day)
+	start = end - n * step
+	times = (start + np.arange(n) * step + rng.uniform(0, step / 2, n)).astype(np.int64)
+	base = rng.uniform(50, 100)
+	walk = np.empty(n)
+	x = 0.0
+	noise = rng.normal(0, 0.4 / per_day ** 0.5, n)
+	for i in range(n):
+		x += noise[i] - x * 0.002 # 往基准回拉，长历史不会漂到离谱
+		walk[i] = x
+	weights = np.round(np.clip(base + walk * 5, 30, 250), 2)
+	has_note = rng.random(n) < notes
+	picks = rng.integers(0, len(NOTES), n)
+	for i in range(n):
+		yield int(times[i]), float(weights[i]), NOTES[picks[i]] if has_note[i] else ''
+
+def today():
+	"""本地时间今天零点的 epoch 秒"""
+	return int(datetime.datetime.combine(datetime.date.today(), datetime.time()).timestamp())
+
+def generate(path, persons, years, per_day, notes, seed=0, end=None, progress=None):
+	"""在 path 生成合成库（已存在则先删掉），返回写入的条数
+
+	end 为历史终点的 epoch 秒，默认今天零点；progress(第几个人, 累计条数) 每人回调一次。
+	"""
+	end = today() if end is None else end
+	for suffix in ('', '-wal', '-shm'):
+		if os.path.exists(path + suffix):
+			os.remove(path + suffix)
+	rng = np.random.default_rng(seed)
+	pick = random.Random(seed)
+	total = 0
+	with RecordStore(path) as store:
+		for i in range(persons):
+			name = person_name(i)
+			height = pick.randint(150, 190)
+			store.save_person(dict(name=name, height=height, sex=pick.choice('男女'), unit='kg', source=SOURCE))
+			batch = []
+			for t, w, note in readings(rng, years, per_day, notes, end):
+				batch.append((name, t, w, note, calc_bmi(w, height), SOURCE))
+				if len(batch) >= CHUNK:
+					total += store.insert_many(batch)
+					batch = []
+			total += store.insert_many(batch)
+			if progress:
+				progress(i + 1, total)
+	return total
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='生成基准测试用的合成库')
+	parser.add_argument('path', help='输出的数据库文件（已存在会被覆盖）')
+	parser.add_argument('--preset', choices=list(PRESETS), default='medium')
+	parser.add_argument('--persons', type=int, help='人数（覆盖预设）')
+	parser.add_argument('--years', type=float, help='每人多少年历史')
+	parser.add_argument('--per-day', type=float, help='每天多少条读数')
+	parser.add_argument('--notes', type=float, help='带备注的比例 0~1')
+	parser.add_argument('--seed', type=int, default=0)
+	args = parser.parse_args(argv)
+	params = {k: getattr(args, k) if getattr(args, k) is not None else v for k, v in PRESETS[args.preset].items()}
+
+	t0 = time.perf_counter()
+	total = generate(args.path, seed=args.seed, progress=lambda i, n: print(f'\r{i}/{params["persons"]} 人，{n} 条', end='', flush=True), **params)
+	print(f'\n写入 {total} 条，{time.perf_counter() - t0:.1f} 秒')
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,336 @@
+"""性能基准：在合成库上无界面（Agg 后端）地给各条热路径计时，结果写成 JSON，可以和别的提交的结果比较
+
+	python benchmarks/run.py --preset small --out base.json
+	git checkout 其他提交
+	python benchmarks/run.py --preset small --baseline base.json --threshold 0.2 --threshold-for 'draw_chart/*=0.5'
+有项目比基准慢了超过阈值时退出码为 1。
+
+合成库按预设、种子和日期缓存在临时目录（--regen 重新生成），每次跑都先复制一份，
+补录、导入只改副本。界面里的两条路径没有 Tk 也能测到它们的核心：
+	update_scope_buttons  各人的数据跨度 → 可用维度（按钮显隐本身只是几个 grid 调用）
+	on_hover              Frame.hit 像素 → 最近点的查找
+cold_startup 为子进程从启动解释器、导入、开库读人物到渲染线程交回第一帧的墙钟时间，不含建窗口。
+"""
+import os, sys, csv, json, time, shutil, fnmatch, logging, sqlite3, warnings, tempfile, platform, argparse, datetime, subprocess, statistics
+
+os.environ['MPLBACKEND'] = 'Agg'
+# 没装中文字体的机器上每画一次都要报一遍缺字，刷屏且与计时无关
+logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+warnings.filterwarnings('ignore', 'Glyph .* missing from font')
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from generate import PRESETS, SOURCE, generate, person_name
+
+FORMAT = 1 # 结果 JSON 的格式版本
+SIZE = (960, 480) # 画布像素，界面窗口铺满时大致这么大
+THRESHOLD = 0.2 # 比基准慢 20% 以上算回退
+GROUPS = ('fetch', 'scopes', 'draw', 'hover', 'add', 'import', 'startup')
+
+# ---------------- 计时 ----------------
+def measure(fn, repeat, setup=None, warmup=0):
+	"""跑 warmup + repeat 次 fn(setup())，返回后 repeat 次的耗时（秒）；setup 不计时"""
+	times = []
+	for i in range(warmup + repeat):
+		arg = setup() if setup else None
+		t0 = time.perf_counter()
+		fn(arg)
+		if i >= warmup:
+			times.append(time.perf_counter() - t0)
+	return times
+
+def summarize(times, per=1):
+	"""耗时列表 → 毫秒统计；per 为一次计时里做了多少次操作，给出的是单次的"""
+	ms = [t * 1000 / per for t in times]
+	return {'min': min(ms), 'median': statistics.median(ms), 'mean': statistics.fmean(ms), 'runs': len(ms), 'ops': per}
+
+def wait(renderer, gen, timeout=120):
+	"""等渲染线程交回编号为 gen 的帧；里程碑、外部改动等其他结果跳过，出错就抛出"""
+	while True:
+		got, out = renderer.results.get(timeout=timeout)
+		if isinstance(out, Exception):
+			raise out
+		if got == gen:
+			return out
+
+# ---------------- 各项 ----------------
+def bench_fetch(ctx):
+	"""整段读一个人：库里逐行读、读成 Series、从快照读"""
+	from store import RecordStore
+	from series import Series, SeriesCache
+	import archive
+	name = ctx.name
+	with RecordStore(ctx.db) as store:
+		yield 'fetch_records', summarize(measure(lambda _: store.fetch(name), ctx.repeat, warmup=1))
+		yield 'series_load', summarize(measure(lambda _: SeriesCache(store).get(name), ctx.repeat))
+		path = os.path.join(ctx.work, 'fetch.slma')
+		archive.write(path, name, Series.from_rows(store.fetch(name)), store.person_version(name), store.last_id())
+		height = store.person(name)['height']
+		yield 'archive_load', summarize(measure(lambda _: archive.load(path, name, height), ctx.repeat, warmup=1))
+
+def bench_scopes(ctx):
+	"""所有人的可用维度，序列都没缓存（界面切人物、启动时的情形）"""
+	from store import RecordStore
+	from series import SeriesCache
+	from utils import available_scopes
+	with RecordStore(ctx.db) as store:
+		names = [p['name'] for p in store.persons()]
+		def run(cache):
+			for name in names:
+				available_scopes(cache.span(name))
+		yield 'update_scope_buttons', summarize(measure(run, ctx.repeat, setup=lambda: SeriesCache(store), warmup=1), len(names))
+
+def bench_draw(ctx):
+	"""每个维度整张重画一次（先扔掉帧缓存），序列已在缓存里；顺带留下各维度的帧给 hover 用"""
+	from utils import available_scopes
+	r = ctx.renderer
+	person = ctx.person
+	wait(r, r.request(person, '全部', ctx.size)) # 读入序列、建画布
+	for scope in available_scopes(ctx.span):
+		frames = []
+		def run(_):
+			frames.append(wait(r, r.request(person, scope, ctx.size)))
+		yield f'draw_chart/{scope}', summarize(measure(run, ctx.repeat, setup=lambda: r.call(r.frames.drop, person['name']), warmup=1))
+		ctx.frames[scope] = frames[-1]
+
+def bench_hover(ctx):
+	"""鼠标从绘图区左边扫到右边，每个像素找一次最近点"""
+	if not ctx.frames:
+		for _ in bench_draw(ctx):
+			pass
+	for scope, frame in ctx.frames.items():
+		left, top, right, bottom = frame.plot_box
+		y = (top + bottom) / 2
+		xs = range(int(left), int(right) + 1)
+		def run(_):
+			for x in xs:
+				frame.hit(x, y)
+		yield f'on_hover/{scope}', summarize(measure(run, ctx.repeat, warmup=1), len(xs))
+
+def bench_add(ctx):
+	"""补录一条并等到画好的帧（追加快路径：上一帧是同一人同一维度）"""
+	from utils import calc_bmi
+	r = ctx.renderer
+	person = ctx.person
+	wait(r, r.request(person, '7天', ctx.size))
+	t = [max(int(time.time()), ctx.span[1]) + 1]
+	def run(_):
+		t[0] += 60
+		r.call(r.add, person['name'], t[0], 70.0, '', calc_bmi(70.0, person['height']), SOURCE)
+		wait(r, r.request(person, '7天', ctx.size))
+	yield 'add_record', summarize(measure(run, ctx.repeat, warmup=1))
+
+def bench_import(ctx):
+	"""从 CSV 导入一个新人物的整段历史（每次换一个新人物，不会因为查重而跳过）"""
+	from store import RecordStore
+	from importer import import_file
+	path = os.path.join(ctx.work, 'import.csv')
+	with RecordStore(ctx.db) as store, open(path, 'w', newline='', encoding='utf-8') as f:
+		rows = store.fetch(ctx.name)
+		out = csv.writer(f)
+		out.writerow(['time', 'weight', 'note'])
+		for t, w, note, _ in rows:
+			out.writerow([datetime.datetime.fromtimestamp(t).strftime('%Y-%m-%d %H:%M:%S'), w, note])
+		heights = {}
+		def setup():
+			name = f'导入{len(heights):03d}'
+			store.save_person(dict(name=name, height=170, sex='男', unit='kg', source=SOURCE))
+			heights[name] = 170
+			return name
+		yield 'bulk_import', summarize(measure(lambda name: import_file(store, path, name, heights), ctx.repeat, setup=setup), len(rows))
+
+def bench_startup(ctx):
+	"""子进程冷启动到第一帧；先跑一次不计时，长历史的快照已经写好（与用户第二次打开时一样）"""
+	cmd = [sys.executable, os.path.abspath(__file__), '--cold-child', ctx.db, '--archive-dir', os.path.join(ctx.work, 'archive'), '--size', f'{ctx.size[0]}x{ctx.size[1]}']
+	yield 'cold_startup', summarize(measure(lambda _: subprocess.run(cmd, check=True), ctx.repeat, warmup=1))
+
+BENCHES = dict(zip(GROUPS, (bench_fetch, bench_scopes, bench_draw, bench_hover, bench_add, bench_import, bench_startup)))
+
+def cold_child(db, archive_dir, size):
+	"""冷启动子进程：按界面启动的顺序开库、读人物、起渲染线程、要默认维度的第一帧"""
+	from store import RecordStore
+	from utils import load_persons
+	with RecordStore(db) as store:
+		person = load_persons(store)[0]
+	from render import ChartRenderer
+	r = ChartRenderer(db, archive_dir=archive_dir)
+	wait(r, r.request(person, '7天', size, select=True))
+	r.close()
+
+# ---------------- 运行 ----------------
+class Context:
+	"""各项共用的状态：库副本、临时目录、渲染线程和 draw 留下的帧"""
+
+	def __init__(self, db, work, repeat, size):
+		from store import RecordStore
+		self.db = db
+		self.work = work
+		self.repeat = repeat
+		self.size = size
+		self.name = person_name(0)
+		with RecordStore(db) as store:
+			self.person = store.person(self.name)
+			self.span = store.span(self.name)
+		self.frames = {}
+		self._renderer = None
+
+	@property
+	def renderer(self):
+		if self._renderer is None:
+			from render import ChartRenderer
+			self._renderer = ChartRenderer(self.db, archive_dir=None) # 不读写快照，量的是库这条路径
+		return self._renderer
+
+	def close(self):
+		if self._renderer:
+			self._renderer.close()
+
+def dataset(params, seed, regen=False):
+	"""按参数生成（或复用缓存的）合成库，返回路径；换了日期就重新生成，顺手删掉旧的"""
+	key = '-'.join(f'{k}{v}' for k, v in sorted(params.items()))
+	prefix = f'slimlet-bench-{key}-s{seed}-'
+	tmp = tempfile.gettempdir()
+	path = os.path.join(tmp, f'{prefix}{datetime.date.today():%Y%m%d}.db')
+	for old in os.listdir(tmp):
+		if old.startswith(prefix) and old != os.path.basename(path):
+			os.remove(os.path.join(tmp, old))
+	if regen or not os.path.exists(path):
+		t0 = time.perf_counter()
+		print(f'生成合成库 {path} …', file=sys.stderr, flush=True)
+		n = generate(path + '.tmp', seed=seed, **params)
+		os.replace(path + '.tmp', path)
+		print(f'{n} 条，{time.perf_counter() - t0:.1f} 秒', file=sys.stderr)
+	return path
+
+def git_commit():
+	"""(提交号, 工作区是否有改动)；不在 git 仓库里为 (None, None)"""
+	root = os.path.dirname(HERE)
+	try:
+		commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True, text=True, check=True).stdout.strip()
+		dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root, capture_output=True, text=True, check=True).stdout.strip())
+	except (OSError, subprocess.CalledProcessError):
+		return None, None
+	return commit, dirty
+
+def run(params, seed, groups, repeat, size, regen=False):
+	"""跑选中的各项，返回结果字典（即输出的 JSON）"""
+	import numpy, matplotlib
+	src = dataset(params, seed, regen)
+	commit, dirty = git_commit()
+	out = {
+		'format': FORMAT,
+		'meta': {
+			'commit': commit, 'dirty': dirty, 'time': datetime.datetime.now().isoformat(timespec='seconds'),
+			'python': platform.python_version(), 'platform': platform.platform(), 'sqlite': sqlite3.sqlite_version,
+			'numpy': numpy.__version__, 'matplotlib': matplotlib.__version__,
+		},
+		'params': {**params, 'seed': seed, 'repeat': repeat, 'size': list(size)},
+		'results': {},
+	}
+	work = tempfile.mkdtemp(prefix='slimlet-bench-')
+	try:
+		db = os.path.join(work, 'bench.db')
+		shutil.copy(src, db)
+		ctx = Context(db, work, repeat, size)
+		try:
+			for group in groups:
+				for name, stats in BENCHES[group](ctx):
+					out['results'][name] = stats
+					print(f"{name:<24}{stats['median']:>12.3f} ms", file=sys.stderr, flush=True)
+		finally:
+			ctx.close()
+	finally:
+		shutil.rmtree(work, ignore_errors=True)
+	return out
+
+# ---------------- 比较 ----------------
+def compare(base, cur, threshold=THRESHOLD, overrides=(), stat='median'):
+	"""逐项比较两份结果，返回 [(名称, 基准 ms, 本次 ms, 比值, 是否回退)]
+
+	overrides 为 [(通配模式, 阈值)]，后给的优先；比值 = 本次 / 基准，超过 1 + 阈值算回退。只在一边有的项跳过。
+	"""
+	rows = []
+	for name, now in cur['results'].items():
+		old = base['results'].get(name)
+		if old is None:
+			continue
+		limit = threshold
+		for pattern, value in overrides:
+			if fnmatch.fnmatchcase(name, pattern):
+				limit = value
+		ratio = now[stat] / old[stat] if old[stat] else float('inf')
+		rows.append((name, old[stat], now[stat], ratio, ratio > 1 + limit))
+	return rows
+
+def parse_override(text):
+	"""'draw_chart/*=0.5' → ('draw_chart/*', 0.5)"""
+	pattern, _, value = text.rpartition('=')
+	try:
+		return pattern, float(value)
+	except ValueError:
+		raise argparse.ArgumentTypeError(f'应为 名称或通配=阈值: {text}')
+
+def parse_size(text):
+	try:
+		w, h = (int(v) for v in text.lower().split('x'))
+	except ValueError:
+		raise argparse.ArgumentTypeError(f'应为 宽x高: {text}')
+	return w, h
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Slimlet 性能基准')
+	parser.add_argument('--preset', choices=list(PRESETS), default='small')
+	parser.add_argument('--persons', type=int, help='人数（覆盖预设）')
+	parser.add_argument('--years', type=float, help='每人多少年历史')
+	parser.add_argument('--per-day', type=float, help='每天多少条读数')
+	parser.add_argument('--notes', type=float, help='带备注的比例 0~1')
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--regen', action='store_true', help='重新生成合成库')
+	parser.add_argument('--only', help=f"只跑这些组，逗号分隔：{','.join(GROUPS)}")
+	parser.add_argument('--repeat', type=int, default=5, help='每项计时多少次')
+	parser.add_argument('--size', type=parse_size, default=SIZE, help='画布像素 宽x高')
+	parser.add_argument('--out', help='结果 JSON 写到这里（默认打印到标准输出）')
+	parser.add_argument('--baseline', help='与这份结果 JSON 比较')
+	parser.add_argument('--threshold', type=float, default=THRESHOLD, help='比基准慢多少算回退（0.2 即 20%%）')
+	parser.add_argument('--threshold-for', type=parse_override, action='append', default=[], metavar='PATTERN=T', help="单独给某些项的阈值，可重复，如 'cold_startup=0.5'")
+	parser.add_argument('--stat', choices=['min', 'median', 'mean'], default='median', help='比较用哪个统计量')
+	parser.add_argument('--cold-child', help=argparse.SUPPRESS)
+	parser.add_argument('--archive-dir', help=argparse.SUPPRESS)
+	args = parser.parse_args(argv)
+
+	if args.cold_child:
+		cold_child(args.cold_child, args.archive_dir, args.size)
+		return
+	groups = args.only.split(',') if args.only else GROUPS
+	unknown = set(groups) - set(GROUPS)
+	if unknown:
+		parser.error(f"没有这些组: {', '.join(sorted(unknown))}")
+	params = {k: getattr(args, k) if getattr(args, k) is not None else v for k, v in PRESETS[args.preset].items()}
+	base = None
+	if args.baseline: # 先读，文件不对不必白跑一遍
+		with open(args.baseline, encoding='utf-8') as f:
+			base = json.load(f)
+
+	result = run(params, args.seed, groups, args.repeat, args.size, args.regen)
+	text = json.dumps(result, ensure_ascii=False, indent=1)
+	if args.out:
+		with open(args.out, 'w', encoding='utf-8') as f:
+			f.write(text + '\n')
+	else:
+		print(text)
+
+	if base is None:
+		return
+	if base['params'] != result['params']:
+		print(f"注意：基准的参数不同 {base['params']}", file=sys.stderr)
+	rows = compare(base, result, args.threshold, args.threshold_for, args.stat)
+	print(f"\n{'项目':<24}{'基准 ms':>12}{'本次 ms':>12}{'比值':>8}  （{args.stat}，基准 {(base['meta']['commit'] or '?')[:10]}）", file=sys.stderr)
+	for name, old, now, ratio, bad in rows:
+		print(f"{name:<24}{old:>12.3f}{now:>12.3f}{ratio:>8.2f}{'  回退' if bad else ''}", file=sys.stderr)
+	regressions = [row[0] for row in rows if row[4]]
+	if regressions:
+		print(f"\n{len(regressions)} 项回退: {', '.join(regressions)}", file=sys.stderr)
+		sys.exit(1)
+
+if __name__ == '__main__':
+	main()
@@ -4,6 +4,8 @@ import subprocess
 
 NAME = "Slimlet"
 MAIN = "main.py"
+CLI_NAME = "slimlet-cli" # Windows 文件名不分大小写，不能和 Slimlet.exe 重名
+CLI = "cli.py"
 DIST_DIR = "dist"
 ICON_PATH = "slimlet.ico"  # 图标文件名
 
@@ -29,4 +31,15 @@ cmd = [
 ]
 subprocess.run(cmd, check=True)
 
+# 命令行版 slimlet：控制台程序，和界面程序放在同一目录，共用旁边的 slim.db
+cmd = [
+	"pyinstaller",
+	"-F",
+	"-n", CLI_NAME,
+	"--clean",
+	f"--icon={ICON_PATH}",
+	CLI
+]
+subprocess.run(cmd, check=True)
+
 print("✅ 打包完成！")
\ No newline at end of file
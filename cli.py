@@ -0,0 +1,211 @@
+"""命令行入口：记录、统计、导入导出，不加载 tkinter / matplotlib / PIL
+
+	python cli.py add 默认 72.5 --note 早起空腹
+	python cli.py stats 默认 --scope 1月
+	python cli.py export out.csv --incremental
+	python cli.py import export.xml --person 默认
+	python cli.py archive --dir backup
+	python cli.py serve --host 0.0.0.0 --token 暗号
+	python cli.py sync http://192.168.1.5:8765 --token 暗号
+	python cli.py ingest --udp 127.0.0.1:8766
+"""
+import os, time, argparse, datetime
+
+from store import RecordStore, TIME_FMT, to_epoch, fmt_epoch
+from utils import DB_PATH, SCOPE_MONTHS, load_cfg, load_persons, subtract_months, bmi_level, calc_bmi, to_kg, to_show_unit
+
+# ---------------- 子命令 ----------------
+def cmd_add(store, persons, args):
+	person = find_person(persons, args.person)
+	unit = args.unit or person['unit']
+	t = to_epoch(args.time) if args.time else int(time.time())
+	w_kg = to_kg(args.weight, unit)
+	bmi = calc_bmi(w_kg, person['height'])
+	store.insert(person['name'], t, w_kg, args.note, bmi, person['source'])
+	print(f"{person['name']} {fmt_epoch(t)} {to_show_unit(w_kg, person['unit'])} {person['unit']} BMI {bmi} {bmi_level(bmi, person['sex'])}")
+
+def cmd_stats(store, persons, args):
+	persons = [find_person(persons, args.person)] if args.person else persons
+	months = SCOPE_MONTHS[args.scope]
+	start = int(subtract_months(datetime.datetime.now(), months).timestamp()) if months else 0
+	for p in persons:
+		unit = p['unit']
+		n, w_min, w_max, w_avg = store.stats(p['name'], start)
+		if not n:
+			print(f"{p['name']}: {args.scope}内无数据")
+			continue
+		t, w, _, b = store.latest(p['name'])
+		print(f"{p['name']} [{args.scope}] {n} 条")
+		print(f"  最近 {fmt_epoch(t)} {to_show_unit(w, unit)} {unit}" + (f" BMI {b} {bmi_level(b, p['sex'])}" if b else ''))
+		print(f"  最轻 {to_show_unit(w_min, unit)}  最重 {to_show_unit(w_max, unit)}  平均 {to_show_unit(w_avg, unit)} {unit}")
+
+def cmd_export(store, persons, args):
+	from exporter import export
+	person = find_person(persons, args.person)['name'] if args.person else None
+	n = export(store, args.path, fmt=args.format, person=person, incremental=args.incremental)
+	print(f"已导出 {n} 条到 {args.path}")
+
+def cmd_import(store, persons, args):
+	from importer import import_file
+	person = find_person(persons, args.person)['name']
+	heights = {p['name']: p['height'] for p in persons}
+	total, inserted = import_file(store, args.path, person, heights)
+	print(f"读取 {total} 条，新增 {inserted} 条")
+
+def cmd_archive(store, persons, args):
+	from series import Series
+	from archive import ARCHIVE_DIR, archive_path, write
+	out_dir = args.dir or ARCHIVE_DIR
+	os.makedirs(out_dir, exist_ok=True)
+	for p in [find_person(persons, args.person)] if args.person else persons:
+		with store.snapshot():
+			s = Series.from_rows(store.fetch(p['name']))
+			version, last_id = store.person_version(p['name']), store.last_id()
+		path = archive_path(p['name'], store.node()[0], out_dir)
+		write(path, p['name'], s, version, last_id)
+		print(f"{p['name']}: {len(s)} 条 → {path}")
+
+def cmd_sync(store, persons, args):
+	from sync import sync
+	if args.new_node:
+		store.reset_node()
+	try:
+		got, sent = sync(store, args.url, token=sync_token(args))
+	except (ValueError, OSError) as e: # OSError 含连不上、超时、HTTP 错误
+		raise SystemExit(f'同步失败: {e}')
+	print(f"拉取 {got} 条变更，推送 {sent} 条")
+
+def cmd_serve(store, persons, args):
+	from sync import SyncServer
+	try:
+		server = SyncServer(args.db, args.host, args.port, verbose=True, token=sync_token(args))
+	except ValueError as e:
+		raise SystemExit(str(e))
+	print(f"同步服务 {server.url}（Ctrl+C 停止）")
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+
+def cmd_ingest(store, persons, args):
+	import signal, threading
+	from ingest import IngestServer
+	server = IngestServer(args.db, args.udp, args.unix, args.batch, args.latency / 1000)
+	print('接收服务 ' + '，'.join(f'{k} {v}' for k, v in (('UDP', args.udp), ('UNIX', args.unix)) if v) + '（Ctrl+C 停止）')
+	signal.signal(signal.SIGTERM, lambda *_: server.shutdown()) # 作为系统服务被停止时也把手上的读数提交完
+	thread = threading.Thread(target=server.serve_forever)
+	thread.start()
+	try:
+		while thread.is_alive():
+			thread.join(args.report)
+			print(server.report(), flush=True)
+	except KeyboardInterrupt:
+		server.shutdown()
+		thread.join()
+		print(server.report())
+
+def cmd_simulate(store, persons, args):
+	from ingest import simulate
+	names = [find_person(persons, name)['name'] for name in args.person] if args.person else [persons[0]['name']]
+	sent = simulate(names, args.udp, args.unix, args.rate, args.seconds, args.sources.split(','), seed=args.seed)
+	print(f"发出 {sent} 个数据报")
+
+def parse_addr(text):
+	"""'host:port' → (host, port)"""
+	host, _, port = text.rpartition(':')
+	try:
+		return host or '127.0.0.1', int(port)
+	except ValueError:
+		raise argparse.ArgumentTypeError(f'地址应为 host:port: {text}')
+
+# ---------------- 参数 ----------------
+def find_person(persons, name):
+	"""按姓名找人物；不给姓名时取第一个"""
+	if not persons:
+		raise SystemExit('还没有人物，请先运行 python main.py 添加')
+	if name is None:
+		return persons[0]
+	for p in persons:
+		if p['name'] == name:
+			return p
+	raise SystemExit(f"没有人物: {name}（现有: {', '.join(p['name'] for p in persons)}）")
+
+def sync_token(args):
+	"""同步暗号：命令行给的优先，其次 config.json 的 sync_token"""
+	return args.token or load_cfg().get('sync_token')
+
+def build_parser():
+	parser = argparse.ArgumentParser(prog='slimlet', description='轻舟·尺素 命令行')
+	parser.add_argument('--db', default=DB_PATH, help='数据库路径（默认与程序同目录的 slim.db）')
+	sub = parser.add_subparsers(dest='cmd', required=True)
+
+	p = sub.add_parser('add', help='记录一次体重')
+	p.add_argument('person', help='人物姓名')
+	p.add_argument('weight', type=float, help='体重')
+	p.add_argument('--unit', choices=['kg', 'lb', '公斤', '斤'], help='单位（默认人物设置的单位）')
+	p.add_argument('--time', help=f'时间，格式 {TIME_FMT.replace("%", "%%")}（默认现在）')
+	p.add_argument('--note', default='', help='心情一句话')
+	p.set_defaults(func=cmd_add)
+
+	p = sub.add_parser('stats', help='统计')
+	p.add_argument('person', nargs='?', help='人物姓名（默认所有人）')
+	p.add_argument('--scope', choices=list(SCOPE_MONTHS), default='全部', help='时间维度')
+	p.set_defaults(func=cmd_stats)
+
+	p = sub.add_parser('export', help='导出 CSV / Apple Health XML / JSON Lines')
+	p.add_argument('path', help='输出文件，按扩展名决定格式')
+	p.add_argument('--person', help='只导出某人（默认所有人）')
+	p.add_argument('--format', choices=['csv', 'xml', 'jsonl'], help='覆盖扩展名推断的格式')
+	p.add_argument('--incremental', action='store_true', help='只导出上次导出之后的新记录')
+	p.set_defaults(func=cmd_export)
+
+	p = sub.add_parser('import', help='导入 CSV / Apple Health export.xml')
+	p.add_argument('path', help='输入文件')
+	p.add_argument('--person', help='没有姓名列时记到谁名下（默认第一个人物）')
+	p.set_defaults(func=cmd_import)
+
+	p = sub.add_parser('archive', help='写列式快照（备份用；import 可以从 .slma 恢复）')
+	p.add_argument('person', nargs='?', help='人物姓名（默认所有人）')
+	p.add_argument('--dir', help='输出目录（默认程序目录下的 archive，界面冷启动时也从这里读）')
+	p.set_defaults(func=cmd_archive)
+
+	p = sub.add_parser('sync', help='与另一台机器上的同步服务双向同步')
+	p.add_argument('url', help='对方地址，如 http://192.168.1.5:8765')
+	p.add_argument('--new-node', action='store_true', help='本库是从别的机器整个复制来的：先换一个节点号')
+	p.add_argument('--token', help='对方服务的暗号（默认 config.json 的 sync_token）')
+	p.set_defaults(func=cmd_sync)
+
+	p = sub.add_parser('serve', help='开同步服务，供其他机器 sync 过来')
+	p.add_argument('--host', default='127.0.0.1', help='监听地址（局域网同步用 0.0.0.0，此时必须设暗号）')
+	p.add_argument('--port', type=int, default=8765)
+	p.add_argument('--token', help='暗号，请求不带它一律拒绝（默认 config.json 的 sync_token）')
+	p.set_defaults(func=cmd_serve)
+
+	p = sub.add_parser('ingest', help='开体重秤接收服务，读数攒批写库')
+	p.add_argument('--udp', type=parse_addr, help='UDP 监听地址 host:port，如 127.0.0.1:8766')
+	p.add_argument('--unix', help='UNIX 数据报套接字路径')
+	p.add_argument('--batch', type=int, default=500, help='攒够多少条提交一次')
+	p.add_argument('--latency', type=float, default=200, help='一条读数最多等多少毫秒就提交')
+	p.add_argument('--report', type=float, default=10, help='每隔多少秒打印各数据源的统计')
+	p.set_defaults(func=cmd_ingest)
+
+	p = sub.add_parser('simulate', help='模拟体重秤往接收服务推读数（测试用）')
+	p.add_argument('person', nargs='*', help='人物姓名（默认第一个人物）')
+	p.add_argument('--udp', type=parse_addr, help='服务的 UDP 地址 host:port')
+	p.add_argument('--unix', help='服务的 UNIX 套接字路径')
+	p.add_argument('--rate', type=float, default=50, help='每秒多少条')
+	p.add_argument('--seconds', type=float, default=5)
+	p.add_argument('--sources', default='体重秤', help='数据源名称，逗号分隔，随机分配')
+	p.add_argument('--seed', type=int)
+	p.set_defaults(func=cmd_simulate)
+	return parser
+
+def main(argv=None):
+	args = build_parser().parse_args(argv)
+	with RecordStore(args.db) as store:
+		args.func(store, load_persons(store), args)
+
+if __name__ == '__main__':
+	main()
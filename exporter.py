@@ -0,0 +1,77 @@
+import os, csv, json, time
+from xml.sax.saxutils import quoteattr
+
+from store import fmt_epoch
+
+FORMATS = ('csv', 'xml', 'jsonl')
+
+# ---------------- 各格式的写法 ----------------
+# 每个 writer 接收一个逐行产出 (id, person, time, weight, note, bmi) 的迭代器，边读边写
+CSV_HEADER = ['person', 'time', 'weight', 'unit', 'note', 'bmi'] # 与 importer 认的表头一致
+
+def write_csv(f, rows, header=True):
+	w = csv.writer(f)
+	if header:
+		w.writerow(CSV_HEADER)
+	for _, p, t, kg, n, b in rows:
+		w.writerow([p, fmt_epoch(t), kg, 'kg', n or '', '' if b is None else b])
+		yield
+
+def write_jsonl(f, rows, header=True):
+	for _, p, t, kg, n, b in rows:
+		f.write(json.dumps(dict(person=p, time=fmt_epoch(t), ts=t, weight=kg, note=n or '', bmi=b), ensure_ascii=False))
+		f.write('\n')
+		yield
+
+HEALTH_TIME_FMT = '%Y-%m-%d %H:%M:%S %z'
+
+def write_health_xml(f, rows, header=True):
+	"""Apple Health export.xml 的子集：体重 + BMI 两种 Record"""
+	f.write('<?xml version="1.0" encoding="UTF-8"?>\n<HealthData locale="zh_CN">\n')
+	f.write(f' <ExportDate value="{time.strftime(HEALTH_TIME_FMT)}"/>\n')
+	for _, p, t, kg, n, b in rows:
+		date = quoteattr(time.strftime(HEALTH_TIME_FMT, time.localtime(t)))
+		src = quoteattr(f'Slimlet {p}')
+		f.write(f' <Record type="HKQuantityTypeIdentifierBodyMass" sourceName={src} unit="kg" creationDate={date} startDate={date} endDate={date} value="{kg}"')
+		if n:
+			f.write(f'>\n  <MetadataEntry key="HKMetadataKeyUserNote" value={quoteattr(n)}/>\n </Record>\n')
+		else:
+			f.write('/>\n')
+		if b:
+			f.write(f' <Record type="HKQuantityTypeIdentifierBodyMassIndex" sourceName={src} unit="count" creationDate={date} startDate={date} endDate={date} value="{b}"/>\n')
+		yield
+	f.write('</HealthData>\n')
+
+WRITERS = {'csv': write_csv, 'xml': write_health_xml, 'jsonl': write_jsonl}
+
+# ---------------- 导出 ----------------
+def export(store, path, fmt=None, person=None, incremental=False, progress=None):
+	"""流式导出到 path，返回导出的行数；person 为 None 时导出所有人
+
+	incremental=True 只导出上次导出（同一文件、格式、人物）之后新增的行：
+	CSV / JSONL 追加到原文件末尾，XML 不能追加，写成只含新增部分的独立文件。
+	"""
+	fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+	if fmt not in WRITERS:
+		raise ValueError(f'不支持的导出格式: {fmt}（可选 {", ".join(FORMATS)}）')
+
+	target = f'{fmt}:{os.path.abspath(path)}:{person or "*"}'
+	after_id = store.export_mark(target) if incremental else 0
+	append = incremental and fmt != 'xml' and os.path.exists(path) and after_id > 0
+
+	last_id = after_id
+	def rows():
+		nonlocal last_id
+		for row in store.iter_records(person, after_id):
+			last_id = max(last_id, row[0])
+			yield row
+
+	count = 0
+	with open(path, 'a' if append else 'w', newline='' if fmt == 'csv' else None, encoding='utf-8') as f:
+		for _ in WRITERS[fmt](f, rows(), header=not append):
+			count += 1
+			if progress and count % 10000 == 0:
+				progress(count)
+
+	store.set_export_mark(target, last_id)
+	return count
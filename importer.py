@@ -0,0 +1,99 @@
+import csv, datetime
+from itertools import islice
+from xml.etree.ElementTree import iterparse
+
+from store import to_epoch
+from utils import UNIT2KG, calc_bmi
+
+BATCH = 5000 # 每批 executemany 的行数，一批一个事务
+SOURCE = '导入' # 导入的记录的数据源
+
+# ---------------- CSV ----------------
+# 表头中英文都认；time、weight 必须有，其余可选
+CSV_COLUMNS = {
+	'person': ('person', 'name', '姓名'),
+	'time': ('time', '时间'),
+	'weight': ('weight', '体重'),
+	'unit': ('unit', '单位'),
+	'note': ('note', '备注'),
+}
+
+def read_csv(path, person):
+	"""逐行读 CSV，产出 (person, time, weight_kg, note)；没有姓名列的记到 person 名下"""
+	with open(path, newline='', encoding='utf-8-sig') as f:
+		reader = csv.reader(f)
+		header = [h.strip().lower() for h in next(reader, [])]
+		col = {}
+		for key, names in CSV_COLUMNS.items():
+			col[key] = next((header.index(n) for n in names if n in header), None)
+		if col['time'] is None or col['weight'] is None:
+			raise ValueError('CSV 缺少 time/时间 或 weight/体重 列')
+
+		for row in reader:
+			if not row:
+				continue
+			# 缺列的行（被截断、少写了逗号）和单位不认识的行跳过，不能让一行坏数据中断整个导入
+			try:
+				unit = row[col['unit']].strip() if col['unit'] is not None else 'kg'
+				t = to_epoch(row[col['time']])
+				w = float(row[col['weight']]) * UNIT2KG[unit]
+				name = row[col['person']].strip() if col['person'] is not None else person
+			except (ValueError, IndexError, KeyError):
+				continue
+			note = row[col['note']] if col['note'] is not None and col['note'] < len(row) else '' # 末尾的备注可以不写
+			yield name, t, w, note
+
+# ---------------- Apple Health ----------------
+HEALTH_BODY_MASS = 'HKQuantityTypeIdentifierBodyMass'
+HEALTH_TIME_FMT = '%Y-%m-%d %H:%M:%S %z'
+
+def read_health_xml(path, person):
+	"""增量解析 Apple Health 的 export.xml，只取体重记录；处理完的节点立即释放"""
+	root = None
+	for event, elem in iterparse(path, events=('start', 'end')):
+		if root is None:
+			root = elem
+			continue
+		if event != 'end' or elem.tag != 'Record':
+			continue
+		if elem.get('type') == HEALTH_BODY_MASS and elem.get('unit') in UNIT2KG:
+			try:
+				t = int(datetime.datetime.strptime(elem.get('startDate'), HEALTH_TIME_FMT).timestamp())
+				w = float(elem.get('value')) * UNIT2KG[elem.get('unit')]
+			except (TypeError, ValueError):
+				t = None
+			if t is not None:
+				yield person, t, w, ''
+		elem.clear()
+		root.clear() # 根节点也别攒着已经处理过的子节点
+
+# ---------------- 写库 ----------------
+def import_records(store, rows, heights, progress=None, batch=BATCH):
+	"""rows 为 (person, time, weight_kg, note)，按批写入并跳过重复；返回 (读到, 写入)
+
+	heights 为 {姓名: 身高cm}，不在其中的人物整行跳过；progress(读到, 写入) 每批回调一次。
+	"""
+	rows = iter(rows)
+	total = inserted = 0
+	while True:
+		chunk = list(islice(rows, batch))
+		if not chunk:
+			break
+		total += len(chunk)
+		inserted += store.insert_many(
+			(p, t, w, n, calc_bmi(w, heights[p]), SOURCE) for p, t, w, n in chunk if p in heights
+		)
+		if progress:
+			progress(total, inserted)
+	return total, inserted
+
+def import_file(store, path, person, heights, progress=None):
+	"""按扩展名选择解析器：.xml 当作 Apple Health 导出，.slma 为快照（记到快照里的人名下），其余按 CSV"""
+	if path.lower().endswith('.xml'):
+		rows = read_health_xml(path, person)
+	elif path.lower().endswith('.slma'):
+		from archive import read_rows
+		rows = read_rows(path)
+	else:
+		rows = read_csv(path, person)
+	return import_records(store, rows, heights, progress)
@@ -0,0 +1,252 @@
+"""体重秤接收服务：秤通过 UDP 或 UNIX 数据报套接字推送读数，校验、去重后攒批写库
+
+每个数据报是一条 JSON，只有 person、weight 必填：
+	{"person": "默认", "weight": 72.5, "unit": "kg", "time": 1700000000, "source": "体重秤", "id": "a1b2", "note": ""}
+time 缺省为收到的时刻；source 缺省为人物资料里的数据源；
+id 是秤自己的读数编号（重发时不变），有就按 (source, id) 去重，否则按 (person, time)，库里同人同一秒已有的也跳过。
+攒满 batch 条或最早一条等了 latency 秒就提交一次：一批一个事务、一次落盘。
+
+	python cli.py ingest --udp 127.0.0.1:8766
+	python cli.py simulate 默认 --udp 127.0.0.1:8766 --rate 200
+"""
+import os, json, time, socket, random, sqlite3, selectors, threading
+from collections import OrderedDict
+
+from store import RecordStore
+from utils import UNIT2KG, calc_bmi
+
+BATCH = 500 # 攒够这么多条就提交
+LATENCY = 0.2 # 一条读数最多等这么久（秒）就提交
+MAX_DATAGRAM = 4096
+RCVBUF = 1 << 20 # 批量提交的那一下秤还在发，内核缓冲大一点不丢包
+DEDUPE_KEEP = 20000 # 记住最近多少条读数的键
+MIN_KG, MAX_KG = 2, 400
+FUTURE_SLACK = 300 # 秤的时钟可以比本机快这么多秒
+OLDEST = 946684800 # 2000-01-01，更早的时间当作秤没对时
+PERSONS_TTL = 5 # 来了不认识的人物时，最多隔这么久重读一次人物表
+RETRY_MAX = 5 # 库被锁、提交失败后重试的间隔从 latency 起翻倍，最多这么多秒
+
+class SourceStats:
+	"""一个数据源的计数；写入数在提交成功后才加"""
+	__slots__ = ('received', 'invalid', 'duplicate', 'written', 'first', 'last')
+
+	def __init__(self, now):
+		self.received = self.invalid = self.duplicate = self.written = 0
+		self.first = self.last = now
+
+	def rate(self):
+		"""写入条数 / 秒，从收到第一条算起（不足一秒按一秒）"""
+		return self.written / max(self.last - self.first, 1)
+
+# ---------------- 服务 ----------------
+class IngestServer:
+	"""单线程：serve_forever 在哪个线程跑，库连接就在哪个线程里开；shutdown() 可从别的线程调"""
+
+	def __init__(self, db_path, udp=None, unix=None, batch=BATCH, latency=LATENCY):
+		if udp is None and unix is None:
+			raise ValueError('至少要开 UDP 或 UNIX 套接字中的一个')
+		self.db_path = db_path
+		self.batch = batch
+		self.latency = latency
+		self.socks = []
+		self.unix_path = unix
+		if udp is not None:
+			self.socks.append(self._bind(socket.AF_INET, udp))
+			self.address = self.socks[-1].getsockname()
+		if unix is not None:
+			if os.path.exists(unix):
+				os.remove(unix) # 上次没正常退出留下的
+			self.socks.append(self._bind(socket.AF_UNIX, unix))
+		self.closed = False
+		self.store = None
+		self.persons = {}
+		self.persons_at = 0
+		self.pending = [] # 待提交的 (person, time, weight, note, bmi, source)
+		self.oldest = 0 # 待提交里最早那条收到的时刻
+		self.retry_at = 0 # 上次提交失败时，这之前不再试
+		self.backoff = 0
+		self.seen = OrderedDict() # 最近读数的去重键
+		self.stats = {} # 数据源 → SourceStats
+		self.commits = 0
+		self.failures = 0 # 提交失败（库被锁）的次数
+		self.db_skipped = 0 # 库里已有同人同一秒的记录而跳过的
+		self.max_wait = 0.0 # 读数从收到到提交的最长等待
+
+	@staticmethod
+	def _bind(family, address):
+		sock = socket.socket(family, socket.SOCK_DGRAM)
+		sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF)
+		sock.bind(address)
+		sock.setblocking(False)
+		return sock
+
+	def serve_forever(self, poll_interval=0.5):
+		sel = selectors.DefaultSelector()
+		for sock in self.socks:
+			sel.register(sock, selectors.EVENT_READ)
+		try:
+			with RecordStore(self.db_path) as self.store:
+				self.load_persons()
+				while not self.closed:
+					wait = poll_interval
+					if self.pending:
+						wait = min(wait, max(0, self.due() - time.monotonic()))
+					for key, _ in sel.select(wait):
+						self.drain(key.fileobj)
+					if self.pending and time.monotonic() >= self.due():
+						self.flush()
+				self.flush()
+		finally:
+			sel.close()
+			for sock in self.socks:
+				sock.close()
+			if self.unix_path and os.path.exists(self.unix_path):
+				os.remove(self.unix_path)
+
+	def shutdown(self):
+		"""让 serve_forever 把手上的读数提交完后返回"""
+		self.closed = True
+
+	def drain(self, sock):
+		"""把套接字里已到的数据报一次收完"""
+		while True:
+			try:
+				data = sock.recv(MAX_DATAGRAM)
+			except BlockingIOError:
+				return
+			self.receive(data)
+			if len(self.pending) >= self.batch and time.monotonic() >= self.retry_at:
+				self.flush()
+
+	def due(self):
+		"""下次该提交的时刻：最早那条等满 latency；上次提交失败的话还要等到 retry_at"""
+		return max(self.oldest + self.latency, self.retry_at)
+
+	def load_persons(self):
+		self.persons = {p['name']: p for p in self.store.persons()}
+		self.persons_at = time.monotonic()
+
+	def receive(self, data, now=None):
+		"""处理一个数据报：校验、去重后放进待提交"""
+		now = time.time() if now is None else now
+		try:
+			msg = json.loads(data)
+			source = str(msg.get('source') or '')
+		except (ValueError, AttributeError): # 不是 JSON 对象
+			msg, source = None, ''
+		try:
+			row, key = self.validate(msg, now)
+		except (ValueError, TypeError): # TypeError：字段类型不对，比如姓名是个列表
+			self.count(source, now).invalid += 1
+			return
+		st = self.count(row[5], now)
+		if key in self.seen:
+			st.duplicate += 1
+			return
+		self.seen[key] = None
+		if len(self.seen) > DEDUPE_KEEP:
+			self.seen.popitem(last=False)
+		if not self.pending:
+			self.oldest = time.monotonic()
+		self.pending.append(row)
+
+	def count(self, source, now):
+		st = self.stats.get(source)
+		if st is None:
+			st = self.stats[source] = SourceStats(now)
+		st.received += 1
+		st.last = now
+		return st
+
+	def validate(self, msg, now):
+		"""返回 ((person, time, weight_kg, note, bmi, source), 去重键)，不合格抛 ValueError"""
+		if not isinstance(msg, dict):
+			raise ValueError('不是 JSON 对象')
+		name = msg.get('person')
+		person = self.persons.get(name)
+		if person is None and time.monotonic() - self.persons_at > PERSONS_TTL:
+			self.load_persons() # 可能是刚在界面里添加的
+			person = self.persons.get(name)
+		if person is None:
+			raise ValueError(f'没有人物: {name}')
+		unit = msg.get('unit', 'kg')
+		if unit not in UNIT2KG:
+			raise ValueError(f'不认识的单位: {unit}')
+		w = float(msg['weight']) * UNIT2KG[unit] if isinstance(msg.get('weight'), (int, float)) else None
+		if w is None or not MIN_KG <= w <= MAX_KG:
+			raise ValueError(f"体重不合理: {msg.get('weight')}")
+		t = msg.get('time', now)
+		if not isinstance(t, (int, float)) or not OLDEST <= t <= now + FUTURE_SLACK:
+			raise ValueError(f'时间不合理: {t}')
+		t = int(t)
+		source = str(msg.get('source') or person['source'] or '')
+		note = str(msg.get('note') or '')
+		key = (source, str(msg['id'])) if msg.get('id') is not None else (name, t)
+		return (name, t, w, note, calc_bmi(w, person['height']), source), key
+
+	def flush(self):
+		"""待提交的一次写进库：一个事务"""
+		if not self.pending:
+			return
+		rows, self.pending = self.pending, []
+		# 库里（或本批里）已有同人同一秒的由 insert_many 在写事务里跳过，按数据源报回写入数
+		try:
+			written = self.store.insert_many(rows, by_source=True)
+		except sqlite3.OperationalError: # 别的进程长时间占着写锁：放回去，退避一阵再试
+			self.pending[:0] = rows
+			self.failures += 1
+			self.backoff = min(max(self.backoff * 2, self.latency), RETRY_MAX)
+			self.retry_at = time.monotonic() + self.backoff
+			return
+		self.backoff = self.retry_at = 0
+		self.max_wait = max(self.max_wait, time.monotonic() - self.oldest)
+		self.commits += 1
+		self.db_skipped += len(rows) - sum(written.values())
+		for source, n in written.items():
+			self.stats[source].written += n
+
+	def report(self):
+		"""各数据源的计数和吞吐，一行一个"""
+		lines = [f'{source or "(未标注)"}: 收到 {st.received}，写入 {st.written}，重复 {st.duplicate}，无效 {st.invalid}，{st.rate():.1f} 条/秒'
+			for source, st in sorted(self.stats.items())]
+		lines.append(f'提交 {self.commits} 次（失败 {self.failures} 次），库里已有而跳过 {self.db_skipped} 条，最长等待 {self.max_wait * 1000:.0f} ms')
+		return '\n'.join(lines)
+
+def start_ingest(db_path, udp=('127.0.0.1', 0), unix=None, **kw):
+	"""在后台线程里起服务（端口 0 随便挑个空闲的），测试用；用完 shutdown() 再 join 返回的线程"""
+	server = IngestServer(db_path, udp, unix, **kw)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+	return server, thread
+
+# ---------------- 模拟秤 ----------------
+def simulate(persons, udp=None, unix=None, rate=50, seconds=5, sources=('体重秤',), dup=0.1, bad=0.02, seed=None):
+	"""模拟几台秤按 rate 条/秒往服务推读数，返回发出的数据报数
+
+	每人的体重做随机游走，时间从 count 秒前起每条加一秒（不会撞上同一秒）；
+	dup 比例的读数原样重发（秤没收到确认时会这样），bad 比例发坏数据。
+	"""
+	rng = random.Random(seed)
+	family, address = (socket.AF_INET, udp) if udp is not None else (socket.AF_UNIX, unix)
+	count = int(rate * seconds)
+	t0 = int(time.time()) - count
+	weights = {p: rng.uniform(55, 85) for p in persons}
+	sent = 0
+	with socket.socket(family, socket.SOCK_DGRAM) as sock:
+		start = time.monotonic()
+		for i in range(count):
+			person = rng.choice(persons)
+			weights[person] += rng.gauss(0, 0.05)
+			source = rng.choice(sources)
+			msg = {'person': person, 'weight': round(weights[person], 2), 'time': t0 + i, 'source': source, 'id': f'{source}-{i}'}
+			if rng.random() < bad:
+				msg['weight'] = -1
+			data = json.dumps(msg, ensure_ascii=False).encode('utf-8')
+			for _ in range(2 if rng.random() < dup else 1):
+				sock.sendto(data, address)
+				sent += 1
+			# 按节拍发，落后了不补睡
+			delay = start + (i + 1) / rate - time.monotonic()
+			if delay > 0:
+				time.sleep(delay)
+	return sent
@@ -1,621 +1,865 @@
-import os, io, sys, json, math, base64, sqlite3, datetime
-from PIL import Image, ImageTk
-
-import tkinter as tk
-from tkinter import ttk, messagebox
-
-import matplotlib
-from matplotlib import rcParams
-from matplotlib.figure import Figure
-from matplotlib.dates import DateFormatter, date2num
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
-# 兼容 PyInstaller 与常规运行
-if getattr(sys, 'frozen', False):
-	# 打包后的可执行文件目录
-	BASE_DIR = os.path.dirname(sys.executable)
-else:
-	# 源码运行时脚本所在目录
-	BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-print(f"{BASE_DIR=}")
-
-REFRESH_ICON_DATA = b"/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAgFBgcGBQgHBgcJCAgJDBMMDAsLDBgREg4THBgdHRsYGxofIywlHyEqIRobJjQnKi4vMTIxHiU2OjYwOiwwMTD/2wBDAQgJCQwKDBcMDBcwIBsgMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDD/wAARCAIAAgADASIAAhEBAxEB/8QAHAABAAIDAQEBAAAAAAAAAAAAAAcIAwUGBAEC/8QATxAAAQMCAgUHBQwHBgYDAQAAAAECAwQFBhEHEiExQQgTIjJRYXEUF0JSkSNWYnKBgqGkscPR0xUkMzZ0s8EWNENVktIlRFNUk6Jjc6Ph/8QAFAEBAAAAAAAAAAAAAAAAAAAAAP/EABQRAQAAAAAAAAAAAAAAAAAAAAD/2gAMAwEAAhEDEQA/AJ2AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAGmxNiyw4VgZNiK5w0KTZ8216K570TijWorlTb2GjsmlnBF6qUpqa+RwzvdqoypjdAj8+xzk1dvZnmB2oCoqLkoAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAACJnuNRfMU2GwayXy80NDIqa3NSzpr5dqM6zvYBtwRTfeUBhKgV7LXDX3Z29jmR8xF4Zvyd/6nD3PlFX6WdVtditdLD6tRzk7k+cisT6ALHH1EVdyKVIr9NOPqzWRL15Mx3o09NEzL5dXW+k52txfiWt6NbiG7VDUXPKStkVvyIq5IBdnVd6q+w+SI1qZyq1E7XKjSiFRVT1C51E8k3e96u+1TABfSNzX/ALN8b/iPQ/Stc7e1fYUJMkbnxrrxucxe1FVPsAvmrV4op8KS0uLcSUTVZSYiu8DV4Q10rPoRx0Fv0w49oo2MZiCSZiLnlUQxSqvznN1vpAt0CuNs5ReIYpGrdbNbayLsh5yCR3zlVyfQdvh/lA4VrubZdIa6zv2q97o+fiTuzZ0v/QCVwaqxYjst/YrrHdqGtVG6ytp5kc9ifCb1k+VDaqmS7UyAAAAAAAAAAAAfiWWKCB888iRwxxrK56+i1Ok5x+zWYq/de8fwE/8ALUCnGLsRV2KsQ1V3uUjpJKmRVYxzs0hjzXVjTsRE/E0YAFqOTviirxDgyamudWtTV2ubmUVy9PmFYix6y8V/aIi/BJOIG5JnUxR40n3xPIAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAHivF2t9ktz667VkFDTRbHSyu1Wp3J2r3JtIUxryhevTYPofg+XVzfHa2NPk2uX5oE2Xa52+zUL6u71cFFStXLnaiVGtTPciZ717iKMT8oOxUOtFhugnus3/Xl9wh3dZM83rt4ZN8SAb/frtiOuWtvdxnr5+DpXbGp2NTc1O5ERDVAd7ibS7jPEbtWW6ut0DsvcbdnA1OG12euvyuyOEcqLuTI/IAAGaCOWeZsNOySR71yayNqq53yIBhB1Vu0c40uEmpT4YubV3601O6Bv+p+SHS2vQLjit1vKYKG3Zf9zVI7P/xI8CMATFBydMTKv6xdrPGnwXTL9saGxpuTdWu/vWJqWL4lI532uQCDATxJybJU/Z4riX49CrfvFNdV8nPELF/U73a5v/uSWP7GuAhgEo3HQFjWjai07bdcM+FPVauX/kRpz910X44tbkSowzcX5/8AbNSp/lZ5AccDLPHLBIsU8ckb03te1UVPkUxAfpM1dnmmacV2nb4X0s4xw8rWw3R9wp12+TXDOdnyKq6yfI5DhgBZjC/KBw/Xo2LENHU2iVM/dW5zwbO9E10Vfir4kp2u50N2pW1loroK2lcuXO08qSN2ejmm5e4oobOx3u64drmV1krpqKpZ6cTstZM9ypucmzcuaAXjBBeBeUFE7Uo8aUvMv6n6Qo2dHem18e9OK5tz+KTRarnb7vQsrrTVwVtM7NGSwORze9uzcvdvA9gAAAAAazFX7r3j+An/AJamzNZir917x/AT/wAtQKOAACfeSZ1MUeNJ98TyQNyTOpijxpPvieQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAHivF0obNb5bhd62Gko4uk6WV3R8O9exE2qB7kRVXJEIt0h6arJhtJKGxLFero1NXNjs6eF3wnJ11z9FvYuaoRppU0y1uJ0ltWH+doLPlqPl6s1U3jrKnUavqpv479UiUDfYrxTecW3FKy/Vz6uRNkbNiRxJ2NYmxPtXLaaEAADqMHYDxHjGbKyW9z4Edqvq5V1IW7eLl379zc17iccE6BbJatSqxLKl5reECZx0zXbOHWdx35Jt6oFebHY7rf6taWy2+pr50yVUgjV2qneu5E71JVwxyer5W6kuJa6ntca/4ECc/N4KqdBPHNxYihpaeho46Wip4KWBiZMigiSNjfBE2GYCOrLoPwRasny0NTc3NdrI+unVyJ3arNVvtRTurXbbdZ6dYbVb6OhjcuaspYWwtVfmoesAfVVV3rmfAAAAAAAAEVU3KAB5rpbqG606QXWipq6DPPUq4GyNz+K5DgL7oNwTdEc6lpai1S71fRzrkvzX6zcvDIkgAVwxJyebzSROmw7cobs1EzWGVnk0m/YjVVVavyq0iu9WS52CrSlvVvqaCfejJ41brJ2ou5U70LxmCvoaW40r6OvpIKymf1op4myRu+aoFEAWaxjoEw/dGPnwzNJZazfzT1dJA7eu5ek3em5cky6pBOMME4hwdVIy/290TFdqx1DenDJ4OTZw3LkvcBzZucM4mu2FrkldYq2WkkVMnIm1sjfVc3c5PE0wAtRo30zWfFLo6C881abu7o6rnfq9Q74Dl3L8F3amSuJOVFRdqFCSVdGmma6YYdHbb8slztGxqOcudRTJ2NcvWRPVXuyVALQg8VpulFebfDcLZUxVdHO3Xjki6v/wDF7UXah7QBrMVfuveP4Cf+WpszWYq/de8fwE/8tQKOAACfeSZ1MUeNJ98TyQNyTOpijxpPvieQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABy2kTHNswLZPK633Wol1m0tI1+T5np9jU9J3DP1tih7MZ4utODLK643ibUTa2GFn7Wd/Y1PtXcnEqjj3HN4xxdPKbpLzdMxcqaka/3KBv8AV3a5dq+GSJ48YYouuL7y66Xqq5yR/RjjZsZCz1Gt4J9K71NAAAO50baNbzjqp5ynb5HamPymrZW9FO5iek7f3JxVNgHLWa0XC93BlDaKOatqperFE3WVe9exO9dhPejzQNRW/mq3GytrqnrsoYn+5R/HdsV69ydHYvWQk3CGErNg+2LQWOmVib55n9Kaod2udx3rs3JwQ3wGOCKOmgZFTxNihibqtijajWtRPRRE2IhkAAAAAAAAAAAAAAAAAAAAAAABiqqeGrgdT1MUVRDMzUdFK1Hxub3ouxTKAIX0jaBqOvY6uwTq0NT1nUUrl5mTj0VXPUXu6u7qkA3e1VtnuE1Bc6SWiqYl6UUzNVyfinYqbFLzGgxlg6yYytyUV8o1kdGnuVS1dWaHva/+i5ovFAKUA7nSXo1uuBKrXkTyy1yvygrWN6PxXp6LvoXhxy4YDsNHuP7xgS5c7bnpPRyuRamilf0Ju9PVd2OT5c02Fp8E4wtGM7OldZ5s0bqsmpnftIHL6Lk+Rcl3KUoN7hDE9ywjeobpaJ+bmjzbJG5M2TM4senFF+jem0C7JrMVfuveP4Cf+WprcA40tmN7Iy42t6skYrWVFM9/Tgf6ru1F9F3HxzRNlir917v/AAE/8tQKOAACfeSZ1MUeNJ98TyQNyTOpijxpPvieQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAeK83Sks1rqrnc5eYpKSNZJXO4NTgnaq7kTioGvxviu24NsMt0ujtnVhgYuT55PRa3+q8E2lRMZYnuWLr5PdrtKj5JERkcbOpCzhG1OCJt8VzXvPbpExpXY3xFJcarOKnbrNpaZFzbBH/ALl3uXivdkhygAAm7Qlolbdo4MS4shT9Hdeionp/ef8A5Hp/0+xvpb+r1w8GiDRC/Eror5iVj6eyL0ooEVWyVnf2tZ3714esWSpoIaWnip6aGKniibqxxRMRrWtT0Wom5DL0slRqq1y8VAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAGGrpqauo5aWspoqimqG6ssUrUc1zV9FzVK26XdDk2GmTXrDmvU2dOnLCvSlo29vwmd+9OOfWLMBqqqoqLkoFCQTXpt0SJZ0nxJhWDO29aso499KvF7E9TtT0fi9WFAN7hDE9ywjeobpaJ+bmjzbJG5M2TM4senFF+jem0tLQ4tt2M9G1zutuVGItDUNqIXu6UEiRLrMX7UdxQp6dJg/FdwwrV1TqV6upq6nfTVcCbEkjcipn8Zutmi/wBFA5sAAT7yTOpijxpPvieSBuSZ1MUeNJ98TyAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAfURVXJCsWnnSMmJrn+g7NIn6IoJPdHs2pVTJs1s+LW7k7d+3oklcoLHCYbw2tmoJUbdLu1zdZF6UVPuc7uV2WqnzlzzaVbAAHc6JcBTY6xG2CXXZaqXKWtmZ6vBiL6zvoTWXhkB0ugzRf/aWdl/xBDnZoXZQQv8A+ckTh8RF39q7PWLMdLJUaqtVeJipqeCmpoqemhbFDTtSKKJvRa1qJqtaidmRlAAAAAAAAAAAAAAAAAAAAAAAAAAAADldImN6DAlg8vrWrUVEqrFSUzV/ayZcVXcicV/qV2u2mrHNxnV7LuygYu3mqSBjGoviqK5flUC2YKeedfHfvmq/Y38B518d++ar9jfwAuGCnnnXx375qv2N/AedfHfvmq/Y38ALhgp5518d++ar9jfwHnXx375qv2N/AC4bVVVRUXJUK06ddGK4aqFxBYqbUs1Q73aFm6jlXs7GOXd2Ls2dE5Lzr47981X7G/gfKvSdjWrpZaepv9RPTytdFJHIyNzXtVMnIqZbUA40AAAABPvJM6mKPGk++J5IG5JnUxR40n3xPIAAAAAAAAAAAAAAAAAAAAAAAAAAADxXq60djtVXdLi/maWkjWWV/cnBO1V3Inae0gblP4s/uWFKWXLdV1ur/wDmxdvxnKip6gEP4xxJW4txHW3qvaiSVLujGm1sTETVYxPBPau00QAGxsdprb5d6S126PnaqrkSKJi7Nq8V7kTaq9hcjA2FaDB2HKe023pozpTT5dKeVes9fYmScE2EZ8m7A/kFtXFtwg/Wa1ro6Nr0/Zw8X+Ll2Js6qfCJpAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAK+8q/yn9IYdWTLyNYJ+b7ec1ma/0c2QWXRx9g2341sD7bck1ZmLrU1Sza6nly6ybtZPWTinftK+XXQTjqjqEZSUlJdG5ZrJTVTERO5UkVi/QoEYgkDzJ6Qve/9dp/zD75lNIfve+u0/5gEfAkDzKaQ/e99dp/zB5ldIX+QfXqf8wCPwSB5ldIX+QfXqf8weZPSH73vrtP+YBH4JA8yekP3vfXaf8AMHmT0h+9767T/mAR+CQPMnpD97312n/MHmT0h+9767T/AJgEfgkDzJ6Q/e99dp/zB5k9Ifve+u0/5gHe8kzqYo8aT74nkibk94MxDg9L83EVvWjSrWn5hUmik1lbzufUc7LrN3ksgAAAAAAAAAAAAAAAAAAAAAAAAAAB47vc6az2iquda9WU1FC6eXJM8momeSJ2ruQpViS9VWI7/X3evX3etlWVyZ56icGJ3NTJE7kJ/wCU3iNaLC1HYIHZy3SbnZV2L7jFku3imb9X/Q4rWAOn0cYXlxjjGgs/T5h7ucqXt9CFu13hnuTvchzBZnk2YT/RWGJcRVbE8suvQg9ZkDVyTh6Ttvg1gEswQw08UVPCxkUMSJHFE3otaiJkjUTsyMgAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABlmuQNRjG8f2fwndrt0WSUdLJLFrbtfLoNXxfqoBV3Tdf/wC0Wki6SMXOnoneQQpkmxGKutl4ya6+Djgj9K7NETsPyBtMO2ee/wB/oLRSuykrahkCLwairtd4Im0u3R0dPQ0kFJSRpHBBGyCJibmxtTJrfYV35MGH/K8S11/nYistsKRQ57+dl2Zp4MRyfPQseAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAACKuU1d1oNH8VvjemtdatjXMVP8JnujsvnJGSqVx5U9wllxZaLe5USKmoOfTtR8j1R30RNAhcAzRQyTzxwQMV8kjkja1PScq5IBavk82n9FaMaSVyOZJcppKxyO4Iq6jcvmxtX5xIp5LPb4rRaaG2wKrmUNPHSMVd6tYxGnrAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABUnT3W+WaV7wjX6zIeZp292rGzWT/VrFt2pm5E7ykuOatK3G19q81Vs1xnengsjsvoA0R1WiqgfcdJOHYI+k5K+KZe9sbucd9DVOVJQ5NtuWu0nQ1GeXkFLPU+ObUj+9AtMq5rmAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAD6zrJ4lD6mVZ6iadf8R7ne3Mvfro1iyO3NzcvyIUJAEx8leJXY3uU3q21We2aL/aQ4TryUIv8AiOIZ/UhgZ7XP/wBoFgQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABEzXJDkbxpNwTZqtaa44hp+ejVWubC2SZWu45821csjm+UXi6qw9hOkt9qqnU9XeJXN5yJNVUgYnTydn0VVXRp4axVsC8ljvtpxDSLU2a40twhRUR/k8qOVut1dZN7V7lNkUvwFiuswdiamulE/KJrkjqY96TQqqa7VTv3p2KXRcmTlQD4AAAAAAAAAAAAAAAAAAAAA+tXJyKUux7hSswdiaptdazKJrlkppN6TQqq6jkXv3L2KXQNbfLFacQ0iU15t1LcIUVVZ5REjlbrdbVXe1e9AKNlpOTphGqw9hOruF1pXU9XeJWu5uVdVUgYnQzbl0VVXSL4ap0ln0ZYJs1WlTbsPU/PRqjmumdJMrXcMuccuWR1yrmuagAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAFfuVfL/xHD0HqQzv9rmf7SCiY+VRKrsb22H1baj/AGzS/wC0hwAX21EaxI27m5NT5EKIU0Sz1EMCf4j2t9uRfB/WXxA+AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAARM1yAqzykritdpOmp8svIKWCm8c2rJ96RedVpVr33HSTiKeTpOSvlhTvbG7m2/Q1DlQN7gakStxtYqTJVbNcYGL4LI3P6C7Tlzcq95UjQJReWaV7OrmazIeeqHd2rG/VX/VqltgAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAeS8XCK0WmuuU6K5lDTyVb0TerWMVx6yOuUNdv0Voxq4mq5klymjo2q3girruz+bG5PnAVUlmknnknner5JHLI5y+k5VzUwgATRyWLfLLiy73BqIkVNQcwvaj5HorfoicWOIq5MtoWg0fy3CRia11q3ua9F/wme5tz+ckhKoAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAK4cp/EHleJaGwQPRWW2FZZst/Oy7cl8GI1fnqWIrKynoaSerq5EjggjfPK9dzY2pm53sKSYkvE9/v1fd6tuUlbUPqFYi56qKuxvgibE8ANWfpG5oq9h+TvdCNg/tFpItcb0zp6J3l8y5psRipq5+Mmong4C0WDrP/Z/CdptPRZJR0scUuru18um5PF+sptwq5rmAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAGOeaGnilqJnsihiRZJZXdFrURM1cq9mQETcpPFn6KwxFh2kenll16c/rMgaua8fSds8GvKzHT6R8US4xxjX3jp8w93N0zHehC3Y3wz3r3uU5gAWU5MmHFosLVl/nbnLdJuaiTYvuMWabOKZv1v9DSAMN2WqxHf6C0UCe71sqRNVUz1E4vXuamar3IXVtFsprPaKW2UTFZTUULYIs1zyaiZZqvau9QPYAAAAAAAAAAAAAAAAAAAAAAAAAABE3KExniHB6WF2HbgtGlWtRz6LDFJrK3msuu12XWduJZIG5WfUwv41f3IHBeezSH74fqVP+WPPZpD98P1Kn/LI/AEgeezSH74fqVP+WPPZpD98P1Kn/LI/AEgeezSH74fqVP8Aljz2aQ/fD9Sp/wAsj8ASB57NIfvh+pU/5Y89WkL/AD/6jT/lkfgCQPPVpC/z/wCo0/5Y89ekP3w/Uqf8sj8ASD569Ifvh+pU/wCWfPPVpC/z/wCo0/5ZH4Ak61adsdUdQr6urpLo3LJI6mlYiJ3osaMX6VLB4Bxlb8a2Blytq6szF1ammftdTy5dVd2snqrxTv2FLidOSh5T+kMRJHl5GsEHOZ7+c1n6n0c4BYIAAAAAAAAAAAAAAAAAAAAAAAAAAAAAIW5SOOPILamErfP+s1rWyVjmL+zh4M8XLtXb1U+ESZjnFVBg7DlRdrl00Z0YYM+lPKvVYnsXNeCbSm98u1bfLvV3S4yc7VVciyyvTZtXgncibETsA1wBvcHYbrcW4jorLQORJKl3SkXa2JiJrPevgntXYBMHJgwn/fcV1UWW+kotb/8AR6bPitRUX1yeTxWW1UdjtVJa7czmaWkjSKJncnFe1V3qvae0AAAAAAAAAAAAAAAAAAAAAAAAAAABA3Kz6mF/Gr+5J5IG5WfUwv41f3IEBAAAAAOypNGONauliqKawVE9PK1ssckb43Ne1UzaqLntQ++ajHfvZq/a38TrdBWk5cNVCYfvtTqWaod7jM/dRyr29jHLv7F27OkWWciqqoqZKgFPPNRjv3s1ftb+I81GO/ezV+1v4lwwBTzzUY797NX7W/iPNRjv3s1ftb+JcMAU881GO/ezV+1v4jzUY797NX7W/iXDAFTLToVxzcZ0Y+0MoGLs52rnYxqL4IquX5ELE6O8EUGBLB5BROWoqJVSWrqXJ+1ky4Im5E4J/U6oAAAAAAAAAAAAAAAAAAAAAAAAAAAAMVTUQU1NLUVMzYoadqyyyu6LWtRNZzlXsyMvSyRXIrVXgVn056UP7SzvsGH5s7NC7OeZn/OSJx+Ii7u1dvqgc1pax7NjrEbp4tdlqpc4qKF/q8XqnrO+hNVOGZwwAAtJyfcDphvDaXmviRt0u7Wu1VTpRU+9re5XZay/NTLNpGugbRymJrn+nLzGn6IoJPc2P2pVTJt1cuLW717d23pFnVVVXNQPgAAAAAAAAAAAAAAAAAAAAAAAAAAAAAQNys+phfxq/uSeSBuVn1ML+NX9yBAQAA6TGGFLhhWrpW1TFdTV1OyppJ12JJG5EXL4zdbJU/opzZcKuwlbsZ6NrZariiMRaGndTzMb0oJEiTVen2K3ihVrF+GLlhG9TWu7wc3NHk6ORq5smZwexeKL9G5doGiJr0JaW0s6QYbxVPnberR1km+lXgx6+p2L6PxerCgAvs5FVVRUyUFZ9EWmObDTIbLiPXqbOnQimTpS0bez4TO7enDPqlkqSppq6jiqqOpiqKaobrRSxORzXNX0muQDMAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAOlkiuRWuXghiqZ4aWnlqKmaKniibrSSyvRrWtTi5V3IVs0v6X5MS87ZMNPdT2ZejNOqK2St/q1ncu1ePqgbDTbpabdo58NYTmT9HdStrWL/AHn/AONi/wDT7Xelu6vXhEAAdXo7wXXY3xFHbqXOKnbquqqlUzbBH/uXc1OK92aniwbhi5YuvkFptMSPkkRXySP6kLOMjl4ImzxXJO4t3gjCltwbYYrXa27OtNO9Mnzyek539E4JsA2FmtdJZrXS2y2RcxSUkaRxNbwanFe1V3qvFT2gAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAgblZ9TC/jV/ck8kDcrPqYX8av7kCAgABePCv7r2j+Ag/loa3H2C7ZjeyPt10YrJGK59PUsZ04H+s3tRfSbx8clTZYV/dez/wEH8tDZgUmxfhi5YRvU1ru8HNzR5OjkaubJmcHsXii/RuXaaIuvjbB9oxnZlobxDmjdZ8NS39pA5fSavyJmm5SrGkLAF4wJcuauLEno5XKlNWxM6E3cvqu7Wr8mabQOPO50aaSrrgSq1I18stcr856J7uj8Zi+i76F48MuGAF18G4xsmMrctbY6xZHRp7rTOTVmh7nM/qmaLwU35Rm0XWts9whr7ZVy0VTEvRlhfquT8U7UXYpP2jnTzR17G0ONtWhqeq2tiavMycOkiZ6i9/V39UCaAYqWohq4G1FNLFUQzM12yxOR8bm9ypsUygAAAAAAAAAAAAAAAAAAAAAAAxzyx00D5aiVsUMTdZ0sjka1qJ6SquxEAyGhxfi2zYPtiV98qVYm6CFnSmqHdjW8d6bdycVIy0h6eaK387RYJRtdU9R9dKz3KP4jdivXvXo7E6yECXm73C93B9dd6yatqpetLK7WVe5OxO5NgHU6SdJV5x1U83UO8jtTH5w0UTuine9fSdu7k4Im04YAAb/AAfhe64vvTbXZabnpHdKSR+xkLPXc7gn0ruQ9mAsDXjHF08mtcXN0zFzqatzPcoG/wBXdjU2r4ZqlrsGYRtODLK23WiHUTY6aZ/7Wd/a5fsTcnADx6O8DWzAtk8kovdaiXVdVVbmZPmen2NT0W8M/W2r1IAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAgblZ9TC/jV/ck8kDcrPqYX8av7kCAgABePCv7r2f+Ag/lobM1mFf3Xs/8BB/LQ2YA8d1tdFeLfLb7nTRVdJUM1JI5eq78F7FTah7ABV7SZoZumGlkuVhSS6Wja7VamtUUzfhInWanrJ35ohFRfZFVFzQjHSRoZs+KXSV9m5q03d3S1mt/V6h3w2puX4Te1c0cBVcG5xNhm7YWuS0N9opaSRUzaq7WyN9Zrtzk8DTAdJg/G2IcHVSvsFwdExXa0lO7pwyeLV2cN6ZL3k7YO094fujGQYmhkstZu51iOkgduTenSbvXemSZdYrKAL30FdS3GlZWUFXBWUz+rLBK2SN3zkM5Ryy3u52CrWqstwqaCfcr4JFbrJ2Km5U7lJUw3yhrzSRNhxFbYbs1EySaJ/k0m/arkRFavyI0Cx4I3sWnLBN0RraqqqLVLuRlZAuS/OZrNy8cjv7XcaG606z2qtpq6DPLXpJ2yNz+M1QPSAqKm9AAAAAAAAD6iKu5MwPgPJdLlbrPTpNdbhR0MblyR9VM2Fqr85Thb1pwwRas2RV1Tc3NdqqyhgVyJ36z9VvsVQJFMNdVU9DRyVVbUQUsDEzfLPKkbG+KrsK74n5Qt8rdeLDVDT2uNf8edefm8URegnhk4iq+Xy63+rSqvVwqa+dM0RZ5Fdqp3JuRO5ALDY209WS1a9LhqJLzW8Z1zjpmu28es7huyTb1iDsY48xHjGbO93Bz4EdrMpIk1IW7eDU3797s17zlwAAN9hTC15xbcVo7DQvq5E2yP2JHEna567E+1ctgGhJa0V6Gq3E6RXXEHO0Fny12RdWaqbw1UXqNX1l38N+sSXo80K2TDaR119SK9XRqa2T2508LvgtXrrn6TuxMkQlJVVVzVQPDZ7XQ2a3xW+0UUNJRxdFsUTej4969qrtU9oAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAACBuVn1ML+NX9yTyQNys+phfxq/uQICAAF48K/uvZ/4CD+WhszWYV/dez/AMBB/LQ2YAAAAAB47rbLfd6F9DdqSCtpnZK+KdqOb3O27l795C+OuT7E7XrMF1XMv6/6PrH9Heuxkm9OCZOz+MToAKOXyyXXDtc+hvdDNRVLPQlblrJnvRdzk2b0zQ1heu6Wyhu1K6ju9DBW0rlz5qoiSRuz0sl3L3kWYo5P2H69HS4erKm0Spl7k7OeDZ3Kuuir8ZfACs4O5xRomxjh5XOmtb7hTrs8pt+c7PlRE1k+VqHELmrsskzTgm0D8mWCSWCRJYJJI3pucxyoqfKhiAHY2rShji1uVafE1xfn/wBy5Kn+bnkdBbtPuNaNqpUOt1wz41FLq5f+NWkXACZ6TlGYhYv65ZLXN/8ASssf2ucbGPlJyp+0wpEvxK5W/dqQOAJzqeUjWu/uuGaWL49W532NQ10/KLxMq/q9ps8afCbMv2SIQ6AJPumnrHFbq+TT0Nuy/wC2pUdn/wCVXnNXHSNjS4Sa9Rie5tXdqw1DoG/6WZIcqAM08ks8zpqh8kj3rm58jlVzvlUwgAAfpqIu9cju8M6IsZ4jdrRWp1ugdn7tcc4Gpx2Ny11+RuQHBG1sFhu2I65KKyW6evn4tibsb3uXc1O9VRCfsMcnyxUOrLiSvnus3/Qi9wh3dVcs3rt45t8CV7TbKCz0TaS00lPRUrFz5qniRrdu/PLeveBCeCuT11KnGFd8LyGhd4bHSL8uxqfOJrs9pt9ktzKG00cFDTRbWxRN1Wp3r2r3rtPaAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABA3Kz6mF/Gr+5J5Ix5RGF6vEODIam2Ui1NXa5ueVGp0+YVipJqpxX9mqp8ECq4BvMI4drsVYhpbRbY3SSVMiI97W5pDHmmtIvYiJ+AFx8K/uvZ/4CD+Whsz8RRRQQMggjSOGONImsT0Wp0WtP2AAAAAAAAAAABFyXYuRqr7hyy39iNvlpoa1Ubqo6ohRz2J8F3WT5FNqAIoxByfsK13OPtc1dZ37EYxsnPxJ35P6X/ucRc+TpiGKRyWq822si7Zucgkd81Ecn0ljgBUW4aHse0Ub3vw/JMxFyzp5opVX5rXa30HP1WEsSUTUfV4du8DV4zUMrPpVpdo+o5eCqBQyRr411JGuYvYqKn2mMvsjnO3OX2n5ka1/wC0ZG/47EAoWZ6elnqFyp4JJu5jFd9iF741a1MokaidjURp91nesvtApNRYPxLW9Kjw5dqhqLlmyikVvyqiZIdFQ6FsfVmqq2XyZjvSqKmJmXya2t9BbdVVd6qp8ArjbOTrfpZ0S6X210sPrU/OTuT5qoxPpO4sXJ/wlQKx90mr7s7c9r5OYi8cmZO/9iVgBqLHhaw2DVWx2ahoZFTV52KBNfLsV/Wd7Tbque8AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABFVFzQADir3omwReqlampsccM73ayvppHQI/Pta1dXb25Zm8wzhOw4VgfDh22Q0KTZc45iq570TgrnKrlTb2m5AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAf//Z"
-REFRESH_ICON = io.BytesIO(base64.b64decode(REFRESH_ICON_DATA))
-CONFIG_PATH = os.path.join(BASE_DIR, 'config.json')
-DB_PATH = os.path.join(BASE_DIR, 'slim.db')
-
-# 让中文正常
-rcParams['font.family'] = 'SimHei'
-rcParams['axes.unicode_minus'] = False
-
-matplotlib.use("TkAgg")
-
-# ---------------- 工具 ----------------
-def center(win):
-	win.update_idletasks()
-	x = (win.winfo_screenwidth() - win.winfo_width()) // 2
-	y = (win.winfo_screenheight() - win.winfo_height()) // 2
-	win.geometry(f"+{x}+{y}")
-
-# 划时间区间 当前时间 - 时间维度
-def subtract_months(date, months):
-	if months == 0:
-		return date.replace(year=1900, month=1, day=1)  # 全部：远早起点
-	elif months < 1:
-		days = int(months * 30.44)  # 平均每月天数
-		return date - datetime.timedelta(days=days)
-	else:
-		month = date.month - months
-		print(f"date: {date.date()} {months=} {month=}")
-		year = date.year
-		while month <= 0:
-			month += 12
-			year -= 1
-		# print(f"start: {date.replace(year=year, month=month, day=1).date()} end: {date.date()}")
-		# print(f"{date.replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0)}")
-		return date.replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0)
-
-# ---------------- 数据层 ----------------
-def load_cfg():
-	if not os.path.exists(CONFIG_PATH):
-		return {"persons": []}
-	return json.load(open(CONFIG_PATH, encoding='utf-8'))
-
-def save_cfg(cfg):
-	json.dump(cfg, open(CONFIG_PATH, 'w', encoding='utf-8'), ensure_ascii=False, indent=2)
-
-def init_db():
-	with sqlite3.connect(DB_PATH) as conn:
-		conn.execute('''
-			CREATE TABLE IF NOT EXISTS records (
-				id INTEGER PRIMARY KEY AUTOINCREMENT,
-				person TEXT NOT NULL,
-				time TEXT NOT NULL,
-				weight float NOT NULL,
-				note TEXT,
-				bmi float
-			)
-		''')
-
-def insert_record(person, time, weight, note, bmi):
-	with sqlite3.connect(DB_PATH) as conn:
-		conn.execute('''
-			INSERT INTO records(person, time, weight, note, bmi)
-			VALUES(?,?,?,?,?)
-		''', (person, time, weight, note, bmi))
-
-def fetch_records(person):
-	with sqlite3.connect(DB_PATH) as conn:
-		return conn.execute(
-			'SELECT time, weight, note, bmi FROM records WHERE person=? ORDER BY time',
-			(person,)
-		).fetchall()
-
-# ---------------- BMI 评价 ----------------
-BMI_MALE = [(0, 18.4, '偏瘦'), (18.5, 23.9, '正常'), (24, 27.9, '超重'), (28, 999, '肥胖')]
-BMI_FEMALE = [(0, 17.4, '偏瘦'), (17.5, 22.9, '正常'), (23, 26.9, '超重'), (27, 999, '肥胖')]
-
-def bmi_level(bmi, sex):
-	tbl = BMI_MALE if sex == '男' else BMI_FEMALE
-	for low, high, level in tbl:
-		if low <= bmi <= high:
-			return level
-	return '未知'
-
-def calc_bmi(weight: float, height: float) -> float:
-	"""计算 BMI，保留 2 位小数"""
-	if height <= 0:
-		return 0.0
-	print(f"{weight=} {height=} {round(weight / ((height / 100) ** 2), 2)=}")
-	return round(weight / ((height / 100) ** 2), 2)
-
-# ---------------- 单位换算 ----------------
-UNIT2KG = {'kg': 1, '公斤': 1, '斤': 0.5, 'lb': 0.453592}
-KG2UNIT = {k: 1/v for k, v in UNIT2KG.items()}
-
-def to_kg(val, unit): # 用户输入 → kg
-	return val * UNIT2KG[unit]
-
-def to_show_unit(val, unit): # kg → 用户单位
-	return round(val * KG2UNIT[unit], 2)
-
-# ---------------- 主程序 ----------------
-class App(tk.Tk):
-	def __init__(self):
-		super().__init__()
-		self.title("体重记录器")
-		self.minsize(540, 1)
-		self._init_data()
-
-		# 先把所有数据读进内存
-		self.all_records = {} # {person_name: [(time, weight, note, bmi), ...]}
-		self.person = None # 当前人物 dict
-		self.unit = None # 当前显示单位
-		self.show_input = False
-		self.refresh_persons() # 读取所有记录
-
-		self.build_ui() # 渲染UI
-		self.after_idle(self.populate_ui) # 统一填充数据
-
-	def populate_ui(self):
-		# 填人物下拉框
-		names = list(self.all_records.keys())
-		self.cb_person['values'] = names
-		if names:
-			self.cb_person.current(0)
-			self.switch_person()
-
-	# ---------------- 逻辑 ----------------
-	# ---------- 统一初始化 ----------
-	"""返回 (cfg, records) 或触发向导后重新加载"""
-	def _init_data(self):
-		# 配置文件
-		self.cfg = load_cfg()
-		if not self.cfg['persons']:
-			self.wizard()
-			self.cfg = load_cfg()
-
-		# 2. 数据库
-		init_db()
-		self.records = {}
-		with sqlite3.connect(DB_PATH) as conn:
-			for name in [p['name'] for p in self.cfg['persons']]:
-				rows = conn.execute(
-					'SELECT time, weight, note, bmi FROM records WHERE person=? ORDER BY time',
-					(name,)
-				).fetchall()
-				self.records[name] = rows
-
-	"""重新读取配置+数据库并重绘界面"""
-	def refresh(self):
-		self.refresh_persons() # 刷新人物数据
-		self.populate_ui() # 刷新下拉框
-		self.update_scope_buttons() # 刷新时间维度按钮
-		self.draw_chart() # 重绘折线图
-
-	"""读取所有数据"""
-	def refresh_persons(self):
-		self.cfg = load_cfg() # 读取配置
-		self.wizard_if_need() # 没有人物就跳出向导来创建
-		self.person = self.cfg['persons'][0]
-
-		self.all_records.clear()
-		for name in [p['name'] for p in self.cfg['persons']]:
-			rows = fetch_records(name)
-			self.all_records[name] = rows
-		
-		if not self.all_records:
-			init_db()
-
-	def switch_person(self, *_):
-		name = self.cb_person.get()
-		self.person = next((p for p in self.cfg['persons'] if p['name'] == name), None)
-		if self.person:
-			self.lbl_unit.config(text=self.person['unit'])
-			self.update_scope_buttons()
-
-	# ---------------- 向导 ----------------
-	def wizard_if_need(self):
-		# 阻塞向导直到有人物
-		while not self.cfg['persons']:
-			self.wizard()
-			self.cfg = load_cfg()
-
-	def wizard(self, edit=None):
-		top = tk.Toplevel(self)
-		top.title('添加人物' if edit is None else '修改人物')
-		center(top)
-		
-		# 默认值
-		defaults = edit or dict(name='默认', height=175, unit='kg', sex='男', source='日常')
-
-		fields = {}
-		labels = ['姓名', '身高(cm)', '性别', '单位', '数据源']
-		keys = ['name', 'height', 'sex', 'unit', 'source']
-		widgets = []
-
-		for i, (lab, key) in enumerate(zip(labels, keys)):
-			ttk.Label(top, text=lab).grid(row=i, column=0, sticky='w', padx=5, pady=3)
-			if key == 'sex':
-				cb = ttk.Combobox(top, state='readonly', values=['男', '女'], width=17)
-				cb.set(defaults[key])
-				cb.grid(row=i, column=1, padx=5)
-				widgets.append(cb)
-			elif key == 'unit':
-				cb = ttk.Combobox(top, state='readonly', values=['kg', 'lb', '公斤', '斤'], width=17)
-				cb.set(defaults[key])
-				cb.grid(row=i, column=1, padx=5)
-				widgets.append(cb)
-			else:
-				ent = ttk.Entry(top, width=20)
-				ent.insert(0, str(defaults[key]))
-				ent.grid(row=i, column=1, padx=5)
-				widgets.append(ent)
-			fields[key] = widgets[-1]
-
-		def save():
-			name = fields['name'].get().strip()
-			if not name:
-				messagebox.showerror('错误', '姓名不能为空')
-				return
-			
-			person = {
-				'name': name,
-				'height': float(fields['height'].get()),
-				'sex': fields['sex'].get(),
-				'unit': fields['unit'].get(),
-				'source': fields['source'].get()
-			}
-
-			# 去重
-			self.cfg = load_cfg()
-			if edit is None: # 新增用户
-				self.cfg['persons'].append(person)
-			else: # 编辑用户
-				idx = next(i for i, p in enumerate(self.cfg['persons']) if p['name'] == edit['name'])
-				self.cfg['persons'][idx] = person
-			save_cfg(self.cfg)
-			self.cfg = load_cfg() # 立刻重新读文件
-			top.destroy()
-
-		ttk.Button(top, text='保存', command=save).grid(row=len(labels), columnspan=2, pady=8)
-		top.transient(self) # 保持主窗可见
-		self.wait_window(top)
-
-	# ---------------- UI ----------------
-	def build_ui(self):
-		# 顶部人物栏
-		self.bar = ttk.Frame(self)
-		self.bar.grid(row=0, column=0, sticky='ew', padx=20, pady=(10, 5))
-		self.bar.grid_columnconfigure(2, weight=1)
-
-		ttk.Label(self.bar, text='人物').grid(row=0, column=0)
-		self.cb_person = ttk.Combobox(self.bar, state='readonly', width=10)
-		self.cb_person.grid(row=0, column=1, padx=(10, 0))
-		self.cb_person.bind('<<ComboboxSelected>>', self.switch_person)
-
-		# 添加空白
-		ttk.Label(self.bar, text=(' ' * int((self.winfo_width() - 150 - 200) / 4))).grid(row=0, column=2, sticky='nsew', padx=5, pady=5)
-
-		# 折叠/展开按钮
-		self.btn_toggle = ttk.Button(self.bar, text='添加数据', command=self.toggle_input)
-		self.btn_toggle.grid(row=0, column=4)
-		ttk.Button(self.bar, text='编辑人物', command=self.edit_person_win).grid(row=0, column=5, padx=5)
-
-		ico = Image.open(REFRESH_ICON)
-		self.ico_img = ImageTk.PhotoImage(ico.resize((17, 17)))
-		self.btn_refresh = ttk.Button(self.bar, image=self.ico_img, command=self.refresh)
-		
-		self.btn_refresh.grid(row=0, column=6)
-
-		# 输入框容器（初始隐藏）
-		self.input_frm = ttk.Frame(self)
-		
-		# 时间
-		ttk.Label(self.input_frm, text='时间').grid(row=1, column=0)
-		self.var_time = tk.StringVar(value=datetime.datetime.now().strftime('%Y.%m.%d %H:%M:%S'))
-		ttk.Entry(self.input_frm, textvariable=self.var_time, width=18).grid(row=1, column=1, padx=(5, 10))
-
-		# 体重
-		ttk.Label(self.input_frm, text='体重').grid(row=1, column=2)
-		self.var_w = tk.DoubleVar(value=75.00) # 默认75
-		self.var_w.set(f"{to_show_unit(75, self.person['unit']):.2f}")
-		ttk.Entry(self.input_frm, textvariable=self.var_w, width=6).grid(row=1, column=3, padx=(5, 2))
-		self.lbl_unit = ttk.Label(self.input_frm) # ← 加这一行
-		self.lbl_unit.config(text=self.person['unit'] if self.person else 'kg')
-		self.lbl_unit.grid(row=1, column=5, padx=(0, 5))
-
-		# 备注
-		ttk.Label(self.input_frm, text='备注').grid(row=1, column=6)
-		self.var_note = tk.StringVar()
-		ttk.Entry(self.input_frm, textvariable=self.var_note, width=12).grid(row=1, column=7, padx=(5, 10))
-
-		ttk.Button(self.input_frm, text='确认添加', command=self.add_record).grid(row=1, column=8, padx=(5, 0))
-
-		self.input_frm.lower() # 先放到最底层
-		self.input_frm.grid(row=1, column=0, sticky='ew', padx=20, pady=5)
-		self.input_frm.grid_remove()
-
-		# 图表
-		self.fig = Figure(figsize=(5, 2.8), dpi=100)
-		self.ax = self.fig.add_subplot(111)
-		self.canvas = FigureCanvasTkAgg(self.fig, self)
-		self.canvas.get_tk_widget().grid(row=2, column=0, sticky='nsew', padx=20, pady=(5, 20))
-
-		# 时间维度按钮区
-		self.time_bar = ttk.Frame(self)
-		self.time_bar.grid(row=3, column=0, sticky='ew', padx=10, pady=2)
-
-		self.time_vars = ['7天', '15天', '1月', '3月', '半年', '1年', '3年', '5年', '全部']
-		for i in range(len(self.time_vars) + 2):
-			self.time_bar.grid_columnconfigure(i, weight=1)
-
-		self.time_btn = {}
-		for i, t in enumerate(self.time_vars):
-			btn = ttk.Button(self.time_bar, text=t, width=6, command=lambda x=t: self.switch_time_scope(x))
-			btn.grid(row=0, column=i+1, padx=2)
-			self.time_btn[t] = btn
-
-		self.scope = self.cfg.setdefault('time_scope', '7天') # 默认
-		self.switch_time_scope(self.scope)
-
-		# 鼠标悬停提示
-		self.anno = None
-		self.canvas.mpl_connect('motion_notify_event', self.on_hover)
-
-	def update_scope_buttons(self):
-		"""根据现有数据跨度，决定哪些时间维度可见"""
-		if not self.person: # 没人就全隐藏
-			scopes = []
-		else:
-			rows = fetch_records(self.person['name'])
-			if not rows: # 只有“全部”
-				scopes = ['全部']
-			else:
-				# 最早-最晚 相差天数
-				times = [datetime.datetime.strptime(r[0], '%Y.%m.%d %H:%M:%S') for r in rows]
-				span_days = (max(times) - min(times)).days
-				scopes = ['全部']
-				if span_days >= 0: # 任何数据都有“全部”
-					scopes.append('7天')
-				if span_days >= 7:
-					scopes.append('15天')
-				if span_days >= 15:
-					scopes.append('1月')
-				if span_days >= 30:
-					scopes.append('3月')
-				if span_days >= 90:
-					scopes.append('半年')
-				if span_days >= 365:
-					scopes.append('1年')
-				if span_days >= 365*3:
-					scopes.append('3年')
-				if span_days >= 365*5:
-					scopes.append('5年')
-
-		# 统一按钮显隐
-		for s, btn in self.time_btn.items():
-			if s in scopes:
-				btn.grid()
-				btn.state(['!pressed'])
-			else:
-				btn.grid_remove()
-		
-		scopes = [s for s in self.time_vars if s in scopes]
-		# 默认选中第一个可用
-		if scopes:
-			self.switch_time_scope(scopes[0])
-		
-		# 动态调整布局
-		self.adjust_time_buttons_layout(scopes)
-
-	def adjust_time_buttons_layout(self, scopes):
-		"""动态调整时间按钮布局，确保居中且间距均匀"""
-		# 清除旧的权重配置
-		for i in range(len(self.time_vars) + 2):
-			self.time_bar.grid_columnconfigure(i, weight=0)
-
-		# 重新配置权重
-		for i in range(len(scopes) + 2):
-			self.time_bar.grid_columnconfigure(i, weight=1)
-
-		# 重新放置按钮
-		for i, scope in enumerate(scopes):
-			self.time_btn[scope].grid(row=3, column=i + 1)
-
-	def switch_time_scope(self, scope):
-		"""根据时间维度过滤并重绘"""
-		self.scope = scope
-		self.cfg['time_scope'] = scope
-		save_cfg(self.cfg)
-
-		# 高亮按钮
-		for b in self.time_btn.values():
-			b.state(['!pressed'])
-		self.time_btn[scope].state(['pressed'])
-
-		self.draw_chart()
-
-	def draw_chart(self):
-		self.ax.clear()
-
-		# --------- 数据 ---------
-		if not self.person:
-			self.show_placeholder()
-			return
-		rows = fetch_records(self.person['name'])
-		if not rows:
-			self.show_placeholder()
-			return
-		
-		# 时间过滤
-		now = datetime.datetime.now()
-		delta_map = {'7天': 0.25, '15天': 0.5, '1月': 1, '3月': 3, '半年': 6, '1年': 12, '3年': 12*3, '5年': 12*5, '全部': 0}
-		months = delta_map[self.scope]
-		cutoff = subtract_months(now, months=months)
-		if months != 0:
-			rows = [r for r in rows if datetime.datetime.strptime(r[0], '%Y.%m.%d %H:%M:%S') >= cutoff]
-
-		if not rows:
-			self.show_placeholder()
-			return
-
-		times = [datetime.datetime.strptime(r[0], '%Y.%m.%d %H:%M:%S') for r in rows]
-		weights = [to_show_unit(r[1], self.person['unit']) for r in rows]
-		bmis = [r[3] for r in rows]
-		notes = [r[2] for r in rows]
-
-		# --------- X 轴仅三个刻度 ---------
-		if months != 0: # 不为全部
-			start = cutoff
-		else: # 为全部
-			start = times[0]
-		end = now
-		mid = start + (end - start) / 2
-		print(f"start: {start.date()} end: {end.date()}")
-
-		self.ax.set_xlim(start, end)
-		self.ax.set_xticks([start, mid, end])
-		self.ax.xaxis.set_major_formatter(DateFormatter('%Y.%m.%d'))
-		xlim = self.ax.get_xlim()
-		pad = (xlim[1] - xlim[0]) * 0.05
-		self.ax.set_xlim(xlim[0], xlim[1] + pad)
-		self.ax.set_xlabel('')
-
-		# --------- Y 轴动态整十 ---------
-		y_min, y_max = min(weights), max(weights)
-		print(f"{y_min=}{self.person['unit']} {y_max=}{self.person['unit']}")
-		y_low = math.floor(y_min / 5) * 5
-		y_high = math.ceil(y_max / 5) * 5
-		print(f"{y_low=}{self.person['unit']} {y_high=}{self.person['unit']}")
-		self.ax.set_ylim(y_low, y_high)
-		self.ax.set_yticks(range(y_low, y_high + 1, 5))
-		self.ax.set_ylabel(f'体重({self.person["unit"]})')
-		# y_show = [to_show_unit(w, self.person['unit']) for w in weights]
-		# self.ax.set_yticks([to_show_unit(v, self.person['unit']) for v in range(y_low, y_high+1, 10)])
-
-		# 只留坐标轴
-		self.ax.spines['top'].set_visible(False)
-		self.ax.spines['right'].set_visible(False)
-
-		# --------- 画折线+点 ---------
-		self.ax.plot(times, weights, marker='o')
-
-		# 保存数据用于悬停
-		self.hover_time = times
-		self.hover_weight = weights
-		self.hover_bmi = bmis
-		self.hover_note = notes
-
-		self.canvas.draw()
-
-	def show_placeholder(self):
-		self.ax.text(0.5, 0.5, "暂无数据", ha='center', va='center')
-		self.canvas.draw()
-
-	def toggle_input(self):
-		self.show_input = not self.show_input
-		if self.show_input:
-			self.input_frm.grid()
-			self.btn_toggle.config(text='收起输入')
-			# 刷新时间为“年-月-日 时:分:秒”
-			self.var_time.set(datetime.datetime.now().strftime('%Y.%m.%d %H:%M:%S'))
-		else:
-			self.input_frm.grid_remove()
-			self.btn_toggle.config(text='添加数据')
-
-	def on_hover(self, event):
-		if not hasattr(self, 'hover_time'):
-			return
-		
-		x, y = event.xdata, event.ydata
-		if x is None or y is None:
-			if self.anno:
-				self.anno.remove()
-				self.anno = None
-				self.canvas.draw_idle()
-			return
-
-		# 找最近点
-		idx = min(range(len(self.hover_time)), key=lambda i: abs(date2num(self.hover_time[i]) - x))
-		d, w, b, n = self.hover_time[idx], self.hover_weight[idx], self.hover_bmi[idx], self.hover_note[idx]
-		# print(f"{d=} {w=} {b=} {n=}")
-		if n: # 有备注
-			# txt = f"{d.strftime('%Y.%m.%d')}\n{w:.2f} kg\nBMI {b:.1f} {bmi_level(b, self.person['sex'])}\n{n}"
-			txt = f"{d.strftime('%Y.%m.%d')}\n{d.strftime('%H:%M:%S')}\n{w:.2f} {self.person['unit']}\n{b} {bmi_level(b, self.person['sex'])}\n{n}"
-		else:
-			# txt = f"{d.strftime('%Y.%m.%d')}\n{w:.2f} kg\nBMI {b:.1f} {bmi_level(b, self.person['sex'])}"
-			txt = f"{d.strftime('%Y.%m.%d')}\n{d.strftime('%H:%M:%S')}\n{w:.2f} {self.person['unit']}\n{b} {bmi_level(b, self.person['sex'])}"
-		
-		# 计算提示框坐标
-		x, y = date2num(d), w
-		ax = self.ax
-
-		# 把提示放在点右边，如超出右边界就改放左边
-		if x > ax.get_xlim()[1] * 0.9: # 距离右边界 10% 以内
-			xytext = (-40, 10) # 向左偏移
-		else:
-			xytext = (10, 10) # 默认向右
-		
-		if self.anno:
-			self.anno.set_text(txt)
-			self.anno.xy = (date2num(d), w)
-			self.anno.ha ='center'
-			self.anno.va='center', 
-		else:
-			self.anno = self.ax.annotate(
-				txt, xy=(date2num(d), w),
-				ha='center', va='center', 
-				xytext=xytext, textcoords='offset points',
-				bbox=dict(boxstyle='round', alpha=0.7, facecolor='lightyellow'))
-		self.canvas.draw_idle()
-
-	# ---------------- 人物编辑窗口 ----------------
-	def edit_person_win(self):
-		top = tk.Toplevel(self)
-		top.title('人物管理')
-		top.transient(self)
-		center(top)
-
-		cols = ('姓名', '身高(cm)', '性别', '单位', '数据源')
-		tree = ttk.Treeview(top, columns=cols, show='headings', height=6)
-		for c in cols:
-			tree.heading(c, text=c)
-			tree.column(c, width=80, anchor='center')
-		tree.pack(padx=10, pady=5)
-
-		def refresh():
-			for item in tree.get_children():
-				tree.delete(item)
-			for p in self.cfg['persons']:
-				tree.insert('', 'end', values=(p['name'], p['height'], p['sex'], p['unit'], p['source']))
-
-		refresh()
-
-		bar = ttk.Frame(top)
-		bar.pack(pady=5)
-		ttk.Button(bar, text='新增', command=lambda: (self.wizard(), refresh())).pack(side='left', padx=5)
-		ttk.Button(bar, text='修改', command=lambda: self.modify_selected(tree, refresh)).pack(side='left', padx=5)
-		ttk.Button(bar, text='删除', command=lambda: self.delete_selected(tree, refresh)).pack(side='left', padx=5)
-
-	def modify_selected(self, tree, refresh):
-		sel = tree.selection()
-		if not sel:
-			return
-		vals = tree.item(sel[0], 'values')
-		person = dict(name=vals[0], height=float(vals[1]), sex=vals[2], unit=vals[3], source=vals[4])
-		self.wizard(edit=person)
-		refresh()
-		self.refresh()
-
-	def delete_selected(self, tree, refresh):
-		sel = tree.selection()
-		if not sel:
-			return
-		name = tree.item(sel[0], 'values')[0]
-		self.cfg['persons'] = [p for p in self.cfg['persons'] if p['name'] != name]
-		save_cfg(self.cfg)
-		refresh()
-		self.refresh_persons()
-
-	# ---------------- 添加记录 ----------------
-	def add_record(self):
-		if not self.person:
-			messagebox.showwarning("提示", "请先选择人物")
-			return
-		try:
-			w_show = round(self.var_w.get(), 2)
-			w_kg = to_kg(w_show, self.person['unit'])
-			bmi = calc_bmi(w_kg, self.person['height'])
-			insert_record(self.person['name'], self.var_time.get(), w_kg, self.var_note.get(), bmi)
-			
-			# self.draw_chart()
-			self.update_scope_buttons()
-			time = datetime.datetime.now().strftime('%Y.%m.%d %H:%M:%S')
-			self.var_time.set(time)
-		except Exception as e:
-			messagebox.showerror("错误", str(e))
-
-# ---------- 启动 ----------
-if __name__ == '__main__':
-	App().mainloop()
+import time
+_T0 = time.perf_counter() # 启动计时起点，见 StartupProfile
+
+import io, sys, copy, math, base64, queue, shutil, datetime, threading, multiprocessing
+
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+# PIL、numpy 导入很慢，窗口先出来，第一次空闲时再导入（见 App.finish_startup）；matplotlib 只在渲染线程里导入
+
+from store import RecordStore, TIME_FMT, to_epoch, from_epoch
+from notes import TOKENIZER
+from utils import DB_PATH, CHART_SIZE, COMPARE_METRICS, OVERLAYS, SCOPE_MONTHS, SAVE_DELAY_MS, WATCH_MS
+from utils import load_cfg, save_cfg, load_persons, subtract_months
+from utils import calc_bmi, to_kg, to_show_unit
+from importer import import_file
+from exporter import export
+
+REFRESH_ICON_DATA = b"/9j/4AAQSkZJRgABAQAAAQABAAD/2wBDAAgFBgcGBQgHBgcJCAgJDBMMDAsLDBgREg4THBgdHRsYGxofIywlHyEqIRobJjQnKi4vMTIxHiU2OjYwOiwwMTD/2wBDAQgJCQwKDBcMDBcwIBsgMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDAwMDD/wAARCAIAAgADASIAAhEBAxEB/8QAHAABAAIDAQEBAAAAAAAAAAAAAAcIAwUGBAEC/8QATxAAAQMCAgUHBQwHBgYDAQAAAAECAwQFBhEHEiExQQgTIjJRYXEUF0JSkSNWYnKBgqGkscPR0xUkMzZ0s8EWNENVktIlRFNUk6Jjc6Ph/8QAFAEBAAAAAAAAAAAAAAAAAAAAAP/EABQRAQAAAAAAAAAAAAAAAAAAAAD/2gAMAwEAAhEDEQA/AJ2AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAGmxNiyw4VgZNiK5w0KTZ8216K570TijWorlTb2GjsmlnBF6qUpqa+RwzvdqoypjdAj8+xzk1dvZnmB2oCoqLkoAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAACJnuNRfMU2GwayXy80NDIqa3NSzpr5dqM6zvYBtwRTfeUBhKgV7LXDX3Z29jmR8xF4Zvyd/6nD3PlFX6WdVtditdLD6tRzk7k+cisT6ALHH1EVdyKVIr9NOPqzWRL15Mx3o09NEzL5dXW+k52txfiWt6NbiG7VDUXPKStkVvyIq5IBdnVd6q+w+SI1qZyq1E7XKjSiFRVT1C51E8k3e96u+1TABfSNzX/ALN8b/iPQ/Stc7e1fYUJMkbnxrrxucxe1FVPsAvmrV4op8KS0uLcSUTVZSYiu8DV4Q10rPoRx0Fv0w49oo2MZiCSZiLnlUQxSqvznN1vpAt0CuNs5ReIYpGrdbNbayLsh5yCR3zlVyfQdvh/lA4VrubZdIa6zv2q97o+fiTuzZ0v/QCVwaqxYjst/YrrHdqGtVG6ytp5kc9ifCb1k+VDaqmS7UyAAAAAAAAAAAAfiWWKCB888iRwxxrK56+i1Ok5x+zWYq/de8fwE/8ALUCnGLsRV2KsQ1V3uUjpJKmRVYxzs0hjzXVjTsRE/E0YAFqOTviirxDgyamudWtTV2ubmUVy9PmFYix6y8V/aIi/BJOIG5JnUxR40n3xPIAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAHivF2t9ktz667VkFDTRbHSyu1Wp3J2r3JtIUxryhevTYPofg+XVzfHa2NPk2uX5oE2Xa52+zUL6u71cFFStXLnaiVGtTPciZ717iKMT8oOxUOtFhugnus3/Xl9wh3dZM83rt4ZN8SAb/frtiOuWtvdxnr5+DpXbGp2NTc1O5ERDVAd7ibS7jPEbtWW6ut0DsvcbdnA1OG12euvyuyOEcqLuTI/IAAGaCOWeZsNOySR71yayNqq53yIBhB1Vu0c40uEmpT4YubV3601O6Bv+p+SHS2vQLjit1vKYKG3Zf9zVI7P/xI8CMATFBydMTKv6xdrPGnwXTL9saGxpuTdWu/vWJqWL4lI532uQCDATxJybJU/Z4riX49CrfvFNdV8nPELF/U73a5v/uSWP7GuAhgEo3HQFjWjai07bdcM+FPVauX/kRpz910X44tbkSowzcX5/8AbNSp/lZ5AccDLPHLBIsU8ckb03te1UVPkUxAfpM1dnmmacV2nb4X0s4xw8rWw3R9wp12+TXDOdnyKq6yfI5DhgBZjC/KBw/Xo2LENHU2iVM/dW5zwbO9E10Vfir4kp2u50N2pW1loroK2lcuXO08qSN2ejmm5e4oobOx3u64drmV1krpqKpZ6cTstZM9ypucmzcuaAXjBBeBeUFE7Uo8aUvMv6n6Qo2dHem18e9OK5tz+KTRarnb7vQsrrTVwVtM7NGSwORze9uzcvdvA9gAAAAAazFX7r3j+An/AJamzNZir917x/AT/wAtQKOAACfeSZ1MUeNJ98TyQNyTOpijxpPvieQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAHivF0obNb5bhd62Gko4uk6WV3R8O9exE2qB7kRVXJEIt0h6arJhtJKGxLFero1NXNjs6eF3wnJ11z9FvYuaoRppU0y1uJ0ltWH+doLPlqPl6s1U3jrKnUavqpv479UiUDfYrxTecW3FKy/Vz6uRNkbNiRxJ2NYmxPtXLaaEAADqMHYDxHjGbKyW9z4Edqvq5V1IW7eLl379zc17iccE6BbJatSqxLKl5reECZx0zXbOHWdx35Jt6oFebHY7rf6taWy2+pr50yVUgjV2qneu5E71JVwxyer5W6kuJa6ntca/4ECc/N4KqdBPHNxYihpaeho46Wip4KWBiZMigiSNjfBE2GYCOrLoPwRasny0NTc3NdrI+unVyJ3arNVvtRTurXbbdZ6dYbVb6OhjcuaspYWwtVfmoesAfVVV3rmfAAAAAAAAEVU3KAB5rpbqG606QXWipq6DPPUq4GyNz+K5DgL7oNwTdEc6lpai1S71fRzrkvzX6zcvDIkgAVwxJyebzSROmw7cobs1EzWGVnk0m/YjVVVavyq0iu9WS52CrSlvVvqaCfejJ41brJ2ou5U70LxmCvoaW40r6OvpIKymf1op4myRu+aoFEAWaxjoEw/dGPnwzNJZazfzT1dJA7eu5ek3em5cky6pBOMME4hwdVIy/290TFdqx1DenDJ4OTZw3LkvcBzZucM4mu2FrkldYq2WkkVMnIm1sjfVc3c5PE0wAtRo30zWfFLo6C881abu7o6rnfq9Q74Dl3L8F3amSuJOVFRdqFCSVdGmma6YYdHbb8slztGxqOcudRTJ2NcvWRPVXuyVALQg8VpulFebfDcLZUxVdHO3Xjki6v/wDF7UXah7QBrMVfuveP4Cf+WpszWYq/de8fwE/8tQKOAACfeSZ1MUeNJ98TyQNyTOpijxpPvieQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABy2kTHNswLZPK633Wol1m0tI1+T5np9jU9J3DP1tih7MZ4utODLK643ibUTa2GFn7Wd/Y1PtXcnEqjj3HN4xxdPKbpLzdMxcqaka/3KBv8AV3a5dq+GSJ48YYouuL7y66Xqq5yR/RjjZsZCz1Gt4J9K71NAAAO50baNbzjqp5ynb5HamPymrZW9FO5iek7f3JxVNgHLWa0XC93BlDaKOatqperFE3WVe9exO9dhPejzQNRW/mq3GytrqnrsoYn+5R/HdsV69ydHYvWQk3CGErNg+2LQWOmVib55n9Kaod2udx3rs3JwQ3wGOCKOmgZFTxNihibqtijajWtRPRRE2IhkAAAAAAAAAAAAAAAAAAAAAAABiqqeGrgdT1MUVRDMzUdFK1Hxub3ouxTKAIX0jaBqOvY6uwTq0NT1nUUrl5mTj0VXPUXu6u7qkA3e1VtnuE1Bc6SWiqYl6UUzNVyfinYqbFLzGgxlg6yYytyUV8o1kdGnuVS1dWaHva/+i5ovFAKUA7nSXo1uuBKrXkTyy1yvygrWN6PxXp6LvoXhxy4YDsNHuP7xgS5c7bnpPRyuRamilf0Ju9PVd2OT5c02Fp8E4wtGM7OldZ5s0bqsmpnftIHL6Lk+Rcl3KUoN7hDE9ywjeobpaJ+bmjzbJG5M2TM4senFF+jem0C7JrMVfuveP4Cf+WprcA40tmN7Iy42t6skYrWVFM9/Tgf6ru1F9F3HxzRNlir917v/AAE/8tQKOAACfeSZ1MUeNJ98TyQNyTOpijxpPvieQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAeK83Sks1rqrnc5eYpKSNZJXO4NTgnaq7kTioGvxviu24NsMt0ujtnVhgYuT55PRa3+q8E2lRMZYnuWLr5PdrtKj5JERkcbOpCzhG1OCJt8VzXvPbpExpXY3xFJcarOKnbrNpaZFzbBH/ALl3uXivdkhygAAm7Qlolbdo4MS4shT9Hdeionp/ef8A5Hp/0+xvpb+r1w8GiDRC/Eror5iVj6eyL0ooEVWyVnf2tZ3714esWSpoIaWnip6aGKniibqxxRMRrWtT0Wom5DL0slRqq1y8VAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAGGrpqauo5aWspoqimqG6ssUrUc1zV9FzVK26XdDk2GmTXrDmvU2dOnLCvSlo29vwmd+9OOfWLMBqqqoqLkoFCQTXpt0SJZ0nxJhWDO29aso499KvF7E9TtT0fi9WFAN7hDE9ywjeobpaJ+bmjzbJG5M2TM4senFF+jem0tLQ4tt2M9G1zutuVGItDUNqIXu6UEiRLrMX7UdxQp6dJg/FdwwrV1TqV6upq6nfTVcCbEkjcipn8Zutmi/wBFA5sAAT7yTOpijxpPvieSBuSZ1MUeNJ98TyAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAfURVXJCsWnnSMmJrn+g7NIn6IoJPdHs2pVTJs1s+LW7k7d+3oklcoLHCYbw2tmoJUbdLu1zdZF6UVPuc7uV2WqnzlzzaVbAAHc6JcBTY6xG2CXXZaqXKWtmZ6vBiL6zvoTWXhkB0ugzRf/aWdl/xBDnZoXZQQv8A+ckTh8RF39q7PWLMdLJUaqtVeJipqeCmpoqemhbFDTtSKKJvRa1qJqtaidmRlAAAAAAAAAAAAAAAAAAAAAAAAAAAADldImN6DAlg8vrWrUVEqrFSUzV/ayZcVXcicV/qV2u2mrHNxnV7LuygYu3mqSBjGoviqK5flUC2YKeedfHfvmq/Y38B518d++ar9jfwAuGCnnnXx375qv2N/AedfHfvmq/Y38ALhgp5518d++ar9jfwHnXx375qv2N/AC4bVVVRUXJUK06ddGK4aqFxBYqbUs1Q73aFm6jlXs7GOXd2Ls2dE5Lzr47981X7G/gfKvSdjWrpZaepv9RPTytdFJHIyNzXtVMnIqZbUA40AAAABPvJM6mKPGk++J5IG5JnUxR40n3xPIAAAAAAAAAAAAAAAAAAAAAAAAAAADxXq60djtVXdLi/maWkjWWV/cnBO1V3Inae0gblP4s/uWFKWXLdV1ur/wDmxdvxnKip6gEP4xxJW4txHW3qvaiSVLujGm1sTETVYxPBPau00QAGxsdprb5d6S126PnaqrkSKJi7Nq8V7kTaq9hcjA2FaDB2HKe023pozpTT5dKeVes9fYmScE2EZ8m7A/kFtXFtwg/Wa1ro6Nr0/Zw8X+Ll2Js6qfCJpAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAK+8q/yn9IYdWTLyNYJ+b7ec1ma/0c2QWXRx9g2341sD7bck1ZmLrU1Sza6nly6ybtZPWTinftK+XXQTjqjqEZSUlJdG5ZrJTVTERO5UkVi/QoEYgkDzJ6Qve/9dp/zD75lNIfve+u0/5gEfAkDzKaQ/e99dp/zB5ldIX+QfXqf8wCPwSB5ldIX+QfXqf8weZPSH73vrtP+YBH4JA8yekP3vfXaf8AMHmT0h+9767T/mAR+CQPMnpD97312n/MHmT0h+9767T/AJgEfgkDzJ6Q/e99dp/zB5k9Ifve+u0/5gHe8kzqYo8aT74nkibk94MxDg9L83EVvWjSrWn5hUmik1lbzufUc7LrN3ksgAAAAAAAAAAAAAAAAAAAAAAAAAAB47vc6az2iquda9WU1FC6eXJM8momeSJ2ruQpViS9VWI7/X3evX3etlWVyZ56icGJ3NTJE7kJ/wCU3iNaLC1HYIHZy3SbnZV2L7jFku3imb9X/Q4rWAOn0cYXlxjjGgs/T5h7ucqXt9CFu13hnuTvchzBZnk2YT/RWGJcRVbE8suvQg9ZkDVyTh6Ttvg1gEswQw08UVPCxkUMSJHFE3otaiJkjUTsyMgAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABlmuQNRjG8f2fwndrt0WSUdLJLFrbtfLoNXxfqoBV3Tdf/wC0Wki6SMXOnoneQQpkmxGKutl4ya6+Djgj9K7NETsPyBtMO2ee/wB/oLRSuykrahkCLwairtd4Im0u3R0dPQ0kFJSRpHBBGyCJibmxtTJrfYV35MGH/K8S11/nYistsKRQ57+dl2Zp4MRyfPQseAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAACKuU1d1oNH8VvjemtdatjXMVP8JnujsvnJGSqVx5U9wllxZaLe5USKmoOfTtR8j1R30RNAhcAzRQyTzxwQMV8kjkja1PScq5IBavk82n9FaMaSVyOZJcppKxyO4Iq6jcvmxtX5xIp5LPb4rRaaG2wKrmUNPHSMVd6tYxGnrAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABUnT3W+WaV7wjX6zIeZp292rGzWT/VrFt2pm5E7ykuOatK3G19q81Vs1xnengsjsvoA0R1WiqgfcdJOHYI+k5K+KZe9sbucd9DVOVJQ5NtuWu0nQ1GeXkFLPU+ObUj+9AtMq5rmAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAD6zrJ4lD6mVZ6iadf8R7ne3Mvfro1iyO3NzcvyIUJAEx8leJXY3uU3q21We2aL/aQ4TryUIv8AiOIZ/UhgZ7XP/wBoFgQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABEzXJDkbxpNwTZqtaa44hp+ejVWubC2SZWu45821csjm+UXi6qw9hOkt9qqnU9XeJXN5yJNVUgYnTydn0VVXRp4axVsC8ljvtpxDSLU2a40twhRUR/k8qOVut1dZN7V7lNkUvwFiuswdiamulE/KJrkjqY96TQqqa7VTv3p2KXRcmTlQD4AAAAAAAAAAAAAAAAAAAAA+tXJyKUux7hSswdiaptdazKJrlkppN6TQqq6jkXv3L2KXQNbfLFacQ0iU15t1LcIUVVZ5REjlbrdbVXe1e9AKNlpOTphGqw9hOruF1pXU9XeJWu5uVdVUgYnQzbl0VVXSL4ap0ln0ZYJs1WlTbsPU/PRqjmumdJMrXcMuccuWR1yrmuagAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAFfuVfL/xHD0HqQzv9rmf7SCiY+VRKrsb22H1baj/AGzS/wC0hwAX21EaxI27m5NT5EKIU0Sz1EMCf4j2t9uRfB/WXxA+AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAARM1yAqzykritdpOmp8svIKWCm8c2rJ96RedVpVr33HSTiKeTpOSvlhTvbG7m2/Q1DlQN7gakStxtYqTJVbNcYGL4LI3P6C7Tlzcq95UjQJReWaV7OrmazIeeqHd2rG/VX/VqltgAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAeS8XCK0WmuuU6K5lDTyVb0TerWMVx6yOuUNdv0Voxq4mq5klymjo2q3girruz+bG5PnAVUlmknnknner5JHLI5y+k5VzUwgATRyWLfLLiy73BqIkVNQcwvaj5HorfoicWOIq5MtoWg0fy3CRia11q3ua9F/wme5tz+ckhKoAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAK4cp/EHleJaGwQPRWW2FZZst/Oy7cl8GI1fnqWIrKynoaSerq5EjggjfPK9dzY2pm53sKSYkvE9/v1fd6tuUlbUPqFYi56qKuxvgibE8ANWfpG5oq9h+TvdCNg/tFpItcb0zp6J3l8y5psRipq5+Mmong4C0WDrP/Z/CdptPRZJR0scUuru18um5PF+sptwq5rmAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAGOeaGnilqJnsihiRZJZXdFrURM1cq9mQETcpPFn6KwxFh2kenll16c/rMgaua8fSds8GvKzHT6R8US4xxjX3jp8w93N0zHehC3Y3wz3r3uU5gAWU5MmHFosLVl/nbnLdJuaiTYvuMWabOKZv1v9DSAMN2WqxHf6C0UCe71sqRNVUz1E4vXuamar3IXVtFsprPaKW2UTFZTUULYIs1zyaiZZqvau9QPYAAAAAAAAAAAAAAAAAAAAAAAAAABE3KExniHB6WF2HbgtGlWtRz6LDFJrK3msuu12XWduJZIG5WfUwv41f3IHBeezSH74fqVP+WPPZpD98P1Kn/LI/AEgeezSH74fqVP+WPPZpD98P1Kn/LI/AEgeezSH74fqVP8Aljz2aQ/fD9Sp/wAsj8ASB57NIfvh+pU/5Y89WkL/AD/6jT/lkfgCQPPVpC/z/wCo0/5Y89ekP3w/Uqf8sj8ASD569Ifvh+pU/wCWfPPVpC/z/wCo0/5ZH4Ak61adsdUdQr6urpLo3LJI6mlYiJ3osaMX6VLB4Bxlb8a2Blytq6szF1ammftdTy5dVd2snqrxTv2FLidOSh5T+kMRJHl5GsEHOZ7+c1n6n0c4BYIAAAAAAAAAAAAAAAAAAAAAAAAAAAAAIW5SOOPILamErfP+s1rWyVjmL+zh4M8XLtXb1U+ESZjnFVBg7DlRdrl00Z0YYM+lPKvVYnsXNeCbSm98u1bfLvV3S4yc7VVciyyvTZtXgncibETsA1wBvcHYbrcW4jorLQORJKl3SkXa2JiJrPevgntXYBMHJgwn/fcV1UWW+kotb/8AR6bPitRUX1yeTxWW1UdjtVJa7czmaWkjSKJncnFe1V3qvae0AAAAAAAAAAAAAAAAAAAAAAAAAAABA3Kz6mF/Gr+5J5IG5WfUwv41f3IEBAAAAAOypNGONauliqKawVE9PK1ssckb43Ne1UzaqLntQ++ajHfvZq/a38TrdBWk5cNVCYfvtTqWaod7jM/dRyr29jHLv7F27OkWWciqqoqZKgFPPNRjv3s1ftb+I81GO/ezV+1v4lwwBTzzUY797NX7W/iPNRjv3s1ftb+JcMAU881GO/ezV+1v4jzUY797NX7W/iXDAFTLToVxzcZ0Y+0MoGLs52rnYxqL4IquX5ELE6O8EUGBLB5BROWoqJVSWrqXJ+1ky4Im5E4J/U6oAAAAAAAAAAAAAAAAAAAAAAAAAAAAMVTUQU1NLUVMzYoadqyyyu6LWtRNZzlXsyMvSyRXIrVXgVn056UP7SzvsGH5s7NC7OeZn/OSJx+Ii7u1dvqgc1pax7NjrEbp4tdlqpc4qKF/q8XqnrO+hNVOGZwwAAtJyfcDphvDaXmviRt0u7Wu1VTpRU+9re5XZay/NTLNpGugbRymJrn+nLzGn6IoJPc2P2pVTJt1cuLW717d23pFnVVVXNQPgAAAAAAAAAAAAAAAAAAAAAAAAAAAAAQNys+phfxq/uSeSBuVn1ML+NX9yBAQAA6TGGFLhhWrpW1TFdTV1OyppJ12JJG5EXL4zdbJU/opzZcKuwlbsZ6NrZariiMRaGndTzMb0oJEiTVen2K3ihVrF+GLlhG9TWu7wc3NHk6ORq5smZwexeKL9G5doGiJr0JaW0s6QYbxVPnberR1km+lXgx6+p2L6PxerCgAvs5FVVRUyUFZ9EWmObDTIbLiPXqbOnQimTpS0bez4TO7enDPqlkqSppq6jiqqOpiqKaobrRSxORzXNX0muQDMAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAOlkiuRWuXghiqZ4aWnlqKmaKniibrSSyvRrWtTi5V3IVs0v6X5MS87ZMNPdT2ZejNOqK2St/q1ncu1ePqgbDTbpabdo58NYTmT9HdStrWL/AHn/AONi/wDT7Xelu6vXhEAAdXo7wXXY3xFHbqXOKnbquqqlUzbBH/uXc1OK92aniwbhi5YuvkFptMSPkkRXySP6kLOMjl4ImzxXJO4t3gjCltwbYYrXa27OtNO9Mnzyek539E4JsA2FmtdJZrXS2y2RcxSUkaRxNbwanFe1V3qvFT2gAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAgblZ9TC/jV/ck8kDcrPqYX8av7kCAgABePCv7r2j+Ag/loa3H2C7ZjeyPt10YrJGK59PUsZ04H+s3tRfSbx8clTZYV/dez/wEH8tDZgUmxfhi5YRvU1ru8HNzR5OjkaubJmcHsXii/RuXaaIuvjbB9oxnZlobxDmjdZ8NS39pA5fSavyJmm5SrGkLAF4wJcuauLEno5XKlNWxM6E3cvqu7Wr8mabQOPO50aaSrrgSq1I18stcr856J7uj8Zi+i76F48MuGAF18G4xsmMrctbY6xZHRp7rTOTVmh7nM/qmaLwU35Rm0XWts9whr7ZVy0VTEvRlhfquT8U7UXYpP2jnTzR17G0ONtWhqeq2tiavMycOkiZ6i9/V39UCaAYqWohq4G1FNLFUQzM12yxOR8bm9ypsUygAAAAAAAAAAAAAAAAAAAAAAAxzyx00D5aiVsUMTdZ0sjka1qJ6SquxEAyGhxfi2zYPtiV98qVYm6CFnSmqHdjW8d6bdycVIy0h6eaK387RYJRtdU9R9dKz3KP4jdivXvXo7E6yECXm73C93B9dd6yatqpetLK7WVe5OxO5NgHU6SdJV5x1U83UO8jtTH5w0UTuine9fSdu7k4Im04YAAb/AAfhe64vvTbXZabnpHdKSR+xkLPXc7gn0ruQ9mAsDXjHF08mtcXN0zFzqatzPcoG/wBXdjU2r4ZqlrsGYRtODLK23WiHUTY6aZ/7Wd/a5fsTcnADx6O8DWzAtk8kovdaiXVdVVbmZPmen2NT0W8M/W2r1IAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAgblZ9TC/jV/ck8kDcrPqYX8av7kCAgABePCv7r2f+Ag/lobM1mFf3Xs/8BB/LQ2YA8d1tdFeLfLb7nTRVdJUM1JI5eq78F7FTah7ABV7SZoZumGlkuVhSS6Wja7VamtUUzfhInWanrJ35ohFRfZFVFzQjHSRoZs+KXSV9m5q03d3S1mt/V6h3w2puX4Te1c0cBVcG5xNhm7YWuS0N9opaSRUzaq7WyN9Zrtzk8DTAdJg/G2IcHVSvsFwdExXa0lO7pwyeLV2cN6ZL3k7YO094fujGQYmhkstZu51iOkgduTenSbvXemSZdYrKAL30FdS3GlZWUFXBWUz+rLBK2SN3zkM5Ryy3u52CrWqstwqaCfcr4JFbrJ2Km5U7lJUw3yhrzSRNhxFbYbs1EySaJ/k0m/arkRFavyI0Cx4I3sWnLBN0RraqqqLVLuRlZAuS/OZrNy8cjv7XcaG606z2qtpq6DPLXpJ2yNz+M1QPSAqKm9AAAAAAAAD6iKu5MwPgPJdLlbrPTpNdbhR0MblyR9VM2Fqr85Thb1pwwRas2RV1Tc3NdqqyhgVyJ36z9VvsVQJFMNdVU9DRyVVbUQUsDEzfLPKkbG+KrsK74n5Qt8rdeLDVDT2uNf8edefm8URegnhk4iq+Xy63+rSqvVwqa+dM0RZ5Fdqp3JuRO5ALDY209WS1a9LhqJLzW8Z1zjpmu28es7huyTb1iDsY48xHjGbO93Bz4EdrMpIk1IW7eDU3797s17zlwAAN9hTC15xbcVo7DQvq5E2yP2JHEna567E+1ctgGhJa0V6Gq3E6RXXEHO0Fny12RdWaqbw1UXqNX1l38N+sSXo80K2TDaR119SK9XRqa2T2508LvgtXrrn6TuxMkQlJVVVzVQPDZ7XQ2a3xW+0UUNJRxdFsUTej4969qrtU9oAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAACBuVn1ML+NX9yTyQNys+phfxq/uQICAAF48K/uvZ/4CD+WhszWYV/dez/AMBB/LQ2YAAAAAB47rbLfd6F9DdqSCtpnZK+KdqOb3O27l795C+OuT7E7XrMF1XMv6/6PrH9Heuxkm9OCZOz+MToAKOXyyXXDtc+hvdDNRVLPQlblrJnvRdzk2b0zQ1heu6Wyhu1K6ju9DBW0rlz5qoiSRuz0sl3L3kWYo5P2H69HS4erKm0Spl7k7OeDZ3Kuuir8ZfACs4O5xRomxjh5XOmtb7hTrs8pt+c7PlRE1k+VqHELmrsskzTgm0D8mWCSWCRJYJJI3pucxyoqfKhiAHY2rShji1uVafE1xfn/wBy5Kn+bnkdBbtPuNaNqpUOt1wz41FLq5f+NWkXACZ6TlGYhYv65ZLXN/8ASssf2ucbGPlJyp+0wpEvxK5W/dqQOAJzqeUjWu/uuGaWL49W532NQ10/KLxMq/q9ps8afCbMv2SIQ6AJPumnrHFbq+TT0Nuy/wC2pUdn/wCVXnNXHSNjS4Sa9Rie5tXdqw1DoG/6WZIcqAM08ks8zpqh8kj3rm58jlVzvlUwgAAfpqIu9cju8M6IsZ4jdrRWp1ugdn7tcc4Gpx2Ny11+RuQHBG1sFhu2I65KKyW6evn4tibsb3uXc1O9VRCfsMcnyxUOrLiSvnus3/Qi9wh3dVcs3rt45t8CV7TbKCz0TaS00lPRUrFz5qniRrdu/PLeveBCeCuT11KnGFd8LyGhd4bHSL8uxqfOJrs9pt9ktzKG00cFDTRbWxRN1Wp3r2r3rtPaAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABA3Kz6mF/Gr+5J5Ix5RGF6vEODIam2Ui1NXa5ueVGp0+YVipJqpxX9mqp8ECq4BvMI4drsVYhpbRbY3SSVMiI97W5pDHmmtIvYiJ+AFx8K/uvZ/4CD+Whsz8RRRQQMggjSOGONImsT0Wp0WtP2AAAAAAAAAAABFyXYuRqr7hyy39iNvlpoa1Ubqo6ohRz2J8F3WT5FNqAIoxByfsK13OPtc1dZ37EYxsnPxJ35P6X/ucRc+TpiGKRyWq822si7Zucgkd81Ecn0ljgBUW4aHse0Ub3vw/JMxFyzp5opVX5rXa30HP1WEsSUTUfV4du8DV4zUMrPpVpdo+o5eCqBQyRr411JGuYvYqKn2mMvsjnO3OX2n5ka1/wC0ZG/47EAoWZ6elnqFyp4JJu5jFd9iF741a1MokaidjURp91nesvtApNRYPxLW9Kjw5dqhqLlmyikVvyqiZIdFQ6FsfVmqq2XyZjvSqKmJmXya2t9BbdVVd6qp8ArjbOTrfpZ0S6X210sPrU/OTuT5qoxPpO4sXJ/wlQKx90mr7s7c9r5OYi8cmZO/9iVgBqLHhaw2DVWx2ahoZFTV52KBNfLsV/Wd7Tbque8AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAABFVFzQADir3omwReqlampsccM73ayvppHQI/Pta1dXb25Zm8wzhOw4VgfDh22Q0KTZc45iq570TgrnKrlTb2m5AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAf//Z"
+
+# ---------------- 工具 ----------------
+def center(win):
+	win.update_idletasks()
+	x = (win.winfo_screenwidth() - win.winfo_width()) // 2
+	y = (win.winfo_screenheight() - win.winfo_height()) // 2
+	win.geometry(f"+{x}+{y}")
+
+# ---------------- 启动计时 ----------------
+class StartupProfile:
+	"""python main.py --profile-startup：记录导入和各阶段耗时，首帧画完后打印并退出"""
+
+	def __init__(self):
+		self.last = _T0
+		self.phases = []
+
+	def mark(self, name):
+		now = time.perf_counter()
+		self.phases.append((name, now - self.last))
+		self.last = now
+
+	def report(self):
+		total = self.last - _T0
+		print(f"{'阶段':<16}{'耗时(ms)':>10}")
+		for name, dt in self.phases:
+			print(f"{name:<16}{dt * 1000:>10.1f}")
+		print(f"{'首帧总计':<16}{total * 1000:>10.1f}")
+
+# ---------------- 主程序 ----------------
+class App(tk.Tk):
+	def __init__(self, profile=None):
+		self.profile = profile
+		if profile:
+			profile.mark('导入主模块')
+		super().__init__()
+		self.title("体重记录器")
+		self.minsize(540, 1)
+		self.protocol('WM_DELETE_WINDOW', self.on_close)
+		self.renderer = None # 数据库和图表都归渲染线程，窗口出来后再启动（见 finish_startup）
+		self.pending_adds = [] # 渲染线程启动前点的添加，启动后再交给它
+
+		self.person = None # 当前人物 dict
+		self.unit = None # 当前显示单位
+		self.show_input = False
+		self.show_compare = False
+		self.show_notes = False
+		self.dirty = set() # 待刷新的部分，见 invalidate()
+		self.flush_job = None
+		self.save_job = None # 界面设置延迟写盘，见 flush()
+		self.redraws = 0 # 向渲染线程要帧的次数，测试里断言一轮事件里的多次改动只要一帧
+		self.select_scope = False # 下一帧改用第一个可用的时间维度（换人物时）
+		self.frame = None # 正在显示的帧
+		self.frame_gen = 0 # 已收到结果的最新请求编号
+		self.photo = None
+		self.cfg = load_cfg() # 界面设置，整个会话在内存里改，延迟写回
+		self.cfg.pop('persons', None) # 旧版配置里的人物由 load_persons 搬进库里
+		self.persons = [] # 人物资料，库里的 persons 表
+		self.posters = None # PosterMaker，海报在进程池里画
+		self.poster_job = None
+		self.watch_job = None
+		self.mark('读取配置')
+
+		self.build_ui() # 渲染UI
+		self.refresh_persons() # 后台读人物，读到后统一填充数据（真正的绘制在第一次空闲时）
+		self.mark('窗口骨架')
+		# 第一次空闲时 Tk 先把窗口画出来，紧接着再加载图表
+		self.after_idle(self.after, 0, self.finish_startup)
+
+	def mark(self, name):
+		if self.profile:
+			self.profile.mark(name)
+
+	def finish_startup(self):
+		"""窗口已经显示：导入 PIL 补上图标，启动渲染线程画第一帧"""
+		self.mark('首次空闲')
+		from PIL import Image, ImageTk
+		self.ImageTk = ImageTk
+		self.mark('导入 PIL')
+		ico = Image.open(io.BytesIO(base64.b64decode(REFRESH_ICON_DATA)))
+		self.ico_img = ImageTk.PhotoImage(ico.resize((17, 17)))
+		self.btn_refresh.config(image=self.ico_img)
+		from render import ChartRenderer # 连带导入 numpy
+		from poster import PosterMaker
+		self.renderer = ChartRenderer(DB_PATH)
+		for args in self.pending_adds:
+			self.renderer.call(self.renderer.add, *args)
+		self.pending_adds = []
+		self.posters = PosterMaker(DB_PATH)
+		self.mark('启动渲染线程')
+		self.invalidate('chart')
+		self.watch_job = self.after(WATCH_MS, self.watch_db)
+
+	def populate_ui(self):
+		# 填人物下拉框
+		names = [p['name'] for p in self.persons]
+		self.cb_person['values'] = names
+		picked = set(self.lb_compare.get(i) for i in self.lb_compare.curselection())
+		self.lb_compare.delete(0, 'end')
+		for i, name in enumerate(names):
+			self.lb_compare.insert('end', name)
+			if name in picked:
+				self.lb_compare.selection_set(i)
+		if names:
+			self.cb_person.current(0)
+			self.switch_person()
+
+	# ---------------- 逻辑 ----------------
+	"""关闭窗口：等渲染线程把排队的写入做完、关掉数据库再销毁"""
+	def on_close(self):
+		if self.renderer:
+			if self.watch_job:
+				self.after_cancel(self.watch_job)
+			if self.save_job or 'cfg' in self.dirty:
+				self.save_settings()
+			self.renderer.close()
+			self.posters.close()
+		self.destroy()
+
+	"""重新读取人物资料并重绘界面（记录的增删由 watch_db 自动发现）"""
+	def refresh(self):
+		self.refresh_persons() # 读到后刷新下拉框、时间维度按钮，折线图在空闲时重绘一次
+
+	# ---------- 重绘调度 ----------
+	def invalidate(self, *parts):
+		"""标记脏数据（'chart' 重绘折线图，'cfg' 写界面设置），同一轮事件循环只处理一次"""
+		self.dirty.update(parts)
+		if self.flush_job is None:
+			self.flush_job = self.after_idle(self.flush)
+
+	def flush(self):
+		"""把这一轮攒下的改动一次交给渲染线程：最多要一帧；设置改动推迟到静默 SAVE_DELAY_MS 后再写"""
+		self.flush_job = None
+		if self.renderer is None: # 渲染线程启动后会再 invalidate 一次
+			return
+		dirty, self.dirty = self.dirty, set()
+		if 'chart' in dirty:
+			self.request_frame()
+		if 'cfg' in dirty:
+			if self.save_job:
+				self.after_cancel(self.save_job)
+			self.save_job = self.after(SAVE_DELAY_MS, self.save_settings)
+
+	def save_settings(self):
+		"""把设置的快照交给渲染线程写盘（先写临时文件再改名，见 utils.save_cfg）"""
+		if self.save_job:
+			self.after_cancel(self.save_job)
+			self.save_job = None
+		self.renderer.call(save_cfg, copy.deepcopy(self.cfg))
+
+	def request_frame(self):
+		overlays = [name for name, var in self.overlay_vars.items() if var.get()]
+		search = self.var_search.get() if self.show_notes else ''
+		self.renderer.request(self.person, self.scope, self.chart_size, select=self.select_scope, compare=self.compare(), overlays=overlays, search=search)
+		self.redraws += 1
+		self.select_scope = False
+		self.poll_frames()
+
+	def poll_frames(self):
+		"""取回渲染线程的结果，只贴最新请求的那一帧；还有没画完的就继续轮询"""
+		if self.poll_job:
+			self.after_cancel(self.poll_job)
+			self.poll_job = None
+		for gen, frame in self.renderer.poll():
+			if isinstance(frame, Exception):
+				messagebox.showerror("错误", str(frame))
+			elif isinstance(frame, set): # watch() 发现其他进程改了这些人的数据
+				if frame & self.shown_names():
+					self.invalidate('chart')
+			elif gen is None: # add() 越过了新的整公斤
+				self.request_posters(frame, show=True)
+			elif gen == self.renderer.gen:
+				self.show_frame(frame)
+			if gen is not None:
+				self.frame_gen = max(self.frame_gen, gen)
+		if self.frame_gen < self.renderer.gen:
+			self.poll_job = self.after(15, self.poll_frames)
+
+	def watch_db(self):
+		"""定时让渲染线程查一次 data_version，结果由 poll_frames 取回"""
+		self.poll_frames()
+		self.renderer.call(self.renderer.watch)
+		self.watch_job = self.after(WATCH_MS, self.watch_db)
+
+	def shown_names(self):
+		"""图上正画着的人物"""
+		compare = self.compare()
+		if compare:
+			return set(compare[0])
+		return {self.person['name']} if self.person else set()
+
+	def show_frame(self, frame):
+		"""界面线程唯一的绘图工作：把整张图贴到画布上"""
+		self.frame = frame
+		if self.photo is None or (self.photo.width(), self.photo.height()) != frame.image.size:
+			self.photo = self.ImageTk.PhotoImage(frame.image)
+			self.chart.itemconfig(self.chart_img, image=self.photo)
+		else:
+			self.photo.paste(frame.image)
+		self.hide_anno()
+
+		if frame.scope != self.scope: # 换人物或数据变短后改了维度
+			self.scope = frame.scope
+			self.cfg['time_scope'] = frame.scope
+			self.invalidate('cfg')
+		self.update_scope_buttons(frame.scopes)
+		self.lbl_hits.config(text='' if frame.hits is None else f'命中 {frame.hits} 条')
+
+		if self.profile and frame.person: # 有人物的首帧已贴上（人物是后台读的，之前可能先贴过空图）
+			self.mark('首帧绘制')
+			self.profile.report()
+			self.profile = None
+			self.after_idle(self.on_close)
+
+	"""读取人物；在后台线程里开库，别的进程占着写锁时窗口也不卡；记录由渲染线程在库被外部改过时重新读"""
+	def refresh_persons(self):
+		self.run_task(None, '', lambda store, _: load_persons(store), self.set_persons)
+
+	def set_persons(self, persons):
+		first = not self.persons
+		self.persons = persons
+		self.wizard_if_need() # 没有人物就跳出向导来创建
+		if first:
+			self.var_w.set(f"{to_show_unit(75, self.persons[0]['unit']):.2f}")
+		self.populate_ui()
+
+	def switch_person(self, *_):
+		name = self.cb_person.get()
+		self.person = next((p for p in self.persons if p['name'] == name), None)
+		if self.person:
+			self.lbl_unit.config(text=self.person['unit'])
+		self.select_scope = True # 可用维度随人物变，由渲染线程挑第一个
+		self.invalidate('chart')
+
+	# ---------------- 向导 ----------------
+	def wizard_if_need(self):
+		# 阻塞向导直到有人物
+		while not self.persons:
+			self.wizard()
+
+	def wizard(self, edit=None):
+		top = tk.Toplevel(self)
+		top.title('添加人物' if edit is None else '修改人物')
+		center(top)
+		
+		# 默认值
+		defaults = dict(name='默认', height=175, unit='kg', sex='男', source='日常', target=None)
+		defaults.update(edit or {})
+		if defaults['target'] is None:
+			defaults['target'] = ''
+
+		fields = {}
+		labels = ['姓名', '身高(cm)', '性别', '单位', '数据源', '目标体重(kg)']
+		keys = ['name', 'height', 'sex', 'unit', 'source', 'target']
+		widgets = []
+
+		for i, (lab, key) in enumerate(zip(labels, keys)):
+			ttk.Label(top, text=lab).grid(row=i, column=0, sticky='w', padx=5, pady=3)
+			if key == 'sex':
+				cb = ttk.Combobox(top, state='readonly', values=['男', '女'], width=17)
+				cb.set(defaults[key])
+				cb.grid(row=i, column=1, padx=5)
+				widgets.append(cb)
+			elif key == 'unit':
+				cb = ttk.Combobox(top, state='readonly', values=['kg', 'lb', '公斤', '斤'], width=17)
+				cb.set(defaults[key])
+				cb.grid(row=i, column=1, padx=5)
+				widgets.append(cb)
+			else:
+				ent = ttk.Entry(top, width=20)
+				ent.insert(0, str(defaults[key]))
+				ent.grid(row=i, column=1, padx=5)
+				widgets.append(ent)
+			fields[key] = widgets[-1]
+
+		def save():
+			name = fields['name'].get().strip()
+			if not name:
+				messagebox.showerror('错误', '姓名不能为空')
+				return
+			
+			person = {
+				'name': name,
+				'height': float(fields['height'].get()),
+				'sex': fields['sex'].get(),
+				'unit': fields['unit'].get(),
+				'source': fields['source'].get(),
+				'target': float(fields['target'].get()) if fields['target'].get().strip() else None, # 可不填
+			}
+
+			# 新增或修改；改名会把该人的记录等一并改过去，重名时报错
+			def work(store, _):
+				store.save_person(person, old_name=edit and edit['name'])
+				return store.persons()
+
+			def saved(persons):
+				self.persons = persons
+				top.destroy()
+
+			self.run_task(btn, '保存中', work, saved, lambda e: messagebox.showerror('错误', str(e), parent=top))
+
+		btn = ttk.Button(top, text='保存', command=save)
+		btn.grid(row=len(labels), columnspan=2, pady=8)
+		top.transient(self) # 保持主窗可见
+		self.wait_window(top)
+
+	# ---------------- UI ----------------
+	def build_ui(self):
+		# 顶部人物栏
+		self.bar = ttk.Frame(self)
+		self.bar.grid(row=0, column=0, sticky='ew', padx=20, pady=(10, 5))
+		self.bar.grid_columnconfigure(2, weight=1)
+
+		ttk.Label(self.bar, text='人物').grid(row=0, column=0)
+		self.cb_person = ttk.Combobox(self.bar, state='readonly', width=10)
+		self.cb_person.grid(row=0, column=1, padx=(10, 0))
+		self.cb_person.bind('<<ComboboxSelected>>', self.switch_person)
+
+		# 添加空白
+		ttk.Label(self.bar, text=(' ' * int((self.winfo_width() - 150 - 200) / 4))).grid(row=0, column=2, sticky='nsew', padx=5, pady=5)
+
+		# 导入 CSV / Apple Health
+		self.btn_import = ttk.Button(self.bar, text='导入', command=self.import_data)
+		self.btn_import.grid(row=0, column=3, padx=(5, 0))
+		self.btn_export = ttk.Button(self.bar, text='导出', command=self.export_data)
+		self.btn_export.grid(row=0, column=4, padx=5)
+
+		# 折叠/展开按钮
+		self.btn_toggle = ttk.Button(self.bar, text='添加数据', command=self.toggle_input)
+		self.btn_toggle.grid(row=0, column=5)
+		self.btn_compare = ttk.Button(self.bar, text='对比', command=self.toggle_compare)
+		self.btn_compare.grid(row=0, column=6, padx=(5, 0))
+		# 叠加分析线：滑动平均、趋势、目标预测，勾选状态记在配置里
+		mb = ttk.Menubutton(self.bar, text='叠加')
+		menu = tk.Menu(mb, tearoff=False)
+		self.overlay_vars = {}
+		for name in OVERLAYS:
+			var = self.overlay_vars[name] = tk.BooleanVar(value=name in self.cfg.get('overlays', []))
+			menu.add_checkbutton(label=name, variable=var, command=self.switch_overlays)
+		mb['menu'] = menu
+		mb.grid(row=0, column=7, padx=(5, 0))
+		self.btn_notes = ttk.Button(self.bar, text='心情', command=self.toggle_notes)
+		self.btn_notes.grid(row=0, column=8, padx=(5, 0))
+		self.btn_poster = ttk.Button(self.bar, text='海报', command=self.poster_list_win)
+		self.btn_poster.grid(row=0, column=9, padx=(5, 0))
+		ttk.Button(self.bar, text='编辑人物', command=self.edit_person_win).grid(row=0, column=10, padx=5)
+
+		self.btn_refresh = ttk.Button(self.bar, text='刷新', width=4, command=self.refresh) # 图标在 finish_startup 里换上
+		
+		self.btn_refresh.grid(row=0, column=11)
+
+		# 输入框容器（初始隐藏）
+		self.input_frm = ttk.Frame(self)
+		
+		# 时间
+		ttk.Label(self.input_frm, text='时间').grid(row=1, column=0)
+		self.var_time = tk.StringVar(value=datetime.datetime.now().strftime(TIME_FMT))
+		ttk.Entry(self.input_frm, textvariable=self.var_time, width=18).grid(row=1, column=1, padx=(5, 10))
+
+		# 体重
+		ttk.Label(self.input_frm, text='体重').grid(row=1, column=2)
+		self.var_w = tk.DoubleVar(value=75.00) # 默认75，读到人物后换成第一个人的单位（见 set_persons）
+		ttk.Entry(self.input_frm, textvariable=self.var_w, width=6).grid(row=1, column=3, padx=(5, 2))
+		self.lbl_unit = ttk.Label(self.input_frm) # ← 加这一行
+		self.lbl_unit.config(text=self.person['unit'] if self.person else 'kg')
+		self.lbl_unit.grid(row=1, column=5, padx=(0, 5))
+
+		# 备注
+		ttk.Label(self.input_frm, text='备注').grid(row=1, column=6)
+		self.var_note = tk.StringVar()
+		ttk.Entry(self.input_frm, textvariable=self.var_note, width=12).grid(row=1, column=7, padx=(5, 10))
+
+		ttk.Button(self.input_frm, text='确认添加', command=self.add_record).grid(row=1, column=8, padx=(5, 0))
+
+		self.input_frm.lower() # 先放到最底层
+		self.input_frm.grid(row=1, column=0, sticky='ew', padx=20, pady=5)
+		self.input_frm.grid_remove()
+
+		# 图表：渲染线程画好整张图，这里只贴图；悬停提示是画布上的矩形+文字
+		self.chart_size = CHART_SIZE
+		self.chart = tk.Canvas(self, width=CHART_SIZE[0], height=CHART_SIZE[1], highlightthickness=0, bg='white')
+		self.chart.grid(row=2, column=0, sticky='nsew', padx=20, pady=(5, 20))
+		self.chart_img = self.chart.create_image(0, 0, anchor='nw')
+		self.anno_box = self.chart.create_rectangle(0, 0, 0, 0, fill='lightyellow', outline='#b0b0b0', state='hidden')
+		self.anno_text = self.chart.create_text(0, 0, anchor='sw', state='hidden')
+		self.poll_job = None
+		self.chart.bind('<Configure>', self.on_resize)
+		self.chart.bind('<Motion>', self.on_hover)
+		self.chart.bind('<Leave>', lambda e: self.hide_anno())
+
+		# 时间维度按钮区
+		self.time_bar = ttk.Frame(self)
+		self.time_bar.grid(row=3, column=0, sticky='ew', padx=10, pady=2)
+
+		self.time_vars = ['7天', '15天', '1月', '3月', '半年', '1年', '3年', '5年', '全部']
+		for i in range(len(self.time_vars) + 2):
+			self.time_bar.grid_columnconfigure(i, weight=1)
+
+		self.time_btn = {}
+		for i, t in enumerate(self.time_vars):
+			btn = ttk.Button(self.time_bar, text=t, width=6, command=lambda x=t: self.switch_time_scope(x))
+			btn.grid(row=0, column=i+1, padx=2)
+			self.time_btn[t] = btn
+
+		# 对比区（初始隐藏）：多选人物叠在同一张图上
+		self.compare_frm = ttk.Frame(self)
+		ttk.Label(self.compare_frm, text='对比').grid(row=0, column=0, sticky='n')
+		self.lb_compare = tk.Listbox(self.compare_frm, selectmode='multiple', height=4, width=16, exportselection=False)
+		self.lb_compare.grid(row=0, column=1, padx=(5, 10))
+		self.lb_compare.bind('<<ListboxSelect>>', lambda e: self.invalidate('chart'))
+		self.cb_metric = ttk.Combobox(self.compare_frm, state='readonly', values=COMPARE_METRICS, width=8)
+		self.cb_metric.current(0)
+		self.cb_metric.grid(row=0, column=2, sticky='n')
+		self.cb_metric.bind('<<ComboboxSelected>>', lambda e: self.invalidate('chart'))
+		self.compare_frm.grid(row=4, column=0, sticky='w', padx=20, pady=(0, 10))
+		self.compare_frm.grid_remove()
+
+		# 心情区（初始隐藏）：搜索备注、圈出命中的点，词云
+		self.notes_frm = ttk.Frame(self)
+		ttk.Label(self.notes_frm, text='搜索备注').grid(row=0, column=0)
+		self.var_search = tk.StringVar()
+		self.var_search.trace_add('write', lambda *_: self.invalidate('chart'))
+		ttk.Entry(self.notes_frm, textvariable=self.var_search, width=16).grid(row=0, column=1, padx=5)
+		self.lbl_hits = ttk.Label(self.notes_frm, width=10)
+		self.lbl_hits.grid(row=0, column=2)
+		self.btn_cloud = ttk.Button(self.notes_frm, text='词云', command=self.cloud_win)
+		self.btn_cloud.grid(row=0, column=3, padx=(10, 0))
+		self.notes_frm.grid(row=5, column=0, sticky='w', padx=20, pady=(0, 10))
+		self.notes_frm.grid_remove()
+
+		self.scope = self.cfg.setdefault('time_scope', '7天') # 默认
+		self.switch_time_scope(self.scope)
+
+	def update_scope_buttons(self, scopes):
+		"""按渲染线程算好的可用维度显隐按钮（数据跨度决定，见 utils.available_scopes）"""
+		# 统一按钮显隐
+		for s, btn in self.time_btn.items():
+			if s in scopes:
+				btn.grid()
+				btn.state(['pressed' if s == self.scope else '!pressed'])
+			else:
+				btn.grid_remove()
+		
+		# 动态调整布局
+		self.adjust_time_buttons_layout(scopes)
+
+	def adjust_time_buttons_layout(self, scopes):
+		"""动态调整时间按钮布局，确保居中且间距均匀"""
+		# 清除旧的权重配置
+		for i in range(len(self.time_vars) + 2):
+			self.time_bar.grid_columnconfigure(i, weight=0)
+
+		# 重新配置权重
+		for i in range(len(scopes) + 2):
+			self.time_bar.grid_columnconfigure(i, weight=1)
+
+		# 重新放置按钮
+		for i, scope in enumerate(scopes):
+			self.time_btn[scope].grid(row=3, column=i + 1)
+
+	def switch_time_scope(self, scope):
+		"""根据时间维度过滤并重绘"""
+		self.scope = scope
+		self.cfg['time_scope'] = scope
+
+		# 高亮按钮
+		for b in self.time_btn.values():
+			b.state(['!pressed'])
+		self.time_btn[scope].state(['pressed'])
+
+		self.invalidate('chart', 'cfg')
+
+	def switch_overlays(self):
+		self.cfg['overlays'] = [name for name, var in self.overlay_vars.items() if var.get()]
+		self.invalidate('chart', 'cfg')
+
+	def toggle_compare(self):
+		self.show_compare = not self.show_compare
+		if self.show_compare:
+			self.compare_frm.grid()
+			self.btn_compare.config(text='退出对比')
+			if not self.lb_compare.curselection() and self.person: # 默认先选上当前人物
+				self.lb_compare.selection_set(self.cb_person.current())
+		else:
+			self.compare_frm.grid_remove()
+			self.btn_compare.config(text='对比')
+		self.invalidate('chart')
+
+	def toggle_notes(self):
+		self.show_notes = not self.show_notes
+		if self.show_notes:
+			self.notes_frm.grid()
+			self.btn_notes.config(text='收起心情')
+		else:
+			self.notes_frm.grid_remove()
+			self.btn_notes.config(text='心情')
+		if self.var_search.get().strip():
+			self.invalidate('chart')
+
+	def compare(self):
+		"""对比模式下选中的 (姓名元组, 指标)，否则 None"""
+		if not self.show_compare:
+			return None
+		names = tuple(self.lb_compare.get(i) for i in self.lb_compare.curselection())
+		return (names, self.cb_metric.get()) if names else None
+
+	def toggle_input(self):
+		self.show_input = not self.show_input
+		if self.show_input:
+			self.input_frm.grid()
+			self.btn_toggle.config(text='收起输入')
+			# 刷新时间为“年-月-日 时:分:秒”
+			self.var_time.set(datetime.datetime.now().strftime(TIME_FMT))
+		else:
+			self.input_frm.grid_remove()
+			self.btn_toggle.config(text='添加数据')
+
+	def on_resize(self, event):
+		size = (event.width, event.height)
+		if size != self.chart_size:
+			self.chart_size = size
+			self.invalidate('chart')
+
+	def hide_anno(self):
+		self.chart.itemconfig(self.anno_box, state='hidden')
+		self.chart.itemconfig(self.anno_text, state='hidden')
+
+	def on_hover(self, event):
+		f = self.frame
+		if f is None or f.series is None:
+			return
+		k = f.hit(event.x, event.y)
+		if k is None:
+			self.hide_anno()
+			return
+		s = f.series
+		sx, ox, sy, oy = f.to_px
+		left, right = f.plot_box[0], f.plot_box[2]
+		d, w, b, n = from_epoch(s.times[k]), to_show_unit(s.weights[k], f.person['unit']), s.bmi(k), s.note(k)
+		txt = f"{d.strftime('%Y.%m.%d')}\n{d.strftime('%H:%M:%S')}\n{w:.2f} {f.person['unit']}"
+		if b is not None: # 等级是渲染线程按整个窗口一次分好的（见 Frame.levels）
+			txt += f"\n{b} {f.levels[k]}"
+		if n: # 有备注
+			txt += f"\n{n}"
+
+		# 把提示放在点右上方，如距离右边界 10% 以内就改放左边
+		px, py = s.xs()[k] * sx + ox, w * sy + oy
+		if px > left + (right - left) * 0.9:
+			self.chart.coords(self.anno_text, px - 12, py - 12)
+			self.chart.itemconfig(self.anno_text, text=txt, anchor='se', state='normal')
+		else:
+			self.chart.coords(self.anno_text, px + 12, py - 12)
+			self.chart.itemconfig(self.anno_text, text=txt, anchor='sw', state='normal')
+		x0, y0, x1, y1 = self.chart.bbox(self.anno_text)
+		self.chart.coords(self.anno_box, x0 - 4, y0 - 3, x1 + 4, y1 + 3)
+		self.chart.itemconfig(self.anno_box, state='normal')
+		self.chart.tag_raise(self.anno_text)
+
+	# ---------------- 人物编辑窗口 ----------------
+	def edit_person_win(self):
+		top = tk.Toplevel(self)
+		top.title('人物管理')
+		top.transient(self)
+		center(top)
+
+		cols = ('姓名', '身高(cm)', '性别', '单位', '数据源')
+		tree = ttk.Treeview(top, columns=cols, show='headings', height=6)
+		for c in cols:
+			tree.heading(c, text=c)
+			tree.column(c, width=80, anchor='center')
+		tree.pack(padx=10, pady=5)
+
+		def refresh():
+			for item in tree.get_children():
+				tree.delete(item)
+			for p in self.persons:
+				tree.insert('', 'end', values=(p['name'], p['height'], p['sex'], p['unit'], p['source']))
+
+		refresh()
+
+		bar = ttk.Frame(top)
+		bar.pack(pady=5)
+		ttk.Button(bar, text='新增', command=lambda: (self.wizard(), refresh())).pack(side='left', padx=5)
+		ttk.Button(bar, text='修改', command=lambda: self.modify_selected(tree, refresh)).pack(side='left', padx=5)
+		ttk.Button(bar, text='删除', command=lambda: self.delete_selected(tree, refresh)).pack(side='left', padx=5)
+
+	def modify_selected(self, tree, refresh):
+		sel = tree.selection()
+		if not sel:
+			return
+		name = tree.item(sel[0], 'values')[0]
+		self.wizard(edit=next(p for p in self.persons if p['name'] == name)) # 保存完才返回，self.persons 已是新的
+		refresh()
+		self.populate_ui()
+
+	def delete_selected(self, tree, refresh):
+		sel = tree.selection()
+		if not sel:
+			return
+		name = tree.item(sel[0], 'values')[0]
+
+		def work(store, _):
+			store.delete_person(name)
+			return store.persons()
+
+		def done(persons):
+			self.set_persons(persons)
+			refresh()
+
+		self.run_task(None, '', work, done)
+
+	# ---------------- 心情词云 ----------------
+	def cloud_win(self):
+		"""当前人物、当前时间维度内备注的词云，读的是按天累计好的词频表；点一个词就拿去搜索"""
+		if not self.person:
+			messagebox.showwarning("提示", "请先选择人物")
+			return
+		person, scope = self.person['name'], self.scope
+		months = SCOPE_MONTHS[scope]
+		start = int(subtract_months(datetime.datetime.now(), months).timestamp()) if months else 0
+
+		def done(words):
+			if not words:
+				messagebox.showinfo("词云", f"{person} {scope}内没有写过心情")
+				return
+			top = tk.Toplevel(self)
+			top.title(f'{person} · {scope}心情词云')
+			top.transient(self)
+			canvas = tk.Canvas(top, width=480, height=320, bg='white', highlightthickness=0)
+			canvas.pack(padx=10, pady=10)
+			if TOKENIZER == 'bigram': # 没有词典只能相邻两字硬切
+				ttk.Label(top, text='没装 jieba，中文按相邻两字切，会有半截词（pip install -r requirements.txt）', foreground='gray').pack(pady=(0, 8))
+			self.draw_cloud(canvas, words, 480, 320)
+			center(top)
+
+		self.run_task(self.btn_cloud, '统计中', lambda store, _: store.note_tokens(person, start), done)
+
+	def draw_cloud(self, canvas, words, width, height):
+		"""词从大到小沿阿基米德螺线往外找第一个不与已放的词重叠的位置，放不下就跳过；新词先建在画布外，不会和自己重叠"""
+		colors = ('#1d3557', '#457b9d', '#e63946', '#2a9d8f', '#e76f51', '#6d597a')
+		top_n = words[0][1]
+		for i, (word, n) in enumerate(words):
+			size = int(10 + 22 * math.sqrt(n / top_n))
+			item = canvas.create_text(-1000, -1000, text=word, font=('SimHei', size), fill=colors[i % len(colors)])
+			x0, y0, x1, y1 = canvas.bbox(item)
+			w, h = x1 - x0, y1 - y0
+			for step in range(2000):
+				a = step * 0.1
+				x, y = width / 2 + 4 * a * math.cos(a) - w / 2, height / 2 + 3 * a * math.sin(a) - h / 2
+				if x < 0 or y < 0 or x + w > width or y + h > height:
+					continue
+				if not canvas.find_overlapping(x, y, x + w, y + h):
+					canvas.coords(item, x + w / 2, y + h / 2)
+					break
+			else:
+				canvas.delete(item)
+				continue
+			canvas.tag_bind(item, '<Button-1>', lambda e, word=word: self.search_note(word))
+			canvas.tag_bind(item, '<Enter>', lambda e: canvas.config(cursor='hand2'))
+			canvas.tag_bind(item, '<Leave>', lambda e: canvas.config(cursor=''))
+
+	def search_note(self, word):
+		if not self.show_notes:
+			self.toggle_notes()
+		self.var_search.set(word)
+
+	# ---------------- 里程碑海报 ----------------
+	def request_posters(self, milestones, show=False):
+		"""交给进程池画（画过的直接取缓存），show 时画好一张弹一张"""
+		if not self.posters:
+			return
+		for m in milestones:
+			self.posters.request(m, (lambda result, m=m: self.show_poster(m, result)) if show else self.poster_failed)
+		if not self.poster_job:
+			self.poll_posters()
+
+	def poll_posters(self):
+		self.poster_job = self.after(200, self.poll_posters) if self.posters.poll() else None
+
+	def poster_failed(self, result):
+		if isinstance(result, Exception):
+			messagebox.showerror("海报生成失败", str(result))
+
+	def show_poster(self, milestone, result):
+		if isinstance(result, Exception):
+			self.poster_failed(result)
+			return
+		from PIL import Image
+		person, k = milestone[:2]
+		top = tk.Toplevel(self)
+		top.title(f'{person} · 轻舟已过 {k} 重山')
+		top.transient(self)
+		image = Image.open(result)
+		image.thumbnail((540, 720)) # 原图 1080×1440，窗口里显示一半
+		top.photo = self.ImageTk.PhotoImage(image)
+		ttk.Label(top, image=top.photo).pack(padx=10, pady=(10, 5))
+
+		def save_as():
+			path = filedialog.asksaveasfilename(parent=top, title='保存海报', initialfile=f'{person}-{k}.png',
+				defaultextension='.png', filetypes=[('PNG', '*.png')])
+			if path:
+				shutil.copyfile(result, path)
+
+		ttk.Button(top, text='另存为', command=save_as).pack(pady=(0, 10))
+		center(top)
+
+	def poster_list_win(self):
+		"""列出当前人物已到达的里程碑，双击打开海报"""
+		if not self.person:
+			messagebox.showwarning("提示", "请先选择人物")
+			return
+		person = self.person['name']
+
+		def done(milestones):
+			if not milestones:
+				messagebox.showinfo("海报", f"{person} 还没有比起点轻满 1 kg")
+				return
+			top = tk.Toplevel(self)
+			top.title(f'{person} 的里程碑')
+			top.transient(self)
+			cols = ('重山', '日期', '体重(kg)')
+			tree = ttk.Treeview(top, columns=cols, show='headings', height=min(len(milestones), 10))
+			for c in cols:
+				tree.heading(c, text=c)
+				tree.column(c, width=90, anchor='center')
+			for m in milestones:
+				tree.insert('', 'end', values=(m[1], from_epoch(m[2]).strftime('%Y-%m-%d'), round(m[3], 2)))
+			tree.pack(padx=10, pady=10)
+			tree.bind('<Double-1>', lambda _: [self.request_posters([milestones[tree.index(i)]], show=True) for i in tree.selection()])
+			center(top)
+
+		self.run_task(self.btn_poster, '读取中', lambda store, _: store.milestones(person), done)
+
+	# ---------------- 添加记录 ----------------
+	def add_record(self):
+		if not self.person:
+			messagebox.showwarning("提示", "请先选择人物")
+			return
+		try:
+			w_show = round(self.var_w.get(), 2)
+			w_kg = to_kg(w_show, self.person['unit'])
+			bmi = calc_bmi(w_kg, self.person['height'])
+			t = to_epoch(self.var_time.get())
+			# 写库、追加到缓存都在渲染线程里排队做，下一帧能接着折线末尾画，跨度变长也会解锁新的维度
+			args = (self.person['name'], t, w_kg, self.var_note.get(), bmi, self.person['source'])
+			if self.renderer is None: # 还在启动，等渲染线程起来再写
+				self.pending_adds.append(args)
+			else:
+				self.renderer.call(self.renderer.add, *args)
+			self.invalidate('chart')
+			time = datetime.datetime.now().strftime(TIME_FMT)
+			self.var_time.set(time)
+		except Exception as e:
+			messagebox.showerror("错误", str(e))
+
+	# ---------------- 导入导出 ----------------
+	def run_task(self, btn, busy, work, done, error=None):
+		"""work(store, progress) 在后台线程跑，进度经队列回到主线程显示在 btn 上，结束后调用 done(结果)
+
+		开库（迁移、PRAGMA）和读写都在后台线程，别的进程占着写锁时界面不会卡在 busy_timeout 上；
+		btn 为 None 时不显示进度；出错时调用 error(异常)，不给就弹错误框。
+		"""
+		q = queue.Queue()
+
+		def run():
+			try:
+				# sqlite 连接不能跨线程，后台线程自己开一个
+				with RecordStore(DB_PATH) as store:
+					result = work(store, lambda n, *_: q.put(('progress', n)))
+				q.put(('done', result))
+			except Exception as e:
+				q.put(('error', e))
+
+		text = btn.cget('text') if btn else None
+		if btn:
+			btn.state(['disabled'])
+		threading.Thread(target=run, daemon=True).start()
+		self.poll_task(q, btn, text, busy, done, error)
+
+	def poll_task(self, q, btn, text, busy, done, error=None):
+		while True:
+			try:
+				kind, data = q.get_nowait()
+			except queue.Empty:
+				self.after(30, self.poll_task, q, btn, text, busy, done, error)
+				return
+			alive = btn is not None and btn.winfo_exists() # 所在的窗口可能已经关了
+			if kind == 'progress':
+				if alive:
+					btn.config(text=f'{busy} {data}')
+				continue
+
+			if alive:
+				btn.config(text=text)
+				btn.state(['!disabled'])
+			if kind == 'error' and error:
+				error(data)
+			elif kind == 'error':
+				messagebox.showerror("错误", str(data))
+			else:
+				done(data)
+			return
+
+	def import_data(self):
+		"""后台线程流式导入，界面不卡"""
+		if not self.person:
+			messagebox.showwarning("提示", "请先选择人物")
+			return
+		path = filedialog.askopenfilename(parent=self, title='导入数据', filetypes=[('CSV / Apple Health', '*.csv *.xml'), ('所有文件', '*.*')])
+		if not path:
+			return
+
+		heights = {p['name']: p['height'] for p in self.persons}
+		person = self.person['name']
+
+		def work(store, progress):
+			reached = store.milestones(person)
+			total, inserted = import_file(store, path, person, heights, progress)
+			return total, inserted, store.milestones(person, reached[-1][1] if reached else 0)
+
+		def done(result):
+			total, inserted, milestones = result
+			messagebox.showinfo("导入完成", f"读取 {total} 条，新增 {inserted} 条" + (f"，新到达 {len(milestones)} 个里程碑" if milestones else ''))
+			# 导入线程走的是另一个连接，渲染线程据 data_version 发现后把新行并进缓存
+			self.invalidate('chart')
+			self.request_posters(milestones) # 历史数据补出来的里程碑在后台并行画好，之后打开不用等
+
+		self.run_task(self.btn_import, '导入中', work, done)
+
+	def export_data(self):
+		"""把当前人物的全部记录流式写到 CSV / Apple Health XML / JSON Lines"""
+		if not self.person:
+			messagebox.showwarning("提示", "请先选择人物")
+			return
+		path = filedialog.asksaveasfilename(
+			parent=self, title='导出数据', initialfile=f"{self.person['name']}.csv", defaultextension='.csv',
+			filetypes=[('CSV', '*.csv'), ('Apple Health', '*.xml'), ('JSON Lines', '*.jsonl')])
+		if not path:
+			return
+
+		person = self.person['name']
+		self.run_task(self.btn_export, '导出中', lambda store, progress: export(store, path, person=person, progress=progress),
+			lambda n: messagebox.showinfo("导出完成", f"已导出 {n} 条到\n{path}"))
+
+# ---------- 启动 ----------
+if __name__ == '__main__':
+	multiprocessing.freeze_support() # 打包成 exe 后海报子进程也从这里启动
+	App(profile=StartupProfile() if '--profile-startup' in sys.argv else None).mainloop()
@@ -0,0 +1,48 @@
+"""心情备注分词：装了 jieba 用 jieba，否则中文按相邻两字切（bigram），英文按单词
+
+词云的词频表用 tokenize()，换了分词方式（比如后来装上 jieba）要 RecordStore.rebuild_notes() 重建；
+全文索引用 index_words() 逐字存汉字，与分词方式无关。
+"""
+import re
+from importlib.util import find_spec
+
+# jieba 导入加载词典要零点几秒，第一次分词时才导入，不拖慢启动
+TOKENIZER = 'jieba' if find_spec('jieba') else 'bigram'
+_jieba = None
+CJK = re.compile(r'[㐀-鿿豈-﫿]+')
+WORD = re.compile(r'[A-Za-z][A-Za-z\']+|[㐀-鿿豈-﫿]+')
+# 出现再多也不进词云的虚词
+STOPWORDS = frozenset('''
+	今天 昨天 明天 一个 一点 有点 还是 就是 但是 因为 所以 然后 还有 没有 不是 自己 我们 他们 这个 那个 什么 怎么 感觉 好像
+	the and for with was are but not you this that have has had
+'''.split())
+
+def tokenize(text):
+	"""备注 → 词列表（保留重复，词频表按次数累加）；单字和虚词不要"""
+	if not text:
+		return []
+	global _jieba
+	if TOKENIZER == 'jieba' and _jieba is None:
+		import jieba as _jieba
+		_jieba.setLogLevel(60) # 不打印“Building prefix dict”之类
+	out = []
+	for run in WORD.findall(text):
+		if not CJK.match(run):
+			out.append(run.lower())
+		elif _jieba:
+			out.extend(_jieba.lcut(run))
+		else:
+			out.extend(run[i:i + 2] for i in range(len(run) - 1))
+	return [w for w in out if len(w) > 1 and w not in STOPWORDS]
+
+def index_words(text):
+	"""写进全文索引的词：汉字逐字，英文按单词；搜索时汉字按连续单字短语查，等于子串匹配，不受分词影响"""
+	out = []
+	for run in WORD.findall(text or ''):
+		out.extend(run if CJK.match(run) else [run.lower()])
+	return out
+
+def match_query(text):
+	"""搜索框文本 → FTS5 MATCH 表达式，空格隔开的各段都要出现；没有可搜的字返回 None"""
+	terms = [f'"{" ".join(run)}"' if CJK.match(run) else f'"{run.lower()}"' for run in WORD.findall(text)]
+	return ' '.join(terms) or None
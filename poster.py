@@ -0,0 +1,122 @@
+"""里程碑海报：“轻舟已过 k 重山”
+
+每张海报在独立进程里用 matplotlib Agg + PIL 画好存成 PNG，
+文件名是 (人物, 第几重山, 数据版本, 模板) 的哈希，画过的直接打开。
+"""
+import os, time, hashlib, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils import BASE_DIR, DB_PATH
+
+POSTER_DIR = os.path.join(BASE_DIR, 'posters')
+TEMPLATE = 'mountains-1' # 改了画法就换个名字，旧缓存自然失效
+SIZE = (1080, 1440)
+BG_TOP, BG_BOTTOM = (236, 244, 250), (196, 218, 232) # 背景上下渐变
+
+def poster_path(milestone, out_dir=POSTER_DIR):
+	"""milestone 为 store.milestones() 的一行 (person, k, time, weight, baseline, version)"""
+	person, k, _, _, _, version = milestone
+	key = hashlib.sha1(f'{person}\0{k}\0{version}\0{TEMPLATE}'.encode('utf-8')).hexdigest()[:20]
+	return os.path.join(out_dir, f'{key}.png')
+
+# ---------------- 画海报（子进程里跑） ----------------
+def render_poster(db_path, milestone, path):
+	"""自己开只读连接取到里程碑为止的曲线，画完原子地换上 path"""
+	from matplotlib import rcParams
+	from matplotlib.figure import Figure
+	from matplotlib.backends.backend_agg import FigureCanvasAgg
+	from matplotlib.dates import DateFormatter
+	from PIL import Image
+	from store import RecordStore
+	from series import Series, downsample
+
+	person, k, t, w, baseline, _ = milestone
+	with RecordStore(db_path, readonly=True) as store:
+		s = Series.from_rows(store.fetch_range(person, 0, t + 1))
+	xs = s.xs()
+	shown = downsample(xs, s.weights, 0, len(s), 600)
+
+	rcParams['font.family'] = 'SimHei'
+	rcParams['axes.unicode_minus'] = False
+	w_px, h_px = SIZE
+	fig = Figure(figsize=(w_px / 100, h_px / 100), dpi=100)
+	fig.patch.set_alpha(0) # 背景留给 PIL 画渐变
+	canvas = FigureCanvasAgg(fig)
+
+	fig.text(0.5, 0.88, f'轻舟已过 {k} 重山', ha='center', fontsize=54, color='#1d3557')
+	fig.text(0.5, 0.82, f"{person} · {time.strftime('%Y.%m.%d', time.localtime(t))}", ha='center', fontsize=22, color='#457b9d')
+
+	ax = fig.add_axes([0.1, 0.28, 0.82, 0.46])
+	ax.patch.set_alpha(0)
+	for side in ('top', 'right'):
+		ax.spines[side].set_visible(False)
+	ax.plot([xs[i] for i in shown], [s.weights[i] for i in shown], color='#1d3557', linewidth=2)
+	ax.axhline(baseline, color='#a8dadc', linestyle='--', linewidth=1.5)
+	ax.scatter([xs[-1]], [w], s=160, color='#e63946', zorder=3)
+	ax.annotate(f'{w:.1f} kg', (xs[-1], w), xytext=(-14, 10), textcoords='offset points', ha='right', va='bottom', fontsize=18, color='#e63946')
+	ax.xaxis.set_major_formatter(DateFormatter('%Y.%m'))
+	ax.set_ylabel('体重(kg)', fontsize=16)
+	ax.tick_params(labelsize=14)
+
+	fig.text(0.5, 0.16, f'起点 {baseline:.1f} kg，已轻 {baseline - w:.1f} kg', ha='center', fontsize=28, color='#1d3557')
+	fig.text(0.5, 0.06, '轻舟·尺素', ha='center', fontsize=16, color='#6c8ba0')
+	canvas.draw()
+	chart = Image.frombuffer('RGBA', canvas.get_width_height(), bytes(canvas.buffer_rgba()), 'raw', 'RGBA', 0, 1)
+
+	# 竖直渐变：一列 1 像素宽的渐变拉伸到整幅
+	column = Image.new('RGB', (1, h_px))
+	column.putdata([tuple(a + (b - a) * y // (h_px - 1) for a, b in zip(BG_TOP, BG_BOTTOM)) for y in range(h_px)])
+	poster = column.resize((w_px, h_px)).convert('RGBA')
+	poster.alpha_composite(chart)
+
+	tmp = f'{path}.{os.getpid()}.tmp'
+	poster.convert('RGB').save(tmp, 'PNG', optimize=True)
+	os.replace(tmp, path) # 不会留下画了一半的缓存
+	return path
+
+# ---------------- 进程池 ----------------
+class PosterMaker:
+	"""在界面线程里用：request() 交任务，poll() 在 after 循环里回调画好的海报
+
+	子进程用 spawn 启动，不继承界面进程里的 Tk、渲染线程和数据库连接。
+	"""
+
+	def __init__(self, db_path=DB_PATH, out_dir=POSTER_DIR, workers=None):
+		self.db_path = db_path
+		self.out_dir = out_dir
+		self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+		self.pool = None
+		self.pending = {} # 路径 → (future, [回调])
+
+	def request(self, milestone, done):
+		"""缓存里有就立刻 done(路径)；没有就交给进程池，画好后由 poll() 调 done"""
+		path = poster_path(milestone, self.out_dir)
+		if os.path.exists(path):
+			done(path)
+			return
+		if path in self.pending:
+			self.pending[path][1].append(done)
+			return
+		if self.pool is None:
+			os.makedirs(self.out_dir, exist_ok=True)
+			self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+		self.pending[path] = (self.pool.submit(render_poster, self.db_path, milestone, path), [done])
+
+	def poll(self):
+		"""处理已完成的任务，返回还有没有在画的；出错时回调收到异常"""
+		for path, (future, callbacks) in list(self.pending.items()):
+			if not future.done():
+				continue
+			del self.pending[path]
+			result = future.exception() or future.result()
+			if isinstance(result, BrokenProcessPool) and self.pool: # 子进程被杀掉了，下次请求重建进程池
+				self.pool.shutdown(wait=False)
+				self.pool = None
+			for done in callbacks:
+				done(result)
+		return bool(self.pending)
+
+	def close(self):
+		if self.pool:
+			self.pool.shutdown(cancel_futures=True) # 正在画的那张等它画完，最多零点几秒
@@ -0,0 +1,584 @@
+import copy, math, time, queue, datetime, threading
+from bisect import bisect_left
+from collections import deque, OrderedDict
+
+import numpy as np
+
+from store import RecordStore, GRAIN_SECONDS
+from series import SeriesCache, downsample, mpl_day
+from archive import ARCHIVE_DIR
+from utils import DB_PATH, SCOPE_MONTHS, ROLLUP_SCOPES, KG2UNIT, CHART_SIZE as SIZE, available_scopes, subtract_months, to_show_unit
+from analytics import Analysis, bmi_classes, to_unit
+
+DPI = 100
+FRAME_CACHE_BYTES = 64 << 20 # 缓存的帧（位图 + 悬停用的点）最多占这么多内存
+# 叠加线的样式，名字见 utils.OVERLAYS
+OVERLAY_STYLES = {
+	'7日均线': dict(color='C1', linewidth=1.2),
+	'30日均线': dict(color='C2', linewidth=1.5),
+	'趋势': dict(color='C3', linewidth=1.2, linestyle='--'),
+	'目标预测': dict(color='C3', linewidth=1.2, linestyle=':'),
+}
+
+# ---------------- 帧 ----------------
+class Frame:
+	"""渲染线程画好的一帧，界面线程只读
+
+	image 是整张图（PIL RGBA）；series 是当前窗口原始点的副本，悬停用；
+	to_px = (sx, ox, sy, oy) 把数据坐标换成画布像素：px = x*sx + ox，py = 体重*sy + oy；
+	plot_box 为绘图区在画布上的 (左, 上, 右, 下)；hits 为备注搜索在窗口内命中的条数，没在搜索为 None；
+	levels 为 series 每个点的 BMI 等级，渲染线程一次算好。
+	"""
+	__slots__ = ('gen', 'person', 'scope', 'scopes', 'image', 'series', 'to_px', 'plot_box', 'hits', 'levels')
+
+	def __init__(self, gen, person, scope, scopes, image, series=None, to_px=None, plot_box=None, hits=None):
+		self.gen = gen
+		self.person = person
+		self.scope = scope
+		self.scopes = scopes
+		self.image = image
+		self.series = series
+		self.to_px = to_px
+		self.plot_box = plot_box
+		self.hits = hits
+		self.levels = bmi_classes(np.frombuffer(series.bmis), person['sex']) if series else None
+
+	def hit(self, x, y):
+		"""画布像素 (x, y) 最近的点的下标，不在绘图区里或没有点时为 None
+
+		像素换回日期数，x 有序，二分后比较左右两个邻居。
+		"""
+		left, top, right, bottom = self.plot_box
+		if not (self.series and left <= x <= right and top <= y <= bottom):
+			return None
+		sx, ox, _, _ = self.to_px
+		xs = self.series.xs()
+		x = (x - ox) / sx
+		k = bisect_left(xs, x)
+		if k == len(xs) or (k > 0 and x - xs[k - 1] <= xs[k] - x):
+			k -= 1
+		return k
+
+class FrameCache:
+	"""画好的帧按 (人物, 资料, 维度, 尺寸, …, 数据版本, 日期) 缓存，超过内存上限先淘汰最久没用的
+
+	数据版本变了键就不同，旧帧不会被取到；drop() 把某人的旧帧提前腾出来。
+	键里带上当天日期：短维度的横轴终点是“现在”，隔天要重画。
+	"""
+
+	def __init__(self, max_bytes=FRAME_CACHE_BYTES):
+		self.max_bytes = max_bytes
+		self.nbytes = 0
+		self._frames = OrderedDict() # 键 → (帧, 字节数)
+
+	def get(self, key):
+		hit = self._frames.get(key)
+		if hit is None:
+			return None
+		self._frames.move_to_end(key)
+		return hit[0]
+
+	def put(self, key, frame):
+		w, h = frame.image.size
+		size = w * h * 4 + (frame.series.nbytes() if frame.series else 0)
+		if key in self._frames:
+			self.nbytes -= self._frames.pop(key)[1]
+		self._frames[key] = (frame, size)
+		self.nbytes += size
+		while self.nbytes > self.max_bytes and len(self._frames) > 1:
+			self.nbytes -= self._frames.popitem(last=False)[1][1]
+
+	def drop(self, person):
+		"""扔掉含该人物的帧（单人图和含他的对比图），键的第一项是人物姓名元组"""
+		for key in [k for k in self._frames if person in k[0]]:
+			self.nbytes -= self._frames.pop(key)[1]
+
+# ---------------- 渲染线程 ----------------
+class ChartRenderer:
+	"""后台线程独占数据库连接、序列缓存和离屏 Agg 画布
+
+	界面线程用 request() 要一帧、call() 投递写库/写配置，再用 poll() 取回结果，
+	自己从不碰 SQLite 和 matplotlib。新的 request() 会让还没画完的旧请求作废，
+	快速连点时间维度只画最后一个；call() 的任务不会作废，按投递顺序先于渲染执行。
+	"""
+
+	def __init__(self, path=DB_PATH, archive_dir=ARCHIVE_DIR):
+		self.path = path
+		self.archive_dir = archive_dir # 冷启动读的列式快照目录，None 为只读库
+		self.gen = 0 # 最新请求的编号
+		self.pending = None # 最新的、还没开始画的请求
+		self.jobs = deque()
+		self.closed = False
+		self.cond = threading.Condition()
+		self.results = queue.Queue() # (编号, Frame 或异常)，call() 的异常编号为 None
+		self.thread = threading.Thread(target=self.run, name='render', daemon=True)
+		self.thread.start()
+
+	# ---------- 界面线程调用 ----------
+	def request(self, person, scope, size, select=False, compare=None, overlays=(), search=''):
+		"""要一帧；select=True 时改用该人物第一个可用的时间维度
+
+		compare 为 (姓名元组, 指标) 时把这些人叠在同一坐标轴上对比，指标见 utils.COMPARE_METRICS；
+		overlays 为要叠加的分析线（见 utils.OVERLAYS），search 为备注搜索词，命中的点圈出来，这两样只在单人时画。
+		"""
+		with self.cond:
+			self.gen += 1
+			self.pending = (self.gen, dict(person) if person else None, scope, size, select, compare, tuple(overlays), search.strip())
+			self.cond.notify()
+		return self.gen
+
+	def call(self, fn, *args):
+		"""在渲染线程里按顺序执行 fn(*args)"""
+		with self.cond:
+			self.jobs.append((fn, args))
+			self.cond.notify()
+
+	def poll(self):
+		"""取出所有已完成的结果，不阻塞"""
+		out = []
+		while True:
+			try:
+				out.append(self.results.get_nowait())
+			except queue.Empty:
+				return out
+
+	def close(self):
+		"""放弃没画的帧，等已投递的写入做完再关库"""
+		with self.cond:
+			self.closed = True
+			self.gen += 1
+			self.pending = None
+			self.cond.notify()
+		self.thread.join()
+
+	# ---------- 渲染线程 ----------
+	def stale(self, gen):
+		return gen != self.gen
+
+	def run(self):
+		# sqlite 连接只能在创建它的线程里用
+		self.store = RecordStore(self.path)
+		self.series = SeriesCache(self.store, archive_dir=self.archive_dir)
+		self.analyses = {} # 姓名 → Analysis，序列换了或补录了旧数据就重算
+		self.new_points = [] # add() 追加、还没画上去的点
+		self.key = None # 上一帧的 (人物, 单位, 维度, 尺寸)
+		self.frames = FrameCache()
+		self.setup_chart()
+		try:
+			while True:
+				with self.cond:
+					while not (self.jobs or self.pending or self.closed):
+						self.cond.wait()
+					if self.jobs:
+						job, req = self.jobs.popleft(), None
+					elif self.pending:
+						job, req, self.pending = None, self.pending, None
+					else:
+						break
+				try:
+					if job:
+						job[0](*job[1])
+					else:
+						self.render(*req)
+				except Exception as e:
+					self.results.put((req and req[0], e))
+		finally:
+			self.store.close()
+
+	def add(self, person, t, w, note, bmi, source=''):
+		"""写入一条记录并追加到缓存序列，下一帧能直接把它接到折线末尾；越过新的整公斤就把里程碑交给界面"""
+		reached = self.store.milestones(person)
+		rowid = self.store.insert(person, t, w, note, bmi, source)
+		new = self.store.milestones(person, reached[-1][1] if reached else 0)
+		if new:
+			self.results.put((None, new))
+		i = self.series.add(person, t, w, note, bmi, rowid)
+		self.frames.drop(person)
+		self.new_points.append(i)
+		a = self.analyses.get(person)
+		if a and (i is None or not a.append(i)):
+			del self.analyses[person]
+
+	def watch(self):
+		"""界面定时投递：其他进程写过库就把新行并进缓存，变了的人物集合交给界面决定要不要重画"""
+		changed = self.series.check()
+		if changed:
+			self.results.put((None, changed))
+
+	def analysis(self, name, s):
+		a = self.analyses.get(name)
+		if a is None or a.series is not s or a.n != len(s):
+			a = self.analyses[name] = Analysis(s)
+		return a
+
+	def render(self, gen, person, scope, size, select, compare, overlays, search):
+		if compare:
+			group = self.series.get_many(compare[0])
+			spans = [s.span() for s in group.values() if len(s)]
+			span = spans and (min(a for a, _ in spans), max(b for _, b in spans))
+		else:
+			s = self.series.get(person['name']) if person else None
+			span = s and s.span()
+		scopes = available_scopes(span) if person or compare else []
+		if scopes and (select or scope not in scopes):
+			scope = scopes[0]
+		if self.stale(gen):
+			return
+
+		names = compare[0] if compare else (person['name'],) if person else ()
+		# 整份资料都进键：单位、目标改了要重画，性别、身高改了悬停的 BMI 等级也跟着变
+		profile = person and tuple(sorted(person.items()))
+		cache_key = (names, profile, scope, size, compare, overlays, search,
+			tuple(self.store.person_version(name) for name in names), datetime.date.today())
+		hit = self.frames.get(cache_key)
+		if hit:
+			# 命中不动画布，self.key 仍对应画布上的内容，之后的追加快路径照常可用
+			frame = copy.copy(hit)
+			frame.gen = gen
+			self.results.put((gen, frame))
+			return
+
+		self.resize(size)
+		key = (person and person['name'], person and person['unit'], scope, size, compare, overlays, search)
+		points, self.new_points = self.new_points, []
+		if compare:
+			self.draw_compare(group, compare[1], scope, person['unit'] if person else 'kg')
+			self.key = key
+		elif not (key == self.key and points and not overlays and not search and all(self.append_point(i, person) for i in points)):
+			self.draw_chart(s, person, scope, overlays, search)
+			self.key = key
+		if self.stale(gen):
+			return
+		frame = self.frame(gen, person, scope, scopes)
+		self.frames.put(cache_key, frame)
+		self.results.put((gen, frame))
+
+	def frame(self, gen, person, scope, scopes):
+		"""把画布内容和悬停数据打包；窗口原始点复制一份，之后 add() 不影响界面读"""
+		from PIL import Image
+		w, h = self.canvas.get_width_height()
+		image = Image.frombuffer('RGBA', (w, h), bytes(self.canvas.buffer_rgba()), 'raw', 'RGBA', 0, 1)
+		if not self.hover:
+			return Frame(gen, person, scope, scopes, image, hits=self.hit_count)
+
+		s, lo, hi = self.hover
+		s.xs() # 悬停要用，顺带缓存在序列上
+		(px0, py0), (px1, py1) = self.ax.transData.transform([(0, 0), (1, 1)])
+		x0, y0, x1, y1 = self.ax.bbox.extents
+		# matplotlib 的像素原点在左下，Tk 画布在左上
+		to_px = (px1 - px0, px0, py0 - py1, h - py0)
+		return Frame(gen, person, scope, scopes, image, s.slice(lo, hi), to_px, (x0, h - y1, x1, h - y0), self.hit_count)
+
+	# ---------- 图表 ----------
+	def setup_chart(self):
+		"""坐标轴、折线、占位文字整个会话只建一次，之后只改数据和范围"""
+		from matplotlib import rcParams
+		from matplotlib.figure import Figure
+		from matplotlib.backends.backend_agg import FigureCanvasAgg
+		from matplotlib.dates import DateFormatter
+
+		# 让中文正常
+		rcParams['font.family'] = 'SimHei'
+		rcParams['axes.unicode_minus'] = False
+
+		self.fig = Figure(figsize=(SIZE[0] / DPI, SIZE[1] / DPI), dpi=DPI)
+		self.ax = self.fig.add_subplot(111)
+		self.canvas = FigureCanvasAgg(self.fig)
+		self.ax.xaxis.set_major_formatter(DateFormatter('%Y.%m.%d'))
+		self.ax.set_xlabel('')
+		# 只留坐标轴
+		self.ax.spines['top'].set_visible(False)
+		self.ax.spines['right'].set_visible(False)
+
+		# 折线是 animated 的：整图重绘时不画，由 on_draw 叠在缓存的背景上
+		self.line, = self.ax.plot([], [], marker='o', animated=True)
+		self.line_x, self.line_y = [], []
+		self.placeholder = self.ax.text(0.5, 0.5, "暂无数据", ha='center', va='center', transform=self.ax.transAxes, visible=False)
+		self.cmp_lines = [] # 对比模式每人一条，按需添加、反复复用
+		self.overlay_lines = {name: self.ax.plot([], [], animated=True, visible=False, **style)[0] for name, style in OVERLAY_STYLES.items()}
+		self.eta_text = self.ax.text(0.98, 0.95, '', ha='right', va='top', fontsize='small', transform=self.ax.transAxes, animated=True, visible=False)
+		# 备注搜索命中的点画成空心圈，套在折线的点外面
+		self.hits, = self.ax.plot([], [], linestyle='', marker='o', markersize=10, markerfacecolor='none',
+			markeredgecolor='C3', markeredgewidth=1.5, animated=True, visible=False)
+		self.hit_count = None
+		self.hover = None # (series, lo, hi) 当前窗口
+		self.dense = False
+		self.view = None # 上次的坐标范围/刻度，没变就不整图重绘
+		self.chart_bg = None # 不含折线的背景
+		self.canvas.mpl_connect('draw_event', self.on_draw)
+
+	def resize(self, size):
+		if size != self.canvas.get_width_height():
+			self.fig.set_size_inches(size[0] / DPI, size[1] / DPI)
+			self.view = () # 既不是占位也不是任何坐标范围，下一次一定整图重绘
+
+	def draw_chart(self, s, person, scope, overlays=(), search=''):
+		self.hover = None
+		self.show_compare([])
+		self.show_overlays(None, None, 0, 0, ())
+		self.show_hits(None, None, 0, 0, '')
+
+		# --------- 数据 ---------
+		if s is None or not len(s):
+			self.show_placeholder()
+			return
+
+		# 时间过滤
+		now = datetime.datetime.now()
+		months = SCOPE_MONTHS[scope]
+		cutoff = subtract_months(now, months=months)
+		# 二分定位窗口，代价只和窗口内的点数有关
+		lo, hi = s.window(cutoff.timestamp()) if months != 0 else (0, len(s))
+
+		if lo == hi:
+			self.show_placeholder()
+			return
+
+		unit = person['unit']
+		width = max(int(self.ax.bbox.width), 3)
+		grain = self.rollup_grain(s, lo, hi, width, scope)
+		if grain:
+			# 长维度直接画汇总桶的平均值，代价只和桶数有关；悬停仍然用全部原始点
+			buckets = self.series.rollups(person['name'], grain)
+			buckets = buckets[bisect_left([b[6] for b in buckets], s.times[lo]):]
+			dense = True
+			self.line_x = [mpl_day((b[5] + b[6]) // 2) for b in buckets]
+			self.line_y = to_unit([b[4] for b in buckets], unit)
+			w_min, w_max = min(b[2] for b in buckets), max(b[3] for b in buckets)
+		else:
+			# 其余降采样到约等于绘图区的像素宽度
+			shown = downsample(s.times, s.weights, lo, hi, width)
+			dense = len(shown) < hi - lo
+			self.line_x = np.array(s.xs()[lo:hi])[np.subtract(shown, lo)]
+			window = np.array(s.weights[lo:hi])
+			self.line_y = to_unit(window[np.subtract(shown, lo)], unit)
+			w_min, w_max = window.min(), window.max()
+
+		# --------- X 轴仅三个刻度 ---------
+		if months != 0: # 不为全部
+			start = cutoff
+		else: # 为全部
+			start = datetime.datetime.fromtimestamp(s.times[0])
+		x0, x1 = mpl_day(start.timestamp()), mpl_day(now.timestamp())
+		pad = (x1 - x0) * 0.05
+
+		# --------- Y 轴动态整十 ---------
+		y_min, y_max = to_show_unit(w_min, unit), to_show_unit(w_max, unit)
+		y_low = math.floor(y_min / 5) * 5
+		y_high = math.ceil(y_max / 5) * 5
+
+		# --------- 画折线+点 ---------
+		self.line.set_data(self.line_x, self.line_y)
+		self.line.set_marker('' if dense else 'o') # 降采样后点太密，只画线
+		self.hover = (s, lo, hi)
+		self.dense = dense
+		self.show_overlays(s, person, lo, hi, overlays)
+		self.show_hits(s, person, lo, hi, search)
+
+		# 日期标签精确到天，同一天内的范围变化不用重画坐标轴
+		self.set_view((round(x0), round(x1), y_low, y_high, f'体重({unit})'), (x0, x1 + pad), (y_low, y_high), [x0, (x0 + x1) / 2, x1])
+
+	def draw_compare(self, group, metric, scope, unit):
+		"""多人叠加：所有人的窗口拼成一列用 numpy 一次换算，再按人切开各自降采样"""
+		self.hover = None
+		self.line.set_data([], [])
+		self.show_overlays(None, None, 0, 0, ())
+		self.show_hits(None, None, 0, 0, '')
+		now = datetime.datetime.now()
+		months = SCOPE_MONTHS[scope]
+		cutoff = subtract_months(now, months=months)
+
+		names, windows = [], []
+		for name, s in group.items():
+			lo, hi = s.window(cutoff.timestamp()) if months != 0 else (0, len(s))
+			if lo < hi:
+				names.append(name)
+				windows.append((s, lo, hi))
+		if not windows:
+			self.show_compare([])
+			self.show_placeholder()
+			return
+
+		counts = [hi - lo for _, lo, hi in windows]
+		bounds = np.cumsum([0] + counts)
+		w = np.concatenate([np.frombuffer(s.weights)[lo:hi] for s, lo, hi in windows])
+		if metric == 'BMI':
+			v = np.concatenate([np.frombuffer(s.bmis)[lo:hi] for s, lo, hi in windows])
+			label = 'BMI'
+		elif metric == '变化%':
+			v = (w / np.repeat(w[bounds[:-1]], counts) - 1) * 100
+			label = '相对变化(%)'
+		else:
+			v = w * KG2UNIT[unit]
+			label = f'体重({unit})'
+		if np.isnan(v).all():
+			self.show_compare([])
+			self.show_placeholder()
+			return
+
+		width = max(int(self.ax.bbox.width), 3)
+		curves = []
+		for (s, lo, hi), a, b in zip(windows, bounds[:-1], bounds[1:]):
+			ys = v[a:b]
+			xs = np.frombuffer(s.xs())[lo:hi]
+			keep = ~np.isnan(ys) # 没有 BMI 的记录不画
+			xs, ys = xs[keep].tolist(), ys[keep].tolist()
+			shown = downsample(xs, ys, 0, len(xs), width)
+			curves.append(([xs[i] for i in shown], [ys[i] for i in shown], len(shown) < len(xs)))
+		self.show_compare(curves)
+
+		start = cutoff if months != 0 else datetime.datetime.fromtimestamp(min(s.times[lo] for s, lo, _ in windows))
+		x0, x1 = mpl_day(start.timestamp()), mpl_day(now.timestamp())
+		pad = (x1 - x0) * 0.05
+		y_low = math.floor(np.nanmin(v) / 5) * 5
+		y_high = math.ceil(np.nanmax(v) / 5) * 5
+		if y_low == y_high:
+			y_high += 5
+
+		# 图例和折线一样 animated，叠在线上面；人名变了坐标范围的 key 也跟着变，一定整图重绘
+		key = (round(x0), round(x1), y_low, y_high, tuple(names), label)
+		if key != self.view:
+			legend = self.ax.legend(self.cmp_lines[:len(names)], names, loc='upper left', fontsize='small')
+			legend.set_animated(True)
+		self.set_view(key, (x0, x1 + pad), (y_low, y_high), [x0, (x0 + x1) / 2, x1])
+
+	def show_overlays(self, s, person, lo, hi, overlays):
+		"""在 [lo, hi) 上叠加滑动平均、指数平滑趋势和目标预测；overlays 为空时全部收起"""
+		for line in self.overlay_lines.values():
+			line.set_visible(False)
+		self.eta_text.set_visible(False)
+		if not overlays or lo == hi:
+			return
+		a = self.analysis(person['name'], s)
+		unit = person['unit']
+		# 分析线都是平滑的，均匀取约像素宽度个点就够
+		# 只复制窗口里的切片，不拿 frombuffer 视图：视图活着时 array 不能再追加
+		idx = np.unique(np.linspace(0, hi - lo - 1, min(hi - lo, max(int(self.ax.bbox.width), 3))).astype(int))
+		xs = np.array(s.xs()[lo:hi])[idx]
+		columns = {'7日均线': a.rolling[7], '30日均线': a.rolling[30], '趋势': a.trend}
+		for name in overlays:
+			line = self.overlay_lines[name]
+			if name in columns:
+				line.set_data(xs, to_unit(np.array(columns[name][lo:hi])[idx], unit))
+				line.set_visible(True)
+				continue
+
+			# 目标预测：从回归直线上的当前点连到预计达到目标的那天
+			target = person.get('target')
+			proj = a.projection(target) if target else None
+			if proj:
+				t_now, w_now, t_eta = proj
+				line.set_data([mpl_day(t_now), mpl_day(t_eta)], to_unit([w_now, target], unit))
+				line.set_visible(True)
+				text = f"预计 {time.strftime('%Y.%m.%d', time.localtime(t_eta))} 达到 {to_show_unit(target, unit)} {unit}"
+			else:
+				text = '未设目标体重' if not target else '按近期趋势达不到目标'
+			self.eta_text.set_text(text)
+			self.eta_text.set_visible(True)
+
+	def show_hits(self, s, person, lo, hi, search):
+		"""在 [lo, hi) 里圈出备注含 search 的点，查的是全文索引；search 为空时收起"""
+		self.hits.set_visible(False)
+		self.hit_count = None
+		if not search:
+			return
+		times = self.store.search_notes(person['name'], search, s.times[lo]) if lo < hi else []
+		idx = [bisect_left(s.times, t, lo, hi) for t in times]
+		idx = [i for i in idx if i < hi]
+		xs = s.xs()
+		self.hits.set_data([xs[i] for i in idx], to_unit([s.weights[i] for i in idx], person['unit']))
+		self.hits.set_visible(bool(idx))
+		self.hit_count = len(idx)
+
+	def show_compare(self, curves):
+		"""curves 为每人的 (xs, ys, 是否降采样)；传空列表收起对比线和图例"""
+		while len(self.cmp_lines) < len(curves):
+			line, = self.ax.plot([], [], color=f'C{len(self.cmp_lines)}', animated=True)
+			self.cmp_lines.append(line)
+		for i, line in enumerate(self.cmp_lines):
+			if i < len(curves):
+				xs, ys, dense = curves[i]
+				line.set_data(xs, ys)
+				line.set_marker('' if dense else 'o')
+				line.set_markersize(3)
+				line.set_visible(True)
+			else:
+				line.set_visible(False)
+		legend = self.ax.get_legend()
+		if not curves and legend:
+			legend.remove()
+
+	def rollup_grain(self, s, lo, hi, width, scope):
+		"""长维度点数超过像素宽度时，选桶数不超过宽度的最细粒度；返回 None 表示画原始点"""
+		if scope not in ROLLUP_SCOPES or hi - lo <= width:
+			return None
+		seconds = (s.times[hi - 1] - s.times[lo]) or 1
+		return next((g for g, sec in GRAIN_SECONDS.items() if seconds / sec <= width), 'month')
+
+	def set_view(self, key, xlim, ylim, xticks):
+		"""坐标轴没变只重画折线，变了才整图重绘"""
+		if key == self.view:
+			self.blit_line()
+			return
+		self.view = key
+		self.placeholder.set_visible(False)
+		self.ax.set_xlim(*xlim)
+		self.ax.set_xticks(xticks)
+		self.ax.set_ylim(*ylim)
+		self.ax.set_yticks(range(ylim[0], ylim[1] + 1, 5))
+		self.ax.set_ylabel(key[-1])
+		self.canvas.draw()
+
+	def show_placeholder(self):
+		self.line_x, self.line_y = [], []
+		self.line.set_data([], [])
+		if self.view is None and self.placeholder.get_visible():
+			return
+		self.view = None
+		self.placeholder.set_visible(True)
+		self.canvas.draw()
+
+	def append_point(self, i, person):
+		"""新记录落在当前窗口末尾时只追加一个点；返回 False 表示需要整体重算"""
+		s, lo, hi = self.hover or (None, 0, 0)
+		if i is None or s is None or self.dense or i != hi or s is not self.series.get(person['name']):
+			return False
+		x, y = s.xs()[i], to_show_unit(s.weights[i], person['unit'])
+		(x0, x1), (y0, y1) = self.ax.get_xlim(), self.ax.get_ylim()
+		if not (x0 <= x <= x1 and y0 <= y <= y1):
+			return False
+		self.line_x = np.append(self.line_x, x)
+		self.line_y = np.append(self.line_y, y)
+		self.line.set_data(self.line_x, self.line_y)
+		self.hover = (s, lo, hi + 1)
+		self.blit_line()
+		return True
+
+	def on_draw(self, event):
+		"""整图重绘后缓存不含折线的背景，再把 animated 的折线补画上去"""
+		self.chart_bg = self.canvas.copy_from_bbox(self.fig.bbox)
+		self.draw_lines()
+
+	def blit_line(self):
+		"""只有折线变了：贴回不含折线的背景，只重画折线"""
+		if self.chart_bg is None:
+			self.canvas.draw()
+			return
+		self.canvas.restore_region(self.chart_bg)
+		self.draw_lines()
+
+	def draw_lines(self):
+		for line in self.overlay_lines.values():
+			if line.get_visible():
+				self.ax.draw_artist(line)
+		self.ax.draw_artist(self.line)
+		if self.hits.get_visible():
+			self.ax.draw_artist(self.hits)
+		if self.eta_text.get_visible():
+			self.ax.draw_artist(self.eta_text)
+		for line in self.cmp_lines:
+			if line.get_visible():
+				self.ax.draw_artist(line)
+		legend = self.ax.get_legend()
+		if legend:
+			self.ax.draw_artist(legend)
@@ -0,0 +1,330 @@
+import os, math, time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+# ---------------- 单人时间序列 ----------------
+def mpl_day(t):
+	"""epoch 秒 → matplotlib 日期数，与 date2num(from_epoch(t)) 相同但不构造 datetime"""
+	return (t + time.localtime(t).tm_gmtoff) / 86400
+
+class Series:
+	"""一个人物的全部记录，按时间升序、按列存放
+
+	每条记录约 28 字节（时间 8 + 体重 8 + BMI 8 + 备注偏移 4），
+	备注 UTF-8 拼在一块 note_heap 里，第 i 条是 note_heap[note_offs[i]:note_offs[i+1]]。
+	"""
+	__slots__ = ('times', 'weights', 'bmis', 'note_offs', 'note_heap', '_xs')
+
+	def __init__(self):
+		self.times = array('q') # epoch 秒
+		self.weights = array('d') # kg
+		self.bmis = array('d') # 缺失为 nan
+		self.note_offs = array('I', [0])
+		self.note_heap = bytearray()
+		self._xs = None # matplotlib 日期数，悬停二分用，按需生成
+
+	@classmethod
+	def from_rows(cls, rows):
+		"""rows 为按时间排好序的 (time, weight, note, bmi)"""
+		s = cls()
+		for t, w, n, b in rows:
+			s.times.append(t)
+			s.weights.append(w)
+			s.bmis.append(math.nan if b is None else b)
+			if n:
+				s.note_heap += n.encode('utf-8')
+			s.note_offs.append(len(s.note_heap))
+		return s
+
+	def __len__(self):
+		return len(self.times)
+
+	def note(self, i):
+		return self.note_heap[self.note_offs[i]:self.note_offs[i + 1]].decode('utf-8')
+
+	def bmi(self, i):
+		b = self.bmis[i]
+		return None if math.isnan(b) else b
+
+	def span(self):
+		"""(最早, 最晚) epoch 秒，空序列返回 None"""
+		if not self.times:
+			return None
+		return self.times[0], self.times[-1]
+
+	def xs(self):
+		"""每个点的 matplotlib 日期数（本地时间），与 times 一一对应、同样有序"""
+		if self._xs is None:
+			self._xs = array('d', (mpl_day(t) for t in self.times))
+		return self._xs
+
+	def window(self, start, end=None):
+		"""[start, end] 时间区间对应的下标范围 (lo, hi)，二分查找"""
+		lo = bisect_left(self.times, start)
+		hi = len(self.times) if end is None else bisect_right(self.times, end, lo)
+		return lo, hi
+
+	def add(self, t, w, note, bmi):
+		"""插入一条记录；时间不早于末尾时是 O(1) 追加"""
+		b = math.nan if bmi is None else bmi
+		data = note.encode('utf-8') if note else b''
+		if not self.times or t >= self.times[-1]:
+			self.times.append(t)
+			self.weights.append(w)
+			self.bmis.append(b)
+			self.note_heap += data
+			self.note_offs.append(len(self.note_heap))
+			if self._xs is not None:
+				self._xs.append(mpl_day(t))
+			return len(self.times) - 1
+
+		# 补录的旧数据：插到有序位置，后面的备注偏移整体后移
+		i = bisect_right(self.times, t)
+		self.times.insert(i, t)
+		self.weights.insert(i, w)
+		self.bmis.insert(i, b)
+		pos = self.note_offs[i]
+		self.note_heap[pos:pos] = data
+		self.note_offs.insert(i + 1, pos + len(data))
+		for j in range(i + 2, len(self.note_offs)):
+			self.note_offs[j] += len(data)
+		if self._xs is not None:
+			self._xs.insert(i, mpl_day(t))
+		return i
+
+	def slice(self, lo, hi):
+		"""[lo, hi) 的独立副本，交给别的线程只读，不受之后 add() 的影响"""
+		s = Series()
+		s.times = self.times[lo:hi]
+		s.weights = self.weights[lo:hi]
+		s.bmis = self.bmis[lo:hi]
+		base = self.note_offs[lo]
+		s.note_offs = array('I', (o - base for o in self.note_offs[lo:hi + 1]))
+		s.note_heap = self.note_heap[base:self.note_offs[hi]]
+		if self._xs is not None:
+			s._xs = self._xs[lo:hi]
+		return s
+
+	def nbytes(self):
+		return (self.times.itemsize * len(self.times) + self.weights.itemsize * len(self.weights)
+			+ self.bmis.itemsize * len(self.bmis) + self.note_offs.itemsize * len(self.note_offs)
+			+ len(self.note_heap))
+
+# ---------------- 降采样 ----------------
+def lttb(xs, ys, lo, hi, threshold):
+	"""Largest-Triangle-Three-Buckets：从 [lo, hi) 里挑出约 threshold 个下标，保留曲线形状"""
+	n = hi - lo
+	if threshold >= n or threshold < 3:
+		return list(range(lo, hi))
+
+	out = [lo]
+	every = (n - 2) / (threshold - 2)
+	a = lo # 上一个选中的点
+	for i in range(threshold - 2):
+		# 下一个桶的均值作为三角形的第三个顶点
+		ns = lo + int((i + 1) * every) + 1
+		ne = min(lo + int((i + 2) * every) + 1, hi)
+		avg_x = sum(xs[ns:ne]) / (ne - ns)
+		avg_y = sum(ys[ns:ne]) / (ne - ns)
+
+		# 当前桶里挑与 a、下一桶均值围成面积最大的点
+		ax, ay = xs[a], ys[a]
+		best, area = -1, -1.0
+		for j in range(lo + int(i * every) + 1, ns):
+			ar = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+			if ar > area:
+				best, area = j, ar
+		out.append(best)
+		a = best
+	out.append(hi - 1)
+	return out
+
+def downsample(xs, ys, lo, hi, threshold):
+	"""LTTB 降到约 threshold 个点，并保证窗口内的最高、最低点一定在内"""
+	idx = lttb(xs, ys, lo, hi, threshold)
+	if len(idx) == hi - lo:
+		return idx
+	window = ys[lo:hi]
+	extremes = {lo + window.index(min(window)), lo + window.index(max(window))}
+	return sorted(extremes.union(idx))
+
+# ---------------- 缓存 ----------------
+MERGE_MAX = 2000 # 其他进程一次新增超过这么多行（如导入）就整段重读，不逐条插入
+
+class SeriesCache:
+	"""按人物缓存 Series，最近最少使用的先淘汰
+
+	本进程写入时直接 add() 追加；其他连接（进程）改过库时 check() 只取 id 高水位之后的新行并进来，
+	并不整段重读：PRAGMA data_version 没变时检查只是一条 pragma。
+	给出 archive_dir 时长序列从快照（见 archive.py）加库里快照之后的新行拼出来，读库整段读入的长序列顺手写快照。
+	"""
+
+	def __init__(self, store, max_persons=16, archive_dir=None):
+		self.store = store
+		self.max_persons = max_persons
+		self.archive_dir = archive_dir
+		self._data = OrderedDict()
+		self._rollups = {} # (person, grain) → 汇总桶，体量只有几百行，不计入 LRU
+		with store.snapshot():
+			self._version = store.data_version()
+			self._last_id = store.last_id() # 已经看过的最大记录 id
+			self._seen = store.person_versions() # 上次检查时各人的版本号，用来报告谁变了
+		self._versions = {} # 已缓存的人物 → 序列内容对应的版本号
+		self._own = set() # 本连接写入、高水位之后的 id，合并时跳过
+
+	def check(self):
+		"""库被其他连接改过时把新行并进已缓存的序列，返回数据变了的人物集合
+
+		某人的版本号等于“缓存时的版本 + 新行数”才说明只是追加了这些行；
+		对不上（别处删改过，或读入时已经含有这些行）或新行太多，就扔掉该人的缓存，下次用到再整段读。
+		"""
+		version = self.store.data_version()
+		if version == self._version:
+			return set()
+		self._version = version
+		with self.store.snapshot():
+			rows = list(self.store.iter_records(after_id=self._last_id))
+			versions = self.store.person_versions()
+		new = {}
+		for rowid, person, t, w, note, bmi in rows:
+			self._last_id = max(self._last_id, rowid)
+			if rowid in self._own:
+				self._own.discard(rowid)
+			else:
+				new.setdefault(person, []).append((t, w, note, bmi))
+
+		for person in list(self._data):
+			added = new.get(person, ())
+			if versions.get(person, 0) == self._versions[person] + len(added) and len(added) <= MERGE_MAX:
+				s = self._data[person]
+				for row in added:
+					s.add(*row)
+				self._versions[person] = versions.get(person, 0)
+			else:
+				self.invalidate(person)
+
+		changed = {p for p in versions.keys() | self._seen.keys() if versions.get(p) != self._seen.get(p)}
+		self._seen = versions
+		for key in [k for k in self._rollups if k[0] in changed]:
+			del self._rollups[key]
+		return changed
+
+	def get(self, person):
+		self.check()
+		s = self._data.get(person)
+		if s is None:
+			return self._load([person])[person]
+		self._data.move_to_end(person)
+		return s
+
+	def get_many(self, persons):
+		"""一次取多人 {姓名: Series}，没缓存的用一条分组查询读入，而不是一人一条"""
+		self.check()
+		out = {}
+		for p in persons:
+			if p in self._data:
+				self._data.move_to_end(p)
+				out[p] = self._data[p]
+		missing = [p for p in persons if p not in out]
+		if missing:
+			out.update(self._load(missing))
+		return out
+
+	def _load(self, persons):
+		"""读入没缓存的人；序列和版本号要对应同一时刻的库，都在一个读事务里取"""
+		out = {}
+		with self.store.snapshot():
+			versions = self.store.person_versions()
+			if self.archive_dir:
+				for p in persons:
+					s = self._from_archive(p, versions.get(p, 0))
+					if s is not None:
+						out[p] = s
+			rest = [p for p in persons if p not in out]
+			loaded = dict(self.store.fetch_many(rest)) if rest else {}
+			last_id = self.store.last_id()
+		for p in rest:
+			s = out[p] = Series.from_rows(loaded.get(p, ()))
+			if self.archive_dir:
+				self._write_archive(p, s, versions.get(p, 0), last_id)
+		for p in persons:
+			self._versions[p] = versions.get(p, 0)
+			self._put(p, out[p])
+		return out
+
+	def _from_archive(self, person, version):
+		"""快照 + 库里快照之后的新行；没有快照、快照坏了或之后有过删改（版本号对不上）返回 None"""
+		import archive
+		path = archive.archive_path(person, self.store.node()[0], self.archive_dir)
+		if not os.path.exists(path):
+			return None
+		profile = self.store.person(person)
+		try:
+			s, _, base, last_id = archive.load(path, person, profile and profile['height'])
+		except (OSError, ValueError): # 坏了就当没有，整段读库后重写
+			return None
+		tail = self.store.fetch_after(person, last_id)
+		if version != base + len(tail) or len(tail) > MERGE_MAX:
+			return None
+		for row in tail:
+			s.add(*row)
+		return s
+
+	def _write_archive(self, person, s, version, last_id):
+		import archive
+		if len(s) < archive.ARCHIVE_MIN:
+			return
+		try:
+			os.makedirs(self.archive_dir, exist_ok=True)
+			archive.write(archive.archive_path(person, self.store.node()[0], self.archive_dir), person, s, version, last_id)
+		except OSError: # 写不了快照只是下次还从库里读
+			pass
+
+	def _put(self, person, s):
+		self._data[person] = s
+		if len(self._data) > self.max_persons:
+			old, _ = self._data.popitem(last=False)
+			del self._versions[old]
+		return s
+
+	def span(self, person):
+		"""已缓存就用首尾元素，否则只查库里的 MIN/MAX，不整段读入"""
+		self.check()
+		s = self._data.get(person)
+		return s.span() if s is not None else self.store.span(person)
+
+	def rollups(self, person, grain):
+		"""某人某粒度的全部汇总桶，见 RecordStore.rollups"""
+		self.check()
+		key = (person, grain)
+		rows = self._rollups.get(key)
+		if rows is None:
+			rows = self._rollups[key] = self.store.rollups(person, grain)
+		return rows
+
+	def add(self, person, t, w, note, bmi, rowid=None):
+		"""本进程刚写入（id 为 rowid）的记录，追加到已缓存的序列里，返回它的下标（未缓存时为 None）
+
+		汇总桶已由触发器在库里更新，这里只丢掉该人物的缓存，下次用到再查。
+		"""
+		for key in [k for k in self._rollups if k[0] == person]:
+			del self._rollups[key]
+		if rowid is not None and rowid > self._last_id:
+			self._own.add(rowid)
+		self._seen[person] = self._seen.get(person, 0) + 1 # 触发器同样给版本号加了一
+		s = self._data.get(person)
+		if s is not None:
+			self._versions[person] += 1
+			return s.add(t, w, note, bmi)
+
+	def invalidate(self, person=None):
+		if person is None:
+			self._data.clear()
+			self._versions.clear()
+			self._rollups.clear()
+		else:
+			self._data.pop(person, None)
+			self._versions.pop(person, None)
+			for key in [k for k in self._rollups if k[0] == person]:
+				del self._rollups[key]
@@ -0,0 +1,772 @@
+import math, time, json, logging, sqlite3, datetime
+from pathlib import Path
+from itertools import groupby
+from collections import Counter
+from contextlib import contextmanager
+
+from notes import tokenize, index_words, match_query
+
+# ---------------- 时间 ----------------
+# 库里存 epoch 秒（INTEGER），文本格式只在界面边界出现
+TIME_FMT = '%Y.%m.%d %H:%M:%S'
+# 旧库里手填的时间可能不是标准格式，迁移时按顺序尝试
+TIME_FMTS = (TIME_FMT, '%Y-%m-%d %H:%M:%S', '%Y.%m.%d %H:%M', '%Y-%m-%d %H:%M', '%Y.%m.%d', '%Y-%m-%d')
+
+def to_epoch(text): # 界面文本 → epoch 秒（本地时间）
+	for fmt in TIME_FMTS:
+		try:
+			return int(time.mktime(time.strptime(text.strip(), fmt)))
+		except ValueError:
+			pass
+	raise ValueError(f'无法识别的时间: {text!r}')
+
+def from_epoch(ts): # epoch 秒 → datetime（本地时间）
+	return datetime.datetime.fromtimestamp(ts)
+
+def fmt_epoch(ts): # epoch 秒 → 界面文本
+	return time.strftime(TIME_FMT, time.localtime(ts))
+
+# ---------------- SQL ----------------
+# 语句写成常量，sqlite3 按文本缓存预编译结果，重复调用不再走 prepare
+SQL_INSERT = 'INSERT INTO records(person, time, weight, note, bmi, source) VALUES(?,?,?,?,?,?)'
+# 批量导入：同一人同一时刻已有记录就跳过，查重走 (person, time) 索引
+SQL_INSERT_NEW = '''
+	INSERT INTO records(person, time, weight, note, bmi, source)
+	SELECT ?1, ?2, ?3, ?4, ?5, ?6
+	WHERE NOT EXISTS (SELECT 1 FROM records WHERE person=?1 AND time=?2)
+'''
+SQL_FETCH = 'SELECT time, weight, note, bmi FROM records WHERE person=? ORDER BY time'
+# 多人一次读：名单走 json_each 传一个参数，几百人也不受绑定变量个数限制，按 (person, time) 索引顺序返回
+SQL_FETCH_MANY = 'SELECT person, time, weight, note, bmi FROM records WHERE person IN (SELECT value FROM json_each(?)) ORDER BY person, time'
+# 快照之后的新行：+person 让它走 id 区间而不是把这人的索引整段扫一遍
+SQL_FETCH_AFTER = 'SELECT time, weight, note, bmi FROM records WHERE id>? AND +person=? ORDER BY time'
+SQL_FETCH_RANGE = 'SELECT time, weight, note, bmi FROM records WHERE person=? AND time>=? AND time<? ORDER BY time'
+SQL_STATS = 'SELECT COUNT(*), MIN(weight), MAX(weight), AVG(weight) FROM records WHERE person=? AND time>=?'
+SQL_LATEST = 'SELECT time, weight, note, bmi FROM records WHERE person=? ORDER BY time DESC LIMIT 1'
+SQL_LAST_TIME = 'SELECT MAX(time) FROM records WHERE person=?'
+SQL_MILESTONES = 'SELECT person, k, time, weight, baseline, version FROM milestones WHERE person=? AND k>? ORDER BY k'
+# 词云：区间内各词出现次数之和，按 (person, bucket) 主键前缀扫
+SQL_NOTE_TOKENS = 'SELECT token, SUM(n) FROM note_tokens WHERE person=? AND bucket>=? GROUP BY token ORDER BY 2 DESC, 1 LIMIT ?'
+SQL_SEARCH_NOTES = '''
+	SELECT r.time FROM notes_fts JOIN records r ON r.id = notes_fts.rowid
+	WHERE notes_fts MATCH ? AND r.person=? AND r.time>=? ORDER BY r.time
+'''
+SQL_ROLLUPS = 'SELECT bucket, n, w_min, w_max, w_sum / n, first_t, last_t FROM rollups WHERE person=? AND grain=? AND bucket>=? ORDER BY bucket'
+SQL_EXPORT = 'SELECT id, person, time, weight, note, bmi FROM records WHERE id>? ORDER BY person, time'
+SQL_EXPORT_PERSON = 'SELECT id, person, time, weight, note, bmi FROM records WHERE person=? AND id>? ORDER BY time'
+# 同步：本机日志里对端还没有的变更；同一个键上最新的一条
+SQL_CHANGES = "SELECT seq, clock, node, kind, key, data FROM changes WHERE seq>?1 AND (?2 IS NULL OR node<>?2 AND IFNULL(peer, '')<>?2) ORDER BY seq LIMIT ?3"
+SQL_LATEST_CHANGE = 'SELECT clock, node FROM changes WHERE kind=? AND key=? ORDER BY clock DESC, node DESC LIMIT 1'
+# 两个子查询各自走索引取首尾，避免 MIN/MAX 同查时退化成扫描
+SQL_SPAN = 'SELECT (SELECT MIN(time) FROM records WHERE person=?1), (SELECT MAX(time) FROM records WHERE person=?1)'
+
+# ---------------- 迁移 ----------------
+# 版本号记在 PRAGMA user_version，MIGRATIONS[i] 把库从 i 升到 i+1
+def _migrate_v1(conn):
+	"""最初的表结构：time 为 '%Y.%m.%d %H:%M:%S' 文本"""
+	conn.execute('''
+		CREATE TABLE IF NOT EXISTS records (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			person TEXT NOT NULL,
+			time TEXT NOT NULL,
+			weight float NOT NULL,
+			note TEXT,
+			bmi float
+		)
+	''')
+
+def _migrate_v2(conn):
+	"""time 改为 epoch 秒，加 (person, time) 覆盖索引"""
+	conn.execute('ALTER TABLE records RENAME TO records_v1')
+	conn.execute('''
+		CREATE TABLE records (
+			id INTEGER PRIMARY KEY AUTOINCREMENT,
+			person TEXT NOT NULL,
+			time INTEGER NOT NULL,
+			weight REAL NOT NULL,
+			note TEXT,
+			bmi REAL
+		)
+	''')
+	# 认不出的时间不能让整个升级回滚（否则库再也打不开），原样挪进 bad_records 留待手工处理
+	conn.execute('CREATE TABLE bad_records AS SELECT * FROM records_v1 WHERE 0')
+	good, bad = [], []
+	for i, p, t, w, n, b in conn.execute('SELECT id, person, time, weight, note, bmi FROM records_v1'):
+		try:
+			good.append((i, p, to_epoch(t), w, n, b))
+		except (ValueError, AttributeError): # AttributeError：time 不是文本
+			bad.append((i, p, t, w, n, b))
+	conn.executemany('INSERT INTO records(id, person, time, weight, note, bmi) VALUES(?,?,?,?,?,?)', good)
+	conn.executemany('INSERT INTO bad_records VALUES(?,?,?,?,?,?)', bad)
+	if bad:
+		logging.getLogger(__name__).warning('%d 条记录的时间无法识别，已移到 bad_records 表', len(bad))
+	conn.execute('DROP TABLE records_v1')
+	# 按人物取区间只走索引，不回表
+	conn.execute('CREATE INDEX idx_records_person_time ON records(person, time, weight, bmi, note)')
+
+def _migrate_v3(conn):
+	"""增量导出的高水位：每个导出目标记住已导出的最大 id"""
+	conn.execute('''
+		CREATE TABLE export_marks (
+			target TEXT PRIMARY KEY,
+			last_id INTEGER NOT NULL
+		)
+	''')
+
+# ---------------- 汇总表 ----------------
+# 每人每日/周/月一行：条数、最轻、最重、总和（求平均）、首条、末条
+# 桶起点为本地时间的零点 / 周一零点 / 月初零点，用 SQLite 的日期修饰符算，和触发器里完全一致
+GRAINS = {
+	'day': ("'start of day'", "'start of day', '+1 day'"),
+	'week': ("'start of day', 'weekday 0', '-6 days'", "'start of day', 'weekday 0', '+1 day'"),
+	'month': ("'start of month'", "'start of month', '+1 month'"),
+}
+GRAIN_SECONDS = {'day': 86400, 'week': 7 * 86400, 'month': 30.44 * 86400}
+
+def _bucket(t, grain, end=False):
+	"""epoch 秒表达式 t 所在桶的起点（end=True 时为下一个桶的起点）"""
+	mods = GRAINS[grain][1 if end else 0]
+	return f"CAST(strftime('%s', {t}, 'unixepoch', 'localtime', {mods}, 'utc') AS INTEGER)"
+
+def _rollup_add(grain):
+	"""新记录并入所在桶"""
+	b = _bucket('NEW.time', grain)
+	return f'''
+		INSERT INTO rollups VALUES (NEW.person, '{grain}', {b}, 1, NEW.weight, NEW.weight, NEW.weight, NEW.time, NEW.weight, NEW.time, NEW.weight)
+		ON CONFLICT(person, grain, bucket) DO UPDATE SET
+			n = n + 1,
+			w_min = min(w_min, excluded.w_min),
+			w_max = max(w_max, excluded.w_max),
+			w_sum = w_sum + excluded.w_sum,
+			first_t = min(first_t, excluded.first_t),
+			first_w = CASE WHEN excluded.first_t < first_t THEN excluded.first_w ELSE first_w END,
+			last_t = max(last_t, excluded.last_t),
+			last_w = CASE WHEN excluded.last_t >= last_t THEN excluded.last_w ELSE last_w END;
+	'''
+
+def _rollup_refresh(row, grain):
+	"""删改记录后，从原始记录重算 row（OLD/NEW）所在的那一个桶"""
+	b, e = _bucket(f'{row}.time', grain), _bucket(f'{row}.time', grain, end=True)
+	where = f'person={row}.person AND time>={b} AND time<{e}'
+	return f'''
+		DELETE FROM rollups WHERE person={row}.person AND grain='{grain}' AND bucket={b};
+		INSERT INTO rollups
+		SELECT person, '{grain}', {b}, COUNT(*), MIN(weight), MAX(weight), SUM(weight),
+			MIN(time), (SELECT weight FROM records WHERE {where} ORDER BY time LIMIT 1),
+			MAX(time), (SELECT weight FROM records WHERE {where} ORDER BY time DESC LIMIT 1)
+		FROM records WHERE {where} GROUP BY person;
+	'''
+
+def _rebuild_rollups(conn, person=None):
+	"""整体重建汇总表：按 (person, time) 顺序扫一遍原始记录，桶起点由 SQLite 统一计算"""
+	cols = ', '.join(_bucket('time', g) for g in GRAINS)
+	if person is None:
+		conn.execute('DELETE FROM rollups')
+		rows = conn.execute(f'SELECT person, time, weight, {cols} FROM records ORDER BY person, time')
+	else:
+		conn.execute('DELETE FROM rollups WHERE person=?', (person,))
+		rows = conn.execute(f'SELECT person, time, weight, {cols} FROM records WHERE person=? ORDER BY time', (person,))
+
+	def buckets():
+		acc = {} # grain → 正在累计的桶
+		for p, t, w, *keys in rows:
+			for grain, key in zip(GRAINS, keys):
+				cur = acc.get(grain)
+				if cur and cur[0] == p and cur[2] == key:
+					cur[3] += 1
+					cur[4] = min(cur[4], w)
+					cur[5] = max(cur[5], w)
+					cur[6] += w
+					cur[9], cur[10] = t, w
+				else:
+					if cur:
+						yield cur
+					acc[grain] = [p, grain, key, 1, w, w, w, t, w, t, w]
+		yield from acc.values()
+
+	conn.executemany('INSERT INTO rollups VALUES(?,?,?,?,?,?,?,?,?,?,?)', buckets())
+
+def _migrate_v4(conn):
+	"""按日/周/月预汇总，长时间维度直接画桶，由触发器随 records 维护"""
+	conn.execute('''
+		CREATE TABLE rollups (
+			person TEXT NOT NULL,
+			grain TEXT NOT NULL,
+			bucket INTEGER NOT NULL,
+			n INTEGER NOT NULL,
+			w_min REAL NOT NULL,
+			w_max REAL NOT NULL,
+			w_sum REAL NOT NULL,
+			first_t INTEGER NOT NULL,
+			first_w REAL NOT NULL,
+			last_t INTEGER NOT NULL,
+			last_w REAL NOT NULL,
+			PRIMARY KEY (person, grain, bucket)
+		) WITHOUT ROWID
+	''')
+	conn.execute(f"CREATE TRIGGER rollups_ai AFTER INSERT ON records BEGIN {''.join(_rollup_add(g) for g in GRAINS)} END")
+	conn.execute(f"CREATE TRIGGER rollups_ad AFTER DELETE ON records BEGIN {''.join(_rollup_refresh('OLD', g) for g in GRAINS)} END")
+	conn.execute(f"""CREATE TRIGGER rollups_au AFTER UPDATE OF time, weight ON records BEGIN
+		{''.join(_rollup_refresh('OLD', g) + _rollup_refresh('NEW', g) for g in GRAINS)}
+	END""")
+	_rebuild_rollups(conn)
+
+# ---------------- 里程碑 ----------------
+# 以每人第一条记录为起点，体重每比起点轻一整公斤记一次（第 k 重山），记下第一次跨过时的那条记录
+def _scan_milestones(conn, person, since=None):
+	"""从 since（含）往后扫该人的记录补上新跨过的里程碑；since 为 None 时整人重算"""
+	first = conn.execute('SELECT weight FROM records WHERE person=? ORDER BY time LIMIT 1', (person,)).fetchone()
+	if since is None:
+		conn.execute('DELETE FROM milestones WHERE person=?', (person,))
+	if first is None:
+		return
+	baseline = first[0]
+	k = conn.execute('SELECT IFNULL(MAX(k), 0) FROM milestones WHERE person=?', (person,)).fetchone()[0]
+	version = conn.execute('SELECT IFNULL(MAX(version), 0) FROM person_versions WHERE person=?', (person,)).fetchone()[0]
+	rows = conn.execute('SELECT time, weight FROM records WHERE person=? AND time>=? ORDER BY time', (person, since or 0))
+	found = []
+	for t, w in rows:
+		reached = math.floor(baseline - w + 1e-9)
+		while k < reached:
+			k += 1
+			found.append((person, k, t, w, baseline, version))
+	conn.executemany('INSERT INTO milestones VALUES(?,?,?,?,?,?)', found)
+
+def _version_bump(row):
+	return f'INSERT INTO person_versions VALUES({row}.person, 1) ON CONFLICT(person) DO UPDATE SET version = version + 1;'
+
+def _migrate_v5(conn):
+	"""每人的数据版本号（触发器维护）和减重里程碑"""
+	conn.execute('CREATE TABLE person_versions (person TEXT PRIMARY KEY, version INTEGER NOT NULL) WITHOUT ROWID')
+	conn.execute(f'CREATE TRIGGER versions_ai AFTER INSERT ON records BEGIN {_version_bump("NEW")} END')
+	conn.execute(f'CREATE TRIGGER versions_ad AFTER DELETE ON records BEGIN {_version_bump("OLD")} END')
+	conn.execute(f'CREATE TRIGGER versions_au AFTER UPDATE ON records BEGIN {_version_bump("OLD")} {_version_bump("NEW")} END')
+	conn.execute('INSERT INTO person_versions SELECT DISTINCT person, 1 FROM records')
+	conn.execute('''
+		CREATE TABLE milestones (
+			person TEXT NOT NULL,
+			k INTEGER NOT NULL,
+			time INTEGER NOT NULL,
+			weight REAL NOT NULL,
+			baseline REAL NOT NULL,
+			version INTEGER NOT NULL, -- 写入时该人的数据版本，海报缓存按它区分
+			PRIMARY KEY (person, k)
+		) WITHOUT ROWID
+	''')
+	for (person,) in conn.execute('SELECT DISTINCT person FROM records').fetchall():
+		_scan_milestones(conn, person)
+
+# ---------------- 心情备注 ----------------
+# 分词在 Python 里做（见 notes.py），触发器调不到，由 RecordStore 写入时顺手维护
+def _day_start(t):
+	"""epoch 秒所在本地日的零点"""
+	return int(time.mktime(time.localtime(t)[:3] + (0, 0, 0, 0, 0, -1)))
+
+def _index_notes(conn, rows):
+	"""rows 为 (id, person, time, note)：词频按人按天累加，逐字写进全文索引"""
+	counts = Counter()
+	docs = []
+	for rowid, person, t, note in rows:
+		if not note:
+			continue
+		day = _day_start(t)
+		counts.update((person, day, w) for w in tokenize(note))
+		docs.append((rowid, ' '.join(index_words(note))))
+	conn.executemany('INSERT INTO note_tokens VALUES(?,?,?,?) ON CONFLICT(person, bucket, token) DO UPDATE SET n = n + excluded.n',
+		[(*key, n) for key, n in counts.items()])
+	conn.executemany('INSERT INTO notes_fts(rowid, words) VALUES(?,?)', docs)
+
+def _unindex_notes(conn, rows):
+	"""_index_notes 的逆操作，删改记录前用旧备注调用"""
+	counts = Counter()
+	docs = []
+	for rowid, person, t, note in rows:
+		if not note:
+			continue
+		counts.update((person, _day_start(t), w) for w in tokenize(note))
+		docs.append((rowid, ' '.join(index_words(note))))
+	conn.executemany('UPDATE note_tokens SET n = n - ? WHERE person=? AND bucket=? AND token=?', [(n, *key) for key, n in counts.items()])
+	conn.executemany('DELETE FROM note_tokens WHERE person=? AND bucket=? AND token=? AND n <= 0', list(counts))
+	# contentless 表删除时要给出当初写入的词
+	conn.executemany("INSERT INTO notes_fts(notes_fts, rowid, words) VALUES('delete', ?, ?)", docs)
+
+def _rebuild_notes(conn):
+	conn.execute('DELETE FROM note_tokens')
+	conn.execute("INSERT INTO notes_fts(notes_fts) VALUES('delete-all')")
+	cur = conn.execute("SELECT id, person, time, note FROM records WHERE note <> ''")
+	while True:
+		rows = cur.fetchmany(5000)
+		if not rows:
+			return
+		_index_notes(conn, rows)
+
+def _migrate_v6(conn):
+	"""备注词频表（词云）和全文索引（搜索）"""
+	conn.execute('''
+		CREATE TABLE note_tokens (
+			person TEXT NOT NULL,
+			bucket INTEGER NOT NULL, -- 本地日零点
+			token TEXT NOT NULL,
+			n INTEGER NOT NULL,
+			PRIMARY KEY (person, bucket, token)
+		) WITHOUT ROWID
+	''')
+	# contentless：只存分好的词的倒排表，rowid 即 records.id，原文回 records 取
+	conn.execute("CREATE VIRTUAL TABLE notes_fts USING fts5(words, content='')")
+	_rebuild_notes(conn)
+
+# ---------------- 人物 ----------------
+PERSON_FIELDS = ('name', 'height', 'sex', 'unit', 'source', 'target')
+# 以人物姓名为键的表；改名时在同一个事务里一起改
+PERSON_TABLES = ('records', 'rollups', 'milestones', 'note_tokens')
+
+def _migrate_v7(conn):
+	"""人物资料从 config.json 搬进库里，改名能和记录在同一个事务里完成"""
+	conn.execute('''
+		CREATE TABLE persons (
+			name TEXT PRIMARY KEY,
+			height REAL NOT NULL,
+			sex TEXT NOT NULL,
+			unit TEXT NOT NULL,
+			source TEXT NOT NULL DEFAULT '',
+			target REAL, -- 目标体重 kg，可不填
+			pos INTEGER NOT NULL -- 下拉框里的顺序
+		)
+	''')
+
+# ---------------- 变更日志 ----------------
+# 多台机器之间同步用：记录和人物资料的每次增删改都追加一行 (Lamport 时钟, 节点, 种类, 键, 新值)，
+# 新值为 NULL 表示删除。记录的键是 [人物, 时间]（与导入查重一致），人物资料的键是姓名。
+# 应用对方的变更时 sync_state.applying 置 1，触发器不再记日志，由 apply_changes 原样抄进来。
+def _log_change(kind, key, data):
+	return f'''
+		UPDATE sync_state SET clock = clock + 1;
+		INSERT INTO changes(clock, node, kind, key, data) SELECT clock, node, '{kind}', {key}, {data} FROM sync_state;
+	'''
+
+RECORD_KEY = 'json_array({0}.person, {0}.time)'
+RECORD_DATA = "json_object('weight', {0}.weight, 'note', {0}.note, 'bmi', {0}.bmi)"
+PERSON_DATA = "json_object('height', {0}.height, 'sex', {0}.sex, 'unit', {0}.unit, 'source', {0}.source, 'target', {0}.target)"
+LOGGING = 'WHEN (SELECT applying FROM sync_state) = 0'
+
+def _migrate_v8(conn):
+	"""变更日志、本机节点号和时钟、各对端的同步水位；现有数据各记一条，第一次同步时整库交换"""
+	conn.execute('''
+		CREATE TABLE changes (
+			seq INTEGER PRIMARY KEY AUTOINCREMENT, -- 本机的追加顺序，对端按它记水位
+			clock INTEGER NOT NULL,
+			node TEXT NOT NULL, -- 最初产生这条变更的节点
+			kind TEXT NOT NULL, -- 'record' / 'person'
+			key TEXT NOT NULL,
+			data TEXT,
+			peer TEXT -- 从哪个对端收到的，本机产生的为 NULL；不再回传给它
+		)
+	''')
+	conn.execute('CREATE INDEX idx_changes_key ON changes(kind, key, clock, node)')
+	conn.execute('CREATE TABLE sync_state (node TEXT NOT NULL, clock INTEGER NOT NULL, applying INTEGER NOT NULL)')
+	conn.execute('INSERT INTO sync_state VALUES(lower(hex(randomblob(8))), 1, 0)')
+	conn.execute('''
+		CREATE TABLE sync_peers (
+			node TEXT PRIMARY KEY,
+			url TEXT,
+			pulled INTEGER NOT NULL DEFAULT 0, -- 已从对端取到它的第几条 seq
+			pushed INTEGER NOT NULL DEFAULT 0 -- 已推给对端本机的第几条 seq
+		)
+	''')
+
+	new, old = RECORD_KEY.format('NEW'), RECORD_KEY.format('OLD')
+	conn.execute(f"CREATE TRIGGER changes_ai AFTER INSERT ON records {LOGGING} BEGIN {_log_change('record', new, RECORD_DATA.format('NEW'))} END")
+	conn.execute(f"CREATE TRIGGER changes_ad AFTER DELETE ON records {LOGGING} BEGIN {_log_change('record', old, 'NULL')} END")
+	# 人物或时间改了就是换了键：先记旧键删除，再记新键的值
+	conn.execute(f"""CREATE TRIGGER changes_au AFTER UPDATE ON records {LOGGING} BEGIN
+		UPDATE sync_state SET clock = clock + 1 WHERE {old} <> {new};
+		INSERT INTO changes(clock, node, kind, key, data) SELECT clock, node, 'record', {old}, NULL FROM sync_state WHERE {old} <> {new};
+		{_log_change('record', new, RECORD_DATA.format('NEW'))}
+	END""")
+	conn.execute(f"CREATE TRIGGER changes_pi AFTER INSERT ON persons {LOGGING} BEGIN {_log_change('person', 'NEW.name', PERSON_DATA.format('NEW'))} END")
+	conn.execute(f"CREATE TRIGGER changes_pd AFTER DELETE ON persons {LOGGING} BEGIN {_log_change('person', 'OLD.name', 'NULL')} END")
+	conn.execute(f"""CREATE TRIGGER changes_pu AFTER UPDATE OF name, height, sex, unit, source, target ON persons {LOGGING} BEGIN
+		UPDATE sync_state SET clock = clock + 1 WHERE OLD.name <> NEW.name;
+		INSERT INTO changes(clock, node, kind, key, data) SELECT clock, node, 'person', OLD.name, NULL FROM sync_state WHERE OLD.name <> NEW.name;
+		{_log_change('person', 'NEW.name', PERSON_DATA.format('NEW'))}
+	END""")
+	conn.execute(f"""
+		INSERT INTO changes(clock, node, kind, key, data)
+		SELECT 1, (SELECT node FROM sync_state), 'record', {RECORD_KEY.format('records')}, {RECORD_DATA.format('records')} FROM records ORDER BY id
+	""")
+	conn.execute(f"""
+		INSERT INTO changes(clock, node, kind, key, data)
+		SELECT 1, (SELECT node FROM sync_state), 'person', name, {PERSON_DATA.format('persons')} FROM persons ORDER BY pos
+	""")
+
+def _migrate_v9(conn):
+	"""记录的数据源（体重秤、手动……），同步的变更日志里一并带上"""
+	conn.execute("ALTER TABLE records ADD COLUMN source TEXT NOT NULL DEFAULT ''")
+	data = "json_object('weight', NEW.weight, 'note', NEW.note, 'bmi', NEW.bmi, 'source', NEW.source)"
+	new, old = RECORD_KEY.format('NEW'), RECORD_KEY.format('OLD')
+	conn.execute('DROP TRIGGER changes_ai')
+	conn.execute('DROP TRIGGER changes_au')
+	conn.execute(f"CREATE TRIGGER changes_ai AFTER INSERT ON records {LOGGING} BEGIN {_log_change('record', new, data)} END")
+	conn.execute(f"""CREATE TRIGGER changes_au AFTER UPDATE ON records {LOGGING} BEGIN
+		UPDATE sync_state SET clock = clock + 1 WHERE {old} <> {new};
+		INSERT INTO changes(clock, node, kind, key, data) SELECT clock, node, 'record', {old}, NULL FROM sync_state WHERE {old} <> {new};
+		{_log_change('record', new, data)}
+	END""")
+
+MIGRATIONS = [_migrate_v1, _migrate_v2, _migrate_v3, _migrate_v4, _migrate_v5, _migrate_v6, _migrate_v7, _migrate_v8, _migrate_v9]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# 长连接的 pragma：WAL 让读写互不阻塞，NORMAL 在 WAL 下足够安全且少一次 fsync
+PRAGMAS = (
+	'PRAGMA journal_mode=WAL',
+	'PRAGMA synchronous=NORMAL',
+	'PRAGMA temp_store=MEMORY',
+	'PRAGMA cache_size=-16000', # 约 16MB 页缓存
+	'PRAGMA busy_timeout=5000', # 其他进程写入时最多等 5 秒
+)
+
+# ---------------- 数据访问对象 ----------------
+class RecordStore:
+	"""整个进程共用的一个 SQLite 长连接，启动时打开，退出时关闭"""
+
+	def __init__(self, path, cached_statements=128, readonly=False):
+		"""readonly 时以 mode=ro 打开，不迁移、不设 WAL、关闭时不 optimize（给只读的子进程用，库得已经建好）"""
+		self.path = path
+		self.readonly = readonly
+		if readonly:
+			self.conn = sqlite3.connect(f'{Path(path).absolute().as_uri()}?mode=ro', uri=True, cached_statements=cached_statements)
+			for sql in PRAGMAS[2:]: # 日志模式和同步级别是写入方的事
+				self.conn.execute(sql)
+			return
+		self.conn = sqlite3.connect(path, cached_statements=cached_statements)
+		for sql in PRAGMAS:
+			self.conn.execute(sql)
+		self.migrate()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *_):
+		self.close()
+
+	def migrate(self):
+		"""把库逐版本升级到 SCHEMA_VERSION，每一版在一个事务里完成"""
+		version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+		for v in range(version, SCHEMA_VERSION):
+			self.conn.execute('BEGIN') # DDL 也要进事务，失败时整版回滚
+			try:
+				MIGRATIONS[v](self.conn)
+				self.conn.execute(f'PRAGMA user_version={v + 1}')
+			except Exception:
+				self.conn.rollback()
+				raise
+			self.conn.commit()
+
+	def insert(self, person, time, weight, note, bmi, source=''):
+		with self.conn:
+			last = self.conn.execute(SQL_LAST_TIME, (person,)).fetchone()[0]
+			rowid = self.conn.execute(SQL_INSERT, (person, time, weight, note, bmi, source)).lastrowid
+			self._update_milestones(person, last, time)
+			_index_notes(self.conn, [(rowid, person, time, note)])
+			return rowid
+
+	def insert_many(self, rows, by_source=False):
+		"""rows 为 (person, time, weight, note, bmi, source)，整批一个事务，返回实际写入的条数；by_source 时返回 {数据源: 写入条数}
+
+		库里（或本批前面）已有同人同一秒的跳过；查重和写入在同一个写事务里，别的连接插不进中间。
+		"""
+		rows = list(rows)
+		earliest = {} # 本批每人最早的时间
+		for r in rows:
+			earliest[r[0]] = min(r[1], earliest.get(r[0], r[1]))
+		with self.conn:
+			self.conn.execute('BEGIN IMMEDIATE') # 先拿写锁：下面读到的末条时间、max_id 到提交前都不会被别的连接改
+			last = {p: self.conn.execute(SQL_LAST_TIME, (p,)).fetchone()[0] for p in earliest}
+			max_id = self.last_id()
+			# rowcount 只算这条语句本身写入的行，total_changes 会把触发器写汇总表的也算进去
+			count = self.conn.executemany(SQL_INSERT_NEW, rows).rowcount
+			for p, t in earliest.items():
+				self._update_milestones(p, last[p], t)
+			# AUTOINCREMENT 的 id 只增不减，本批新写的就是 max_id 之后的（查重跳过的不在其中）
+			_index_notes(self.conn, self.conn.execute("SELECT id, person, time, note FROM records WHERE id>? AND note <> ''", (max_id,)))
+			if by_source:
+				return dict(self.conn.execute('SELECT source, COUNT(*) FROM records WHERE id>? GROUP BY source', (max_id,)))
+			return count
+
+	def _update_milestones(self, person, last, earliest):
+		"""新记录都在原有末条之后就只往后扫；补录了旧数据（或原来没有记录）就整人重算"""
+		if last is not None and earliest >= last:
+			_scan_milestones(self.conn, person, last)
+		else:
+			_scan_milestones(self.conn, person)
+
+	def person_versions(self):
+		"""{人物: 版本号}，表只有人数那么多行"""
+		return dict(self.conn.execute('SELECT person, version FROM person_versions'))
+
+	def last_id(self):
+		"""记录的高水位：AUTOINCREMENT 的 id 只增不减，之后别处写入的行 id 都比它大"""
+		return self.conn.execute('SELECT IFNULL(MAX(id), 0) FROM records').fetchone()[0]
+
+	@contextmanager
+	def snapshot(self):
+		"""块内的几次读落在同一个读事务里，看到的是同一时刻的库（WAL 下不挡写入）"""
+		self.conn.execute('BEGIN')
+		try:
+			yield
+		finally:
+			self.conn.commit()
+
+	def person_version(self, person):
+		"""该人数据的版本号，任何连接增删改一条记录都会加一（触发器维护）；没有记录为 0"""
+		row = self.conn.execute('SELECT version FROM person_versions WHERE person=?', (person,)).fetchone()
+		return row[0] if row else 0
+
+	def milestones(self, person, after_k=0):
+		"""第 after_k 重山之后的里程碑 (person, k, time, weight, baseline, version)"""
+		return self.conn.execute(SQL_MILESTONES, (person, after_k)).fetchall()
+
+	def rebuild_milestones(self, person=None):
+		with self.conn:
+			persons = [person] if person else [p for (p,) in self.conn.execute('SELECT DISTINCT person FROM records')]
+			for p in persons:
+				_scan_milestones(self.conn, p)
+
+	def persons(self):
+		"""全部人物资料，按添加顺序"""
+		cur = self.conn.execute(f"SELECT {', '.join(PERSON_FIELDS)} FROM persons ORDER BY pos")
+		return [dict(zip(PERSON_FIELDS, row)) for row in cur]
+
+	def person(self, name):
+		"""某人的资料，没有为 None"""
+		row = self.conn.execute(f"SELECT {', '.join(PERSON_FIELDS)} FROM persons WHERE name=?", (name,)).fetchone()
+		return row and dict(zip(PERSON_FIELDS, row))
+
+	def save_person(self, person, old_name=None):
+		"""新增（old_name 为 None）或修改人物；改了名字就把记录、汇总、里程碑、词频、导出水位一起改过去，全在一个事务里"""
+		row = {'source': '', 'target': None, **person} # 旧配置里的人物可能没有这两项
+		values = [row[k] for k in PERSON_FIELDS]
+		name = person['name']
+		with self.conn:
+			if name != old_name and self.conn.execute('SELECT 1 FROM persons WHERE name=?', (name,)).fetchone():
+				raise ValueError(f'已有同名人物: {name}')
+			if old_name is None:
+				pos = self.conn.execute('SELECT IFNULL(MAX(pos), -1) + 1 FROM persons').fetchone()[0]
+				self.conn.execute(f'INSERT INTO persons VALUES({", ".join("?" * len(values))}, ?)', (*values, pos))
+				return
+			# 删掉的人物记录还留着（见 delete_person）：改名改到这种名字上会把两个人的数据混在一起，主键也会冲突
+			if name != old_name and any(self.conn.execute(f'SELECT 1 FROM {table} WHERE person=? LIMIT 1', (name,)).fetchone() for table in PERSON_TABLES):
+				raise ValueError(f'{name} 名下还有删除人物时留下的记录：换个名字，或新增人物 {name} 把它们认领回来')
+			sets = ', '.join(f'{k}=?' for k in PERSON_FIELDS)
+			if not self.conn.execute(f'UPDATE persons SET {sets} WHERE name=?', (*values, old_name)).rowcount:
+				raise ValueError(f'没有人物: {old_name}')
+			if name == old_name:
+				return
+			try:
+				for table in PERSON_TABLES:
+					self.conn.execute(f'UPDATE {table} SET person=? WHERE person=?', (name, old_name))
+			except sqlite3.IntegrityError as e: # 上面查过了，兜底：整个事务回滚，报成和重名一样的错误
+				raise ValueError(f'改名为 {name} 冲突: {e}') from e
+			# 改 records 时触发器已经给新名字记了版本号，旧名字的作废
+			self.conn.execute('DELETE FROM person_versions WHERE person=?', (old_name,))
+			# 导出水位的目标串以 “:人物” 结尾（见 exporter.export）
+			self.conn.execute('''
+				UPDATE export_marks SET target = substr(target, 1, length(target) - length(?1)) || ?2
+				WHERE substr(target, -length(?1) - 1) = ':' || ?1
+			''', (old_name, name))
+
+	def delete_person(self, name):
+		"""只删人物资料，记录留在库里，同名人物重新添加后还能看到"""
+		with self.conn:
+			self.conn.execute('DELETE FROM persons WHERE name=?', (name,))
+
+	def exists(self, person, time):
+		"""该人在这一秒是否已有记录，走 (person, time) 索引"""
+		return self.conn.execute('SELECT 1 FROM records WHERE person=? AND time=? LIMIT 1', (person, time)).fetchone() is not None
+
+	def fetch(self, person):
+		return self.conn.execute(SQL_FETCH, (person,)).fetchall()
+
+	def fetch_many(self, persons):
+		"""一条查询读多人，逐人产出 (person, [(time, weight, note, bmi), ...])；没有记录的人不产出"""
+		rows = self.conn.execute(SQL_FETCH_MANY, (json.dumps(list(persons), ensure_ascii=False),))
+		for person, group in groupby(rows, key=lambda r: r[0]):
+			yield person, [r[1:] for r in group]
+
+	def fetch_after(self, person, after_id):
+		"""id 大于 after_id 的记录，按时间排序"""
+		return self.conn.execute(SQL_FETCH_AFTER, (after_id, person)).fetchall()
+
+	def fetch_range(self, person, start, end=2**62):
+		"""[start, end) 区间内的记录，走 (person, time) 索引"""
+		return self.conn.execute(SQL_FETCH_RANGE, (person, start, end)).fetchall()
+
+	def span(self, person):
+		"""(最早, 最晚) epoch 秒，没有记录返回 None"""
+		first, last = self.conn.execute(SQL_SPAN, (person,)).fetchone()
+		return None if first is None else (first, last)
+
+	def stats(self, person, start=0):
+		"""start 之后的 (条数, 最轻, 最重, 平均)，只扫索引里的区间"""
+		return self.conn.execute(SQL_STATS, (person, start)).fetchone()
+
+	def latest(self, person):
+		return self.conn.execute(SQL_LATEST, (person,)).fetchone()
+
+	def rollups(self, person, grain, start=0):
+		"""start 之后的汇总桶 (桶起点, 条数, 最轻, 最重, 平均, 首条时间, 末条时间)"""
+		return self.conn.execute(SQL_ROLLUPS, (person, grain, start)).fetchall()
+
+	def rebuild_rollups(self, person=None):
+		"""按原始记录重建汇总表（person 为 None 时重建所有人）"""
+		with self.conn:
+			_rebuild_rollups(self.conn, person)
+
+	def note_tokens(self, person, start=0, limit=80):
+		"""start 所在日之后备注里最常见的 limit 个词 (词, 次数)，只扫词频表"""
+		return self.conn.execute(SQL_NOTE_TOKENS, (person, _day_start(start) if start else 0, limit)).fetchall()
+
+	def search_notes(self, person, text, start=0):
+		"""备注里含 text 的记录时间（升序）；切不出可搜的词返回空列表"""
+		query = match_query(text)
+		if query is None:
+			return []
+		return [t for (t,) in self.conn.execute(SQL_SEARCH_NOTES, (query, person, start))]
+
+	def rebuild_notes(self):
+		"""按现有分词方式重建词频表和全文索引（换了分词方式后用）"""
+		with self.conn:
+			_rebuild_notes(self.conn)
+
+	def iter_records(self, person=None, after_id=0, chunk=1000):
+		"""逐块取出 (id, person, time, weight, note, bmi)，内存里最多 chunk 行"""
+		if person is None:
+			cur = self.conn.execute(SQL_EXPORT, (after_id,))
+		else:
+			cur = self.conn.execute(SQL_EXPORT_PERSON, (person, after_id))
+		while True:
+			rows = cur.fetchmany(chunk)
+			if not rows:
+				return
+			yield from rows
+
+	def export_mark(self, target):
+		row = self.conn.execute('SELECT last_id FROM export_marks WHERE target=?', (target,)).fetchone()
+		return row[0] if row else 0
+
+	def set_export_mark(self, target, last_id):
+		with self.conn:
+			self.conn.execute('INSERT OR REPLACE INTO export_marks(target, last_id) VALUES(?,?)', (target, last_id))
+
+	# ---------- 同步 ----------
+	def node(self):
+		"""(本机节点号, 当前 Lamport 时钟)"""
+		return self.conn.execute('SELECT node, clock FROM sync_state').fetchone()
+
+	def reset_node(self):
+		"""换一个新的节点号：库是从别的机器整个复制过来时用，否则两边节点号相同无法区分"""
+		with self.conn:
+			self.conn.execute('UPDATE sync_state SET node = lower(hex(randomblob(8)))')
+
+	def changes(self, since, exclude_node=None, limit=500):
+		"""本机日志里 seq>since 的变更，跳过 exclude_node 产生的和从它那里收到的（不用回传）；不给 exclude_node 就全要
+
+		返回 ([(clock, node, kind, key, data), ...], 扫到的 seq)；扫到的 seq 即对端下次的 since。
+		"""
+		with self.snapshot():
+			rows = self.conn.execute(SQL_CHANGES, (since, exclude_node, limit)).fetchall()
+			if len(rows) == limit:
+				upto = rows[-1][0]
+			else: # 没取满说明已到末尾，跳过的那些也算扫过了
+				upto = self.conn.execute('SELECT IFNULL(MAX(seq), ?) FROM changes', (since,)).fetchone()[0]
+		return [r[1:] for r in rows], upto
+
+	def apply_changes(self, changes, peer, pulled=None):
+		"""并入从对端 peer 收到的变更，返回实际生效的条数；同一个键以 (clock, node) 最大的为准（后写者胜）
+
+		整批一个事务；给出 pulled 时在同一事务里记下从该对端取到了它的第几条。
+		"""
+		applied = 0
+		touched = {} # 人物 → [批前末条时间, 本批最早时间]，末条时间为 None 表示要整人重算里程碑
+		with self.conn:
+			self.conn.execute('UPDATE sync_state SET applying = 1')
+			top = self.node()[1]
+			for clock, node, kind, key, data in changes:
+				top = max(top, clock)
+				latest = self.conn.execute(SQL_LATEST_CHANGE, (kind, key)).fetchone()
+				if latest and (clock, node) <= latest:
+					continue
+				values = None if data is None else json.loads(data)
+				if kind == 'record':
+					person, t = json.loads(key)
+					if person not in touched:
+						touched[person] = [self.conn.execute(SQL_LAST_TIME, (person,)).fetchone()[0], t]
+					touched[person][1] = min(touched[person][1], t)
+					if not self._apply_record(person, t, values):
+						touched[person][0] = None
+				elif values is None:
+					self.conn.execute('DELETE FROM persons WHERE name=?', (key,))
+				else:
+					self._apply_person(key, values)
+				self.conn.execute('INSERT INTO changes(clock, node, kind, key, data, peer) VALUES(?,?,?,?,?,?)', (clock, node, kind, key, data, peer))
+				applied += 1
+			for person, (last, earliest) in touched.items():
+				self._update_milestones(person, last, earliest)
+			# Lamport：收到的最大时钟并进本机，之后本机的变更排在它们后面
+			self.conn.execute('UPDATE sync_state SET clock = ?, applying = 0', (top,))
+			if pulled is not None:
+				self._set_peer(peer, pulled=pulled)
+		return applied
+
+	def _apply_record(self, person, t, values):
+		"""把 (person, t) 这条记录改成对端的值（None 为删除），返回是否只是新增"""
+		old = self.conn.execute('SELECT id, person, time, note FROM records WHERE person=? AND time=?', (person, t)).fetchall()
+		_unindex_notes(self.conn, old)
+		if values is None:
+			self.conn.execute('DELETE FROM records WHERE person=? AND time=?', (person, t))
+			return not old
+		weight, note, bmi = values['weight'], values['note'], values['bmi']
+		source = values.get('source', '') # 对端还没升级到带数据源的版本时没有这一项
+		if not old:
+			rowid = self.conn.execute(SQL_INSERT, (person, t, weight, note, bmi, source)).lastrowid
+			_index_notes(self.conn, [(rowid, person, t, note)])
+			return True
+		self.conn.execute('UPDATE records SET weight=?, note=?, bmi=?, source=? WHERE person=? AND time=?', (weight, note, bmi, source, person, t))
+		_index_notes(self.conn, [(rowid, person, t, note) for rowid, *_ in old])
+		return False
+
+	def _apply_person(self, name, values):
+		fields = PERSON_FIELDS[1:]
+		row = [values.get(k) for k in fields]
+		if not self.conn.execute(f"UPDATE persons SET {', '.join(f'{k}=?' for k in fields)} WHERE name=?", (*row, name)).rowcount:
+			pos = self.conn.execute('SELECT IFNULL(MAX(pos), -1) + 1 FROM persons').fetchone()[0]
+			self.conn.execute(f'INSERT INTO persons VALUES({", ".join("?" * len(PERSON_FIELDS))}, ?)', (name, *row, pos))
+
+	def sync_peer(self, node):
+		"""对端的水位 (已从它取到的 seq, 已推给它的本机 seq)"""
+		row = self.conn.execute('SELECT pulled, pushed FROM sync_peers WHERE node=?', (node,)).fetchone()
+		return row or (0, 0)
+
+	def set_sync_peer(self, node, url=None, pulled=None, pushed=None):
+		"""更新对端的地址和水位，给 None 的项不动"""
+		with self.conn:
+			self._set_peer(node, url, pulled, pushed)
+
+	def _set_peer(self, node, url=None, pulled=None, pushed=None):
+		self.conn.execute('INSERT OR IGNORE INTO sync_peers(node) VALUES(?)', (node,))
+		self.conn.execute('UPDATE sync_peers SET url=IFNULL(?, url), pulled=IFNULL(?, pulled), pushed=IFNULL(?, pushed) WHERE node=?',
+			(url, pulled, pushed, node))
+
+	def data_version(self):
+		"""其他连接（进程）每提交一次就会变化，本连接自己的写入不算"""
+		return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+	def close(self):
+		if self.conn is None:
+			return
+		try:
+			if not self.readonly:
+				self.conn.execute('PRAGMA optimize') # 顺手更新统计信息
+		finally:
+			self.conn.close()
+			self.conn = None
@@ -0,0 +1,179 @@
+"""多台机器之间的增量同步：只交换对方水位之后的变更日志（见 store 的 changes 表）
+
+	python cli.py serve --host 0.0.0.0 --token 暗号       # 一台机器开服务
+	python cli.py sync http://192.168.1.5:8765 --token 暗号   # 其他机器同步过去
+
+协议是 gzip 压缩的 JSON over HTTP：
+	GET  /                         → {node, clock}
+	GET  /changes?since=&node=&limit= → {node, changes, upto}，changes 为 [clock, node, kind, key, data]
+	POST /changes {node, changes}  → {node, applied}
+node 为请求方的节点号：它产生的和从它那里收到的变更不再发给它。
+设了 token 的服务要求每个请求带 Authorization: Bearer <token>，否则回 401；
+不设 token 只能监听本机地址（局域网里谁都能连上来改库）。
+冲突按 (clock, node) 取最大的一条，两边各自合并结果相同。
+"""
+import gzip, hmac, json, socket, threading, ipaddress
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, urlencode, quote
+from urllib.request import Request, urlopen
+
+from store import RecordStore
+
+HOST, PORT = '127.0.0.1', 8765
+BATCH = 500 # 每次请求最多带多少条变更
+MAX_BATCH = 5000
+TIMEOUT = 30
+
+def encode(obj):
+	return gzip.compress(json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+def decode(body):
+	return json.loads(gzip.decompress(body))
+
+def bearer(token):
+	"""Authorization 头的值；头只能是 latin-1，暗号先做百分号编码"""
+	return f'Bearer {quote(token)}'
+
+# ---------------- 服务端 ----------------
+class SyncHandler(BaseHTTPRequestHandler):
+	def authorized(self):
+		"""检查暗号，不对就回 401"""
+		token = self.server.token
+		if token is None:
+			return True
+		got = self.headers.get('Authorization', '')
+		if hmac.compare_digest(got.encode('latin-1'), bearer(token).encode('latin-1')):
+			return True
+		self.send_error(401, 'Unauthorized', 'token 不对')
+		return False
+
+	def do_GET(self):
+		if not self.authorized():
+			return
+		url = urlsplit(self.path)
+		store = self.server.store
+		node, clock = store.node()
+		if url.path == '/':
+			self.reply({'node': node, 'clock': clock})
+		elif url.path == '/changes':
+			try:
+				q = parse_qs(url.query)
+				since = int(q['since'][0])
+				limit = min(int(q.get('limit', [BATCH])[0]), MAX_BATCH)
+			except (KeyError, ValueError) as e:
+				self.send_error(400, 'Bad Request', f'参数错误: {e}') # 状态行只能是 latin-1，中文放正文
+				return
+			changes, upto = store.changes(since, q.get('node', [None])[0], limit)
+			self.reply({'node': node, 'changes': changes, 'upto': upto})
+		else:
+			self.send_error(404)
+
+	def do_POST(self):
+		if not self.authorized():
+			return
+		if urlsplit(self.path).path != '/changes':
+			self.send_error(404)
+			return
+		store = self.server.store
+		try:
+			body = decode(self.rfile.read(int(self.headers['Content-Length'])))
+			applied = store.apply_changes(body['changes'], body['node'])
+		except (KeyError, TypeError, ValueError, OSError) as e: # OSError 含 gzip 解压失败
+			self.send_error(400, 'Bad Request', f'请求错误: {e}')
+			return
+		self.reply({'node': store.node()[0], 'applied': applied})
+
+	def reply(self, obj):
+		data = encode(obj)
+		self.send_response(200)
+		self.send_header('Content-Type', 'application/json; charset=utf-8')
+		self.send_header('Content-Encoding', 'gzip')
+		self.send_header('Content-Length', str(len(data)))
+		self.end_headers()
+		self.wfile.write(data)
+
+	def log_message(self, fmt, *args):
+		if self.server.verbose:
+			super().log_message(fmt, *args)
+
+def is_loopback(host):
+	"""host 是否只有本机能连（解析不了的一律当作不是）"""
+	try:
+		infos = socket.getaddrinfo(host, None)
+	except OSError:
+		return False
+	return all(ipaddress.ip_address(info[4][0].split('%')[0]).is_loopback for info in infos)
+
+class SyncServer(HTTPServer):
+	"""单线程服务：请求在 serve_forever 所在的线程里依次处理，共用这个线程里打开的一个连接"""
+
+	def __init__(self, db_path, host=HOST, port=PORT, verbose=False, token=None):
+		if not token and not is_loopback(host):
+			raise ValueError(f'监听 {host} 时其他机器也能连上来改库：请用 --token 或 config.json 的 sync_token 设一个暗号')
+		super().__init__((host, port), SyncHandler)
+		self.db_path = db_path
+		self.verbose = verbose
+		self.token = token or None
+		self.store = None
+
+	@property
+	def url(self):
+		host, port = self.server_address[:2]
+		return f'http://{host}:{port}'
+
+	def serve_forever(self, poll_interval=0.5):
+		with RecordStore(self.db_path) as self.store:
+			super().serve_forever(poll_interval)
+
+def start_server(db_path, host=HOST, port=0, token=None):
+	"""在后台线程里起服务（port=0 随便挑个空闲端口），测试和本机多开用；用完 shutdown() + server_close()"""
+	server = SyncServer(db_path, host, port, token=token)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server
+
+# ---------------- 客户端 ----------------
+def request(url, body=None, timeout=TIMEOUT, token=None):
+	"""GET（body 为 None）或 POST 一个 JSON，返回解析好的回复"""
+	headers = {'Accept-Encoding': 'gzip'}
+	if token:
+		headers['Authorization'] = bearer(token)
+	data = None
+	if body is not None:
+		data = encode(body)
+		headers.update({'Content-Type': 'application/json', 'Content-Encoding': 'gzip'})
+	with urlopen(Request(url, data, headers), timeout=timeout) as resp:
+		return decode(resp.read())
+
+def sync(store, url, batch=BATCH, timeout=TIMEOUT, token=None):
+	"""和 url 上的节点双向同步，返回 (拉来生效的条数, 推过去的条数)
+
+	先拉后推，每批拉来的变更和新水位在同一个事务里写入，中途断了下次从断处接着来。
+	token 为对方服务的暗号。
+	"""
+	url = url.rstrip('/')
+	me = store.node()[0]
+	peer = request(f'{url}/', timeout=timeout, token=token)['node']
+	if peer == me:
+		raise ValueError('对方和本机的节点号相同（库是整个复制过去的？）：在其中一边用 --new-node 换一个')
+	store.set_sync_peer(peer, url=url)
+	pulled, pushed = store.sync_peer(peer)
+
+	got = 0
+	while True:
+		reply = request(f'{url}/changes?' + urlencode({'since': pulled, 'node': me, 'limit': batch}), timeout=timeout, token=token)
+		got += store.apply_changes(reply['changes'], peer=peer, pulled=reply['upto'])
+		pulled = reply['upto']
+		if len(reply['changes']) < batch:
+			break
+
+	sent = 0
+	while True:
+		changes, upto = store.changes(pushed, exclude_node=peer, limit=batch)
+		if changes:
+			request(f'{url}/changes', {'node': me, 'changes': changes}, timeout, token)
+			sent += len(changes)
+		store.set_sync_peer(peer, pushed=upto)
+		pushed = upto
+		if len(changes) < batch:
+			break
+	return got, sent
@@ -0,0 +1,17 @@
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import RecordStore
+
+@pytest.fixture
+def store(tmp_path):
+	"""新建的空库，用完关闭"""
+	with RecordStore(str(tmp_path / 'slim.db')) as s:
+		yield s
+
+@pytest.fixture
+def person():
+	return dict(name='默认', height=175, sex='男', unit='kg', source='日常')
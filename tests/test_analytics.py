@@ -0,0 +1,104 @@
+import math, random
+
+import numpy as np
+import pytest
+
+from analytics import DAY, ROLLING_DAYS, Analysis, bmi_classes, ewma, rolling_mean
+from series import Series
+from utils import bmi_level
+
+def history(n=400, seed=1):
+	"""间隔不等（几分钟到几天）的 (time, weight)，时间严格递增"""
+	rng = random.Random(seed)
+	t, w, out = 1_700_000_000, 80.0, []
+	for _ in range(n):
+		t += rng.randint(300, 3 * DAY)
+		w += rng.uniform(-0.4, 0.3)
+		out.append((t, round(w, 2)))
+	return out
+
+def series(rows):
+	return Series.from_rows([(t, w, '', None) for t, w in rows])
+
+def naive_rolling(rows, days):
+	return [np.mean([w for t2, w in rows[:i + 1] if t2 >= t - days * DAY]) for i, (t, _) in enumerate(rows)]
+
+def naive_ewma(rows, halflife_days):
+	tau = halflife_days * DAY / math.log(2)
+	out = []
+	for i, (t, _) in enumerate(rows):
+		ws = [math.exp((t2 - t) / tau) for t2, _ in rows[:i + 1]]
+		out.append(sum(e * w for e, (_, w) in zip(ws, rows)) / sum(ws))
+	return out
+
+def test_bmi_classes_match_bmi_level():
+	bmis = [15.0, 18.4, 18.5, 22.0, 23.9, 24.0, 27.9, 28.0, 40.0, 17.4, 17.5, 23.0, 27.0]
+	for sex in ('男', '女'):
+		assert list(bmi_classes(bmis, sex)) == [bmi_level(b, sex) for b in bmis]
+
+def test_bmi_classes_gap_and_missing():
+	# 18.4 与 18.5 之间的空隙归入下面一档；缺失的记为未知
+	assert list(bmi_classes([18.45, math.nan], '男')) == ['偏瘦', '未知']
+
+def test_rolling_mean_matches_loop():
+	rows = history()
+	t, w = zip(*rows)
+	for days in ROLLING_DAYS:
+		assert rolling_mean(t, w, days) == pytest.approx(naive_rolling(rows, days))
+
+def test_ewma_matches_loop():
+	rows = history()
+	t, w = zip(*rows)
+	out, (num, den, last) = ewma(t, w, 7)
+	assert out == pytest.approx(naive_ewma(rows, 7))
+	assert num / den == pytest.approx(out[-1]) and last == t[-1]
+
+def test_ewma_long_span_does_not_overflow():
+	# 跨度远超 500τ 时分段换基准，不会出现 inf/nan
+	t = [0, 1000 * DAY, 2000 * DAY, 2000 * DAY + 1]
+	out, _ = ewma(t, [70.0, 80.0, 90.0, 100.0], halflife_days=1)
+	assert np.isfinite(out).all()
+	assert out[:3] == pytest.approx([70.0, 80.0, 90.0])
+
+def test_append_matches_full_recompute():
+	rows = history()
+	s = series(rows[:50])
+	a = Analysis(s)
+	for t, w in rows[50:]:
+		assert a.append(s.add(t, w, '', None))
+	full = Analysis(s)
+	for days in ROLLING_DAYS:
+		assert list(a.rolling[days]) == pytest.approx(list(full.rolling[days]))
+	assert list(a.trend) == pytest.approx(list(full.trend))
+	assert a.slope() == pytest.approx(full.slope())
+
+def test_append_out_of_order_is_refused():
+	rows = history(20)
+	s = series(rows)
+	a = Analysis(s)
+	assert not a.append(s.add(rows[5][0] + 1, 70.0, '', None))
+
+def test_append_from_empty():
+	s = Series()
+	a = Analysis(s)
+	for t, w in history(10):
+		assert a.append(s.add(t, w, '', None))
+	assert list(a.trend) == pytest.approx(list(Analysis(s).trend))
+
+def test_projection_on_a_straight_line():
+	# 每天正好减 0.1kg，末条 74.1kg，到 70kg 还要 41 天
+	rows = [(1_700_000_000 + i * DAY, 80 - 0.1 * i) for i in range(60)]
+	a = Analysis(series(rows))
+	b, _ = a.slope()
+	assert b == pytest.approx(-0.1)
+	t_now, w_now, eta = a.projection(70)
+	assert t_now == rows[-1][0] and w_now == pytest.approx(rows[-1][1])
+	assert (eta - t_now) / DAY == pytest.approx((w_now - 70) / 0.1, abs=1e-3)
+
+def test_projection_none_when_moving_away_or_too_far():
+	rows = [(1_700_000_000 + i * DAY, 80 - 0.1 * i) for i in range(60)]
+	a = Analysis(series(rows))
+	assert a.projection(90) is None # 在变轻，达不到更重的目标
+	assert a.projection(-1000) is None # 超过 MAX_ETA_DAYS
+	assert a.projection(None) is None
+	assert Analysis(series(rows[:1])).projection(70) is None # 一个点没有趋势
@@ -0,0 +1,35 @@
+import pytest
+
+import archive
+from series import Series
+
+def sample():
+	s = Series()
+	for i, (w, note) in enumerate([(70.0, '早起'), (69.95, ''), (71.2, '聚餐吃多了')]):
+		s.add(1700000000 + i * 3600, w, note, 22.9)
+	return s
+
+def test_round_trip(tmp_path):
+	path = str(tmp_path / 'a.slma')
+	s = sample()
+	archive.write(path, '默认', s, 7, 42)
+	got, name, version, last_id = archive.load(path, '默认', 175)
+	assert (name, version, last_id) == ('默认', 7, 42)
+	assert list(got.times) == list(s.times)
+	assert list(got.weights) == list(s.weights)
+	assert [got.note(i) for i in range(len(got))] == ['早起', '', '聚餐吃多了']
+
+def test_corruption_detected(tmp_path):
+	path = tmp_path / 'a.slma'
+	archive.write(str(path), '默认', sample(), 1, 1)
+	data = bytearray(path.read_bytes())
+	data[-8] ^= 0xff
+	path.write_bytes(bytes(data))
+	with pytest.raises(archive.ArchiveError):
+		archive.load(str(path))
+
+def test_wrong_person(tmp_path):
+	path = str(tmp_path / 'a.slma')
+	archive.write(path, '默认', sample(), 1, 1)
+	with pytest.raises(archive.ArchiveError):
+		archive.load(path, '小明')
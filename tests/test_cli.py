@@ -0,0 +1,50 @@
+import csv
+
+import pytest
+
+import cli
+
+@pytest.fixture
+def db(store, person):
+	store.save_person(person)
+	return store.path
+
+def run(db, capsys, *argv):
+	cli.main(['--db', db, *argv])
+	return capsys.readouterr().out
+
+def test_add(db, store, capsys):
+	out = run(db, capsys, 'add', '默认', '140', '--unit', '斤', '--time', '2024.01.02 08:00:00', '--note', '早起空腹')
+	assert out.startswith('默认 2024.01.02 08:00:00 70.0 kg BMI 22.86 正常')
+	assert store.fetch('默认') == [(cli.to_epoch('2024.01.02 08:00:00'), 70.0, '早起空腹', 22.86)]
+
+def test_add_unknown_person(db, capsys):
+	with pytest.raises(SystemExit) as e:
+		run(db, capsys, 'add', '没这人', '70')
+	assert '没有人物: 没这人' in str(e.value)
+
+def test_stats(db, store, capsys):
+	for day, w in ((1, 70.0), (2, 72.0), (3, 71.0)):
+		store.insert('默认', cli.to_epoch(f'2024.01.0{day} 08:00:00'), w, '', 22.9)
+	out = run(db, capsys, 'stats', '默认')
+	assert '默认 [全部] 3 条' in out
+	assert '最近 2024.01.03 08:00:00 71.0 kg' in out
+	assert '最轻 70.0  最重 72.0  平均 71.0 kg' in out
+	assert run(db, capsys, 'stats', '--scope', '7天') == '默认: 7天内无数据\n'
+
+def test_export_incremental(db, store, tmp_path, capsys):
+	path = str(tmp_path / 'out.csv')
+	store.insert('默认', cli.to_epoch('2024.01.01 08:00:00'), 70.0, '早起', 22.9)
+	assert run(db, capsys, 'export', path, '--incremental') == f'已导出 1 条到 {path}\n'
+	store.insert('默认', cli.to_epoch('2024.01.02 08:00:00'), 69.5, '', 22.7)
+	assert run(db, capsys, 'export', path, '--incremental') == f'已导出 1 条到 {path}\n'
+	with open(path, encoding='utf-8-sig', newline='') as f:
+		rows = list(csv.reader(f))
+	assert len(rows) == 3 and rows[1][0] == '默认' and rows[2][2] == '69.5'
+
+def test_import(db, store, tmp_path, capsys):
+	path = tmp_path / 'in.csv'
+	path.write_text('time,weight,note\n2024.01.01 08:00:00,70,早起\n2024.01.02 08:00:00,69.5,\n坏行,,\n', encoding='utf-8')
+	assert run(db, capsys, 'import', str(path)) == '读取 2 条，新增 2 条\n'
+	assert run(db, capsys, 'import', str(path)) == '读取 2 条，新增 0 条\n'
+	assert [(w, note) for _, w, note, _ in store.fetch('默认')] == [(70.0, '早起'), (69.5, '')]
@@ -0,0 +1,52 @@
+import math, random
+
+from series import lttb, downsample
+
+def wave(n, seed=0):
+	rng = random.Random(seed)
+	xs = [i / 24 for i in range(n)]
+	ys = [70 + 3 * math.sin(i / 200) + rng.uniform(-0.5, 0.5) for i in range(n)]
+	return xs, ys
+
+def test_short_window_is_untouched():
+	xs, ys = wave(50)
+	assert lttb(xs, ys, 10, 40, 100) == list(range(10, 40))
+	assert downsample(xs, ys, 10, 40, 30) == list(range(10, 40))
+
+def test_lttb_keeps_endpoints_and_order():
+	xs, ys = wave(5000)
+	idx = lttb(xs, ys, 100, 4100, 300)
+	assert len(idx) == 300
+	assert idx[0] == 100 and idx[-1] == 4099
+	assert idx == sorted(set(idx))
+
+def test_lttb_one_point_per_bucket():
+	xs, ys = wave(1000)
+	threshold = 50
+	idx = lttb(xs, ys, 0, 1000, threshold)
+	every = (1000 - 2) / (threshold - 2)
+	for i, j in enumerate(idx[1:-1]):
+		assert int(i * every) + 1 <= j < int((i + 1) * every) + 1
+
+def test_lttb_picks_spike():
+	xs, ys = wave(1000)
+	ys[500] = 200.0 # 面积最大的点一定被选中
+	assert 500 in lttb(xs, ys, 0, 1000, 40)
+
+def test_downsample_keeps_window_extremes():
+	xs, ys = wave(5000, seed=3)
+	lo, hi = 700, 4300
+	idx = downsample(xs, ys, lo, hi, 200)
+	window = ys[lo:hi]
+	assert idx[0] == lo and idx[-1] == hi - 1
+	assert min(ys[i] for i in idx) == min(window)
+	assert max(ys[i] for i in idx) == max(window)
+	assert all(lo <= i < hi for i in idx) and idx == sorted(set(idx))
+
+def test_downsample_extremes_of_each_window():
+	# 图上的时间窗口（比如逐月翻看）各自降采样，每个窗口自己的最高最低都在
+	xs, ys = wave(3000, seed=5)
+	for lo in range(0, 3000, 500):
+		idx = downsample(xs, ys, lo, lo + 500, 20)
+		seg = ys[lo:lo + 500]
+		assert {ys[i] for i in idx} >= {min(seg), max(seg)}
@@ -0,0 +1,33 @@
+import csv
+
+from exporter import export
+
+def rows(path):
+	with open(path, newline='', encoding='utf-8') as f:
+		return list(csv.reader(f))
+
+def test_incremental_appends_only_new_rows(store, person, tmp_path):
+	path = str(tmp_path / 'out.csv')
+	store.save_person(person)
+	store.insert_many([('默认', t, 70.0, '', 22.9, '') for t in (100, 200)])
+	assert export(store, path, incremental=True) == 2
+	assert export(store, path, incremental=True) == 0
+	store.insert('默认', 300, 69.0, '新的', 22.5)
+	assert export(store, path, incremental=True) == 1
+	out = rows(path)
+	assert out[0][0] == 'person' and [r[0] for r in out].count('person') == 1
+	assert [r[2] for r in out[1:]] == ['70.0', '70.0', '69.0']
+
+def test_full_export_rewrites(store, person, tmp_path):
+	path = str(tmp_path / 'out.csv')
+	store.save_person(person)
+	store.insert('默认', 100, 70.0, '', 22.9)
+	export(store, path)
+	assert export(store, path) == 1
+	assert len(rows(path)) == 2
+
+def test_targets_have_separate_marks(store, person, tmp_path):
+	store.save_person(person)
+	store.insert('默认', 100, 70.0, '', 22.9)
+	assert export(store, str(tmp_path / 'a.csv'), incremental=True) == 1
+	assert export(store, str(tmp_path / 'b.jsonl'), incremental=True) == 1
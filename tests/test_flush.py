@@ -0,0 +1,103 @@
+import main
+
+class Stub:
+	"""吞掉一切 Tk 控件调用"""
+	def __getattr__(self, name):
+		return lambda *a, **kw: None
+
+class Var:
+	def __init__(self, value):
+		self.value = value
+
+	def get(self):
+		return self.value
+
+class Renderer:
+	"""只数请求的假渲染线程"""
+	def __init__(self):
+		self.gen = 0
+		self.requests = []
+		self.calls = []
+
+	def request(self, person, scope, size, **kw):
+		self.gen += 1
+		self.requests.append((person['name'], scope, kw['overlays']))
+
+	def poll(self):
+		return []
+
+	def call(self, fn, *args):
+		self.calls.append(fn)
+
+class Loop:
+	"""手动推进的事件循环：after_idle / after 的回调排进队列，run() 一轮轮地跑"""
+	def __init__(self):
+		self.idle = []
+		self.timers = {}
+
+	def after_idle(self, fn, *args):
+		self.idle.append((fn, args))
+		return f'idle{len(self.idle)}'
+
+	def after(self, ms, fn, *args):
+		job = f'after{len(self.timers)}'
+		self.timers[job] = (fn, args)
+		return job
+
+	def after_cancel(self, job):
+		self.timers.pop(job, None)
+
+	def run_idle(self):
+		idle, self.idle = self.idle, []
+		for fn, args in idle:
+			fn(*args)
+
+def make_app(persons):
+	"""不建窗口的 App：只装上 invalidate / flush / request_frame 用到的属性"""
+	app = main.App.__new__(main.App)
+	loop = Loop()
+	app.after_idle, app.after, app.after_cancel = loop.after_idle, loop.after, loop.after_cancel
+	app.renderer = Renderer()
+	app.persons = persons
+	app.person = persons[0]
+	app.scope = '全部'
+	app.cfg = {}
+	app.dirty = set()
+	app.flush_job = app.save_job = app.poll_job = None
+	app.redraws = 0
+	app.frame_gen = 0
+	app.select_scope = False
+	app.show_compare = app.show_notes = False
+	app.chart_size = main.CHART_SIZE
+	app.cb_person = Var(persons[1]['name'])
+	app.lbl_unit = Stub()
+	app.time_btn = {s: Stub() for s in main.SCOPE_MONTHS}
+	app.overlay_vars = {name: Var(False) for name in main.OVERLAYS}
+	app.var_search = Var('')
+	return app, loop
+
+def test_one_frame_per_event_loop_turn(person):
+	app, loop = make_app([person, {**person, 'name': '乙'}])
+	# 同一轮事件里：换人物、换时间维度、勾上一条叠加线
+	app.switch_person()
+	app.switch_time_scope('1月')
+	app.overlay_vars['7日均线'].value = True
+	app.switch_overlays()
+	assert app.redraws == 0
+	loop.run_idle()
+	assert app.redraws == 1
+	assert app.renderer.requests == [('乙', '1月', ['7日均线'])]
+	assert app.cfg == {'time_scope': '1月', 'overlays': ['7日均线']}
+	# 设置改动推迟写盘，不会跟着每次重绘写一次
+	assert app.renderer.calls == []
+
+def test_next_turn_requests_again(person):
+	app, loop = make_app([person, {**person, 'name': '乙'}])
+	app.switch_time_scope('1月')
+	loop.run_idle()
+	loop.run_idle() # 没有新改动的空闲轮不要帧
+	app.switch_time_scope('3月')
+	app.switch_time_scope('全部')
+	loop.run_idle()
+	assert app.redraws == 2
+	assert [r[1] for r in app.renderer.requests] == ['1月', '全部']
@@ -0,0 +1,27 @@
+from importer import read_csv, import_file
+
+HEADER = 'person,time,weight,unit,note\n'
+
+def write(tmp_path, text):
+	path = tmp_path / 'in.csv'
+	path.write_text(text, encoding='utf-8')
+	return str(path)
+
+def test_truncated_rows_are_skipped(tmp_path):
+	path = write(tmp_path, HEADER + (
+		'默认,2024.01.01 08:00:00,70.5,kg,早起\n'
+		'默认,2024.01.02 08:00:00\n' # 截断：没有体重、单位
+		'默认\n'
+		'默认,2024.01.03 08:00:00,140,斤\n' # 没写备注
+		'默认,2024.01.04 08:00:00,70,stone,\n' # 不认识的单位
+		'默认,2024.01.05 08:00:00,abc,kg,\n'
+		'乙,2024.01.06 08:00:00,60,kg,晚饭后\n'
+	))
+	rows = list(read_csv(path, '默认'))
+	assert [(name, w, note) for name, _, w, note in rows] == [('默认', 70.5, '早起'), ('默认', 70.0, ''), ('乙', 60.0, '晚饭后')]
+
+def test_import_file_survives_truncated_row(tmp_path, store, person):
+	store.save_person(person)
+	path = write(tmp_path, HEADER + '默认,2024.01.01 08:00:00,70,kg,\n默认,2024.01.02 08:00:00\n默认,2024.01.03 08:00:00,69,kg,\n')
+	assert import_file(store, path, '默认', {'默认': 175}) == (2, 2)
+	assert [w for _, w, _, _ in store.fetch('默认')] == [70.0, 69.0]
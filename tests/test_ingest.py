@@ -0,0 +1,80 @@
+import json, time
+
+import pytest
+
+from ingest import IngestServer
+from store import RecordStore
+
+@pytest.fixture
+def server(tmp_path, person):
+	db = str(tmp_path / 'slim.db')
+	srv = IngestServer(db, unix=str(tmp_path / 'ingest.sock'))
+	with RecordStore(db) as srv.store:
+		srv.store.save_person(person)
+		srv.load_persons()
+		yield srv
+	for sock in srv.socks:
+		sock.close()
+
+def send(srv, **msg):
+	srv.receive(json.dumps(msg, ensure_ascii=False).encode('utf-8'))
+
+def test_dedupe_by_source_id(server):
+	now = int(time.time())
+	send(server, person='默认', weight=70.0, time=now, source='秤', id='1')
+	send(server, person='默认', weight=70.0, time=now, source='秤', id='1')
+	send(server, person='默认', weight=70.1, time=now + 1, source='秤', id='2')
+	server.flush()
+	st = server.stats['秤']
+	assert (st.received, st.duplicate, st.written) == (3, 1, 2)
+	assert len(server.store.fetch('默认')) == 2
+
+def test_skip_rows_already_in_db(server):
+	now = int(time.time())
+	server.store.insert('默认', now, 70.0, '', 22.9)
+	send(server, person='默认', weight=70.0, time=now)
+	server.flush()
+	assert server.db_skipped == 1
+	assert len(server.store.fetch('默认')) == 1
+
+def test_invalid_readings(server):
+	send(server, person='默认', weight=-1)
+	send(server, person='没这人', weight=70)
+	server.receive(b'not json')
+	server.flush()
+	assert sum(st.invalid for st in server.stats.values()) == 3
+	assert server.store.fetch('默认') == []
+
+def test_default_source_from_profile(server):
+	send(server, person='默认', weight=70.0)
+	server.flush()
+	assert server.store.conn.execute('SELECT source FROM records').fetchall() == [('日常',)]
+
+def test_row_written_elsewhere_before_flush(server):
+	# 收到之后、提交之前另一个连接写了同人同一秒：由写事务里的查重跳过
+	now = int(time.time())
+	send(server, person='默认', weight=70.0, time=now, source='秤')
+	send(server, person='默认', weight=70.1, time=now + 1, source='秤')
+	with RecordStore(server.db_path) as other:
+		other.insert('默认', now, 69.0, '', 22.5)
+	server.flush()
+	assert (server.stats['秤'].written, server.db_skipped) == (1, 1)
+	assert [w for _, w, _, _ in server.store.fetch('默认')] == [69.0, 70.1]
+
+def test_locked_db_backs_off(server):
+	server.store.conn.execute('PRAGMA busy_timeout=10')
+	send(server, person='默认', weight=70.0, time=int(time.time()))
+	with RecordStore(server.db_path) as other:
+		other.conn.execute('BEGIN IMMEDIATE') # 别的进程占着写锁
+		server.flush()
+		assert server.failures == 1 and len(server.pending) == 1
+		first = server.retry_at - time.monotonic()
+		assert 0 < first <= server.latency
+		assert server.due() >= server.retry_at # 最早那条早就等满了，也要等到重试时刻
+		server.flush()
+		assert server.retry_at - time.monotonic() > first # 再失败就翻倍
+		other.conn.rollback()
+	server.flush()
+	assert server.commits == 1 and server.pending == [] and server.retry_at == 0
+	assert server.stats['日常'].written == 1
+	assert len(server.store.fetch('默认')) == 1
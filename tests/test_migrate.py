@@ -0,0 +1,53 @@
+import sqlite3
+
+from store import RecordStore, SCHEMA_VERSION, MIGRATIONS, to_epoch
+
+def legacy_db(path, rows):
+	"""按最初的表结构建一个 v1 的库，time 为文本"""
+	conn = sqlite3.connect(path)
+	MIGRATIONS[0](conn)
+	conn.executemany('INSERT INTO records(person, time, weight, note, bmi) VALUES(?,?,?,?,?)', rows)
+	conn.execute('PRAGMA user_version=1')
+	conn.commit()
+	conn.close()
+
+def test_fresh_db_at_latest_version(tmp_path):
+	with RecordStore(str(tmp_path / 'new.db')) as s:
+		assert s.conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+		assert s.fetch('默认') == []
+
+def test_upgrade_v1_to_latest(tmp_path):
+	path = str(tmp_path / 'old.db')
+	legacy_db(path, [
+		('默认', '2024.01.02 08:00:00', 70.0, '早起', 22.9),
+		('默认', '2024-01-03 08:00:00', 69.5, '', 22.7),
+		('小明', '2024.01.02', 60.0, None, 20.0),
+	])
+	with RecordStore(path) as s:
+		assert s.conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+		assert s.fetch('默认') == [
+			(to_epoch('2024.01.02 08:00:00'), 70.0, '早起', 22.9),
+			(to_epoch('2024.01.03 08:00:00'), 69.5, '', 22.7),
+		]
+		# v4 汇总表、v6 备注索引、v8 变更日志、v9 数据源都要覆盖到旧数据
+		assert [r[1] for r in s.rollups('默认', 'day')] == [1, 1]
+		assert s.search_notes('默认', '早起') == [to_epoch('2024.01.02 08:00:00')]
+		assert s.conn.execute("SELECT COUNT(*) FROM changes WHERE kind='record' AND clock=1").fetchone()[0] == 3
+		assert s.conn.execute('SELECT DISTINCT source FROM records').fetchall() == [('',)]
+
+def test_upgrade_is_idempotent(tmp_path):
+	path = str(tmp_path / 'old.db')
+	legacy_db(path, [('默认', '2024.01.02 08:00:00', 70.0, '', 22.9)])
+	RecordStore(path).close()
+	with RecordStore(path) as s:
+		assert len(s.fetch('默认')) == 1
+
+def test_unparsable_time_is_quarantined(tmp_path):
+	path = str(tmp_path / 'old.db')
+	legacy_db(path, [
+		('默认', '2024.01.02 08:00:00', 70.0, '', 22.9),
+		('默认', '昨天早上', 71.0, '', 23.2),
+	])
+	with RecordStore(path) as s:
+		assert len(s.fetch('默认')) == 1
+		assert s.conn.execute('SELECT person, time, weight FROM bad_records').fetchall() == [('默认', '昨天早上', 71.0)]
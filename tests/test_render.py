@@ -0,0 +1,75 @@
+import time, logging, warnings
+
+import pytest
+
+from render import ChartRenderer, Frame, FrameCache
+from series import Series
+
+class Image:
+	def __init__(self, w, h):
+		self.size = (w, h)
+
+def frame(name, w=10, h=10, series=None):
+	return Frame(0, {'name': name, 'sex': '男'}, '全部', ['全部'], Image(w, h), series)
+
+def test_frame_cache_evicts_least_recently_used():
+	cache = FrameCache(max_bytes=3 * 400) # 每帧 10×10×4 = 400 字节
+	for k in 'abc':
+		cache.put(((k,), k), frame(k))
+	assert cache.nbytes == 1200
+	cache.get((('a',), 'a')) # a 刚用过，最久没用的是 b
+	cache.put((('d',), 'd'), frame('d'))
+	assert cache.get((('b',), 'b')) is None
+	assert all(cache.get(((k,), k)) for k in 'acd')
+	assert cache.nbytes == 1200
+
+def test_frame_cache_counts_series_and_replaces():
+	cache = FrameCache(max_bytes=10_000)
+	s = Series.from_rows([(100, 70.0, '早起', 22.9)])
+	cache.put((('a',), 1), frame('a', series=s))
+	assert cache.nbytes == 400 + s.nbytes()
+	cache.put((('a',), 1), frame('a')) # 同键覆盖不重复计数
+	assert cache.nbytes == 400
+
+def test_frame_cache_keeps_one_oversized_frame():
+	cache = FrameCache(max_bytes=100)
+	cache.put((('a',), 1), frame('a'))
+	assert cache.get((('a',), 1)) is not None
+
+def test_frame_cache_drop_person():
+	cache = FrameCache()
+	cache.put((('a',), 1), frame('a'))
+	cache.put((('a',), 2), frame('a'))
+	cache.put((('a', 'b'), 3), frame('a')) # 含 a 的对比图
+	cache.put((('b',), 4), frame('b'))
+	cache.drop('a')
+	assert [cache.get(k) is None for k in ((('a',), 1), (('a',), 2), (('a', 'b'), 3), (('b',), 4))] == [True, True, True, False]
+	assert cache.nbytes == 400
+
+@pytest.fixture
+def renderer(store, person):
+	logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+	warnings.filterwarnings('ignore')
+	store.save_person(person)
+	store.insert('默认', int(time.time()) - 3600, 75.0, '', 23.5)
+	r = ChartRenderer(store.path, archive_dir=None)
+	yield r
+	r.close()
+
+def wait(r, gen):
+	deadline = time.time() + 30
+	while time.time() < deadline:
+		for g, f in r.poll():
+			if isinstance(f, Exception):
+				raise f
+			if g == gen:
+				return f
+		time.sleep(0.01)
+	raise TimeoutError
+
+def test_profile_edit_is_not_served_from_cache(renderer, person):
+	f = wait(renderer, renderer.request(person, '全部', (400, 240)))
+	assert list(f.levels) == ['正常']
+	assert wait(renderer, renderer.request(person, '全部', (400, 240))).image is f.image # 同一份资料命中缓存
+	f = wait(renderer, renderer.request({**person, 'sex': '女'}, '全部', (400, 240)))
+	assert f.person['sex'] == '女' and list(f.levels) == ['超重']
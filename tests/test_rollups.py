@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+DAY = 86400
+START = 1_704_067_200 # 2024-01-01 00:00 UTC
+
+def dump(store):
+	return store.conn.execute('SELECT * FROM rollups ORDER BY person, grain, bucket').fetchall()
+
+def assert_matches_rebuild(store):
+	"""触发器增量维护的结果应与整体重建的一样（w_sum 累加顺序不同，按近似比较）"""
+	live = dump(store)
+	store.rebuild_rollups()
+	rebuilt = dump(store)
+	same(live, rebuilt)
+	return rebuilt
+
+def same(rows, expected):
+	assert len(rows) == len(expected)
+	for a, b in zip(rows, expected):
+		assert a[:3] == b[:3] and a[3:] == pytest.approx(b[3:])
+
+@pytest.fixture
+def filled(store, person):
+	rng = random.Random(7)
+	store.save_person(person)
+	store.save_person({**person, 'name': '乙'})
+	rows = [(p, START + rng.randint(0, 120 * DAY), round(rng.uniform(55, 85), 2), '', 22.0, '') for p in ('默认', '乙') for _ in range(300)]
+	store.insert_many(rows)
+	return store
+
+def test_insert(filled):
+	rows = assert_matches_rebuild(filled)
+	assert {r[1] for r in rows} == {'day', 'week', 'month'}
+	n = {g: sum(r[3] for r in rows if r[0] == '默认' and r[1] == g) for g in ('day', 'week', 'month')}
+	assert n == {'day': 300, 'week': 300, 'month': 300}
+
+def test_insert_out_of_order(filled):
+	# 补录到已有桶的中间、首条之前、末条之后
+	for t in (START + 10 * DAY + 7, START - 40 * DAY, START + 200 * DAY):
+		filled.insert('默认', t, 90.0, '', 25.0)
+	assert_matches_rebuild(filled)
+
+def test_update(filled):
+	with filled.conn:
+		filled.conn.execute('UPDATE records SET weight = weight + 3 WHERE person=? AND id % 5 = 0', ('默认',))
+		filled.conn.execute('UPDATE records SET time = time + 9 * 86400 WHERE person=? AND id % 7 = 0', ('默认',))
+	assert_matches_rebuild(filled)
+
+def test_delete(filled):
+	with filled.conn:
+		filled.conn.execute('DELETE FROM records WHERE person=? AND id % 3 = 0', ('默认',))
+	assert_matches_rebuild(filled)
+	with filled.conn: # 删空整个桶、整个人
+		filled.conn.execute('DELETE FROM records WHERE person=?', ('乙',))
+	rows = assert_matches_rebuild(filled)
+	assert {r[0] for r in rows} == {'默认'}
+
+def test_rename(filled, person):
+	before = [r[1:] for r in dump(filled) if r[0] == '默认']
+	filled.save_person({**person, 'name': '甲'}, old_name='默认')
+	rows = assert_matches_rebuild(filled)
+	assert {r[0] for r in rows} == {'甲', '乙'}
+	same([r[1:] for r in rows if r[0] == '甲'], before)
+
+def test_rollups_query(filled):
+	# 读出来的平均值、首末时间与原始记录一致
+	recs = filled.fetch('默认')
+	for bucket, n, w_min, w_max, w_avg, first_t, last_t in filled.rollups('默认', 'month'):
+		inside = [r for r in recs if first_t <= r[0] <= last_t]
+		assert len(inside) == n
+		ws = [r[1] for r in inside]
+		assert (w_min, w_max) == (min(ws), max(ws))
+		assert w_avg == pytest.approx(sum(ws) / n)
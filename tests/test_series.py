@@ -0,0 +1,54 @@
+import math
+
+from series import Series
+
+def rows():
+	return [(100, 70.0, '早起', 22.9), (200, 71.0, '', None), (300, 72.0, '晚饭后', 23.5)]
+
+def columns(s):
+	return list(s.times), list(s.weights), [s.note(i) for i in range(len(s))], [s.bmi(i) for i in range(len(s))]
+
+def test_from_rows():
+	s = Series.from_rows(rows())
+	assert len(s) == 3 and s.span() == (100, 300)
+	assert columns(s) == ([100, 200, 300], [70.0, 71.0, 72.0], ['早起', '', '晚饭后'], [22.9, None, 23.5])
+
+def test_add_appends_at_end():
+	s = Series.from_rows(rows())
+	assert s.add(300, 73.0, '又称一次', None) == 3 # 同一秒也算追加
+	assert s.note(3) == '又称一次' and s.note(2) == '晚饭后'
+
+def test_add_out_of_order_shifts_notes():
+	s = Series.from_rows(rows())
+	s.xs()
+	assert s.add(150, 69.5, '补录', 22.7) == 1
+	assert s.add(50, 68.0, '', None) == 0
+	assert columns(s) == (
+		[50, 100, 150, 200, 300],
+		[68.0, 70.0, 69.5, 71.0, 72.0],
+		['', '早起', '补录', '', '晚饭后'],
+		[None, 22.9, 22.7, None, 23.5],
+	)
+	# 缓存的日期数跟着插入
+	assert list(s.xs()) == list(Series.from_rows(zip(s.times, s.weights, [''] * 5, [None] * 5)).xs())
+	assert s.note_offs[-1] == len(s.note_heap)
+
+def test_slice_is_independent():
+	s = Series.from_rows(rows())
+	s.add(150, 69.5, '补录', None)
+	part = s.slice(1, 4) # 从有备注的点之后切，偏移要从 0 重新算
+	assert columns(part) == ([150, 200, 300], [69.5, 71.0, 72.0], ['补录', '', '晚饭后'], [None, None, 23.5])
+	assert part.note_offs[0] == 0 and part.note_offs[-1] == len(part.note_heap)
+	s.add(120, 1.0, '之后改的', None)
+	assert columns(part)[2] == ['补录', '', '晚饭后']
+
+def test_window():
+	s = Series.from_rows(rows())
+	assert s.window(150) == (1, 3)
+	assert s.window(100, 200) == (0, 2)
+	assert s.window(400) == (3, 3)
+
+def test_nbytes_counts_notes():
+	s = Series.from_rows(rows())
+	assert s.nbytes() == 3 * 8 * 3 + 4 * 4 + len('早起晚饭后'.encode('utf-8'))
+	assert math.isnan(s.bmis[1])
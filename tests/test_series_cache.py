@@ -0,0 +1,63 @@
+import pytest
+
+from series import SeriesCache, MERGE_MAX
+from store import RecordStore
+
+@pytest.fixture
+def other(store):
+	"""同一个库上的另一个连接，当作别的进程"""
+	with RecordStore(store.path) as s:
+		yield s
+
+@pytest.fixture
+def cache(store, person):
+	store.save_person(person)
+	store.insert('默认', 100, 70.0, '', 22.9)
+	store.insert('默认', 300, 71.0, '', 23.2)
+	return SeriesCache(store)
+
+def test_merges_rows_from_another_writer(cache, other):
+	s = cache.get('默认')
+	other.insert('默认', 200, 70.5, '补录', 23.0)
+	other.insert('默认', 400, 71.5, '', 23.3)
+	assert cache.check() == {'默认'}
+	assert cache.get('默认') is s # 并进原来的序列，没有整段重读
+	assert list(s.times) == [100, 200, 300, 400] and s.note(1) == '补录'
+	assert cache.check() == set() # data_version 没变就什么都不做
+
+def test_own_writes_are_not_merged_twice(cache, store):
+	s = cache.get('默认')
+	rowid = store.insert('默认', 500, 72.0, '', 23.5)
+	cache.add('默认', 500, 72.0, '', 23.5, rowid)
+	cache.check()
+	assert cache.get('默认') is s and list(s.times) == [100, 300, 500]
+
+def test_update_elsewhere_invalidates(cache, other):
+	s = cache.get('默认')
+	with other.conn:
+		other.conn.execute('UPDATE records SET weight=69.0 WHERE time=100')
+	assert cache.check() == {'默认'}
+	fresh = cache.get('默认')
+	assert fresh is not s and list(fresh.weights) == [69.0, 71.0]
+
+def test_delete_elsewhere_invalidates(cache, other):
+	s = cache.get('默认')
+	with other.conn:
+		other.conn.execute('DELETE FROM records WHERE time=300')
+	other.insert('默认', 400, 71.5, '', 23.3) # 高水位之后有新行，但版本号对不上
+	cache.check()
+	fresh = cache.get('默认')
+	assert fresh is not s and list(fresh.times) == [100, 400]
+
+def test_bulk_insert_elsewhere_reloads(cache, other):
+	s = cache.get('默认')
+	other.insert_many([('默认', 1000 + i, 70.0, '', 22.9, '') for i in range(MERGE_MAX + 1)])
+	cache.check()
+	fresh = cache.get('默认')
+	assert fresh is not s and len(fresh) == MERGE_MAX + 3
+
+def test_uncached_person_is_only_reported(cache, other, person):
+	other.save_person({**person, 'name': '乙'})
+	other.insert('乙', 100, 60.0, '', 20.0)
+	assert cache.check() == {'乙'}
+	assert list(cache.get('乙').times) == [100]
@@ -0,0 +1,57 @@
+import pytest
+
+from importer import import_records
+
+def test_insert_many_counts_only_new_rows(store, person):
+	store.save_person(person)
+	rows = [('默认', t, 70.0, '备注' if t % 2 else '', 22.9, '') for t in range(100, 110)]
+	# 汇总表、版本号、变更日志的触发器也在写，返回值只算 records 本身
+	assert store.insert_many(rows) == 10
+	assert store.insert_many(rows) == 0
+	assert store.insert_many(rows[:3] + [('默认', 200, 69.0, '', 22.5, '')]) == 1
+	assert len(store.fetch('默认')) == 11
+
+def test_insert_many_skips_duplicates_within_batch(store, person):
+	store.save_person(person)
+	assert store.insert_many([('默认', 100, 70.0, '', 22.9, ''), ('默认', 100, 71.0, '', 23.2, '')]) == 1
+
+def test_import_records_counts(store, person):
+	store.save_person(person)
+	rows = [('默认', t, 70.0, '') for t in range(100, 105)] + [('没这人', 100, 60.0, '')]
+	assert import_records(store, rows, {'默认': 175}, batch=2) == (6, 5)
+	assert import_records(store, rows, {'默认': 175}, batch=2) == (6, 0)
+
+def test_rename_onto_orphan_records_is_refused(store, person):
+	store.save_person(person)
+	store.save_person({**person, 'name': '旧'})
+	store.insert('旧', 100, 60.0, '早起', 20.0)
+	store.delete_person('旧')
+	with pytest.raises(ValueError):
+		store.save_person({**person, 'name': '旧'}, old_name='默认')
+	assert [p['name'] for p in store.persons()] == ['默认']
+	assert store.fetch('旧') == [(100, 60.0, '早起', 20.0)]
+
+def test_rename_moves_records(store, person):
+	store.save_person(person)
+	store.insert('默认', 100, 70.0, '', 22.9)
+	store.save_person({**person, 'name': '新'}, old_name='默认')
+	assert [p['name'] for p in store.persons()] == ['新']
+	assert len(store.fetch('新')) == 1 and store.fetch('默认') == []
+
+def test_readonly_store(tmp_path, person):
+	import sqlite3
+	from store import RecordStore
+	path = str(tmp_path / 'slim.db')
+	with RecordStore(path) as s:
+		s.save_person(person)
+		s.insert('默认', 100, 70.0, '', 22.9)
+		with RecordStore(path, readonly=True) as ro:
+			assert ro.fetch('默认') == [(100, 70.0, '', 22.9)]
+			with pytest.raises(sqlite3.OperationalError):
+				ro.insert('默认', 200, 69.0, '', 22.5)
+
+def test_insert_many_by_source(store, person):
+	store.save_person(person)
+	store.insert('默认', 100, 70.0, '', 22.9, '秤')
+	rows = [('默认', t, 70.0, '', 22.9, '秤' if t % 2 else '手机') for t in range(100, 105)]
+	assert store.insert_many(rows, by_source=True) == {'秤': 2, '手机': 2} # 100 那一秒已有
@@ -0,0 +1,146 @@
+import json
+
+import pytest
+
+from store import RecordStore, SQL_LATEST_CHANGE
+
+@pytest.fixture
+def pair(tmp_path):
+	with RecordStore(str(tmp_path / 'a.db')) as a, RecordStore(str(tmp_path / 'b.db')) as b:
+		yield a, b
+
+def pull(dst, src):
+	"""dst 从 src 拉取，与 sync.sync 的拉取一步相同；返回生效的条数"""
+	peer = src.node()[0]
+	pulled, _ = dst.sync_peer(peer)
+	changes, upto = src.changes(pulled, exclude_node=dst.node()[0])
+	return dst.apply_changes(changes, peer, pulled=upto)
+
+def sync(a, b):
+	pull(a, b)
+	pull(b, a)
+
+def contents(s):
+	persons = {p['name']: p for p in s.persons()}
+	return persons, {name: s.fetch(name) for name in persons}
+
+def test_nodes_differ(pair):
+	a, b = pair
+	assert a.node()[0] != b.node()[0]
+
+def test_converge(pair, person):
+	a, b = pair
+	a.save_person(person)
+	a.insert('默认', 100, 70.0, '早起', 22.9)
+	sync(a, b)
+	b.insert('默认', 200, 69.0, '', 22.5)
+	sync(a, b)
+	assert contents(a) == contents(b)
+	assert [r[0] for r in b.fetch('默认')] == [100, 200]
+
+def test_last_writer_wins(pair, person):
+	a, b = pair
+	a.save_person(person)
+	a.insert('默认', 100, 70.0, '', 22.9)
+	sync(a, b)
+	# 两边都改了同一条，(clock, node) 大的一方胜出
+	a.conn.execute('UPDATE records SET weight=71 WHERE time=100')
+	a.conn.commit()
+	b.conn.execute('UPDATE records SET weight=72 WHERE time=100')
+	b.conn.commit()
+	key = json.dumps(['默认', 100], ensure_ascii=False, separators=(',', ':'))
+	latest = {s.conn.execute(SQL_LATEST_CHANGE, ('record', key)).fetchone(): w for s, w in ((a, 71), (b, 72))}
+	sync(a, b)
+	assert a.fetch('默认') == b.fetch('默认')
+	assert a.fetch('默认')[0][1] == latest[max(latest)]
+
+def test_later_edit_wins(pair, person):
+	a, b = pair
+	a.save_person(person)
+	a.insert('默认', 100, 70.0, '', 22.9)
+	sync(a, b)
+	a.conn.execute('UPDATE records SET weight=71 WHERE time=100')
+	a.conn.commit()
+	sync(a, b)
+	# b 已经见过 a 的改动，之后的改动时钟更大
+	b.conn.execute('UPDATE records SET weight=72 WHERE time=100')
+	b.conn.commit()
+	sync(a, b)
+	assert a.fetch('默认')[0][1] == b.fetch('默认')[0][1] == 72
+
+def test_delete_propagates(pair, person):
+	a, b = pair
+	a.save_person(person)
+	a.insert('默认', 100, 70.0, '', 22.9)
+	sync(a, b)
+	b.conn.execute('DELETE FROM records WHERE time=100')
+	b.conn.commit()
+	sync(a, b)
+	assert a.fetch('默认') == b.fetch('默认') == []
+
+def test_apply_is_idempotent(pair, person):
+	a, b = pair
+	a.save_person(person)
+	a.insert_many([('默认', t, 70.0 + t / 1000, '', 22.9, '') for t in range(100, 110)])
+	changes, _ = a.changes(0, exclude_node=b.node()[0])
+	peer = a.node()[0]
+	assert b.apply_changes(changes, peer) == len(changes)
+	before = contents(b)
+	assert b.apply_changes(changes, peer) == 0
+	assert contents(b) == before
+
+def test_no_echo_to_origin(pair, person):
+	a, b = pair
+	a.save_person(person)
+	a.insert('默认', 100, 70.0, '', 22.9)
+	pull(b, a)
+	changes, _ = b.changes(0, exclude_node=a.node()[0])
+	assert changes == []
+
+def test_change_data_is_json(pair, person):
+	a, _ = pair
+	a.save_person(person)
+	a.insert('默认', 100, 70.0, '早起', 22.9, '体重秤')
+	changes, _ = a.changes(0)
+	data = [json.loads(c[4]) for c in changes if c[2] == 'record']
+	assert data == [{'weight': 70.0, 'note': '早起', 'bmi': 22.9, 'source': '体重秤'}]
+
+def test_changes_without_peer_include_local_and_received(pair, person):
+	a, b = pair
+	a.save_person(person)
+	pull(b, a)
+	b.insert('默认', 100, 70.0, '', 22.9)
+	kinds = [c[2] for c in b.changes(0)[0]]
+	assert kinds == ['person', 'record']
+
+@pytest.fixture
+def server(tmp_path):
+	from sync import start_server
+	s = start_server(str(tmp_path / 'b.db'), token='暗号')
+	yield s
+	s.shutdown()
+	s.server_close()
+
+def test_http_sync_with_token(pair, person, server):
+	import sync as sync_mod
+	a, b = pair
+	a.save_person(person)
+	a.insert('默认', 100, 70.0, '', 22.9)
+	assert sync_mod.sync(a, server.url, token='暗号') == (0, 2)
+	assert contents(a) == contents(b)
+
+def test_http_rejects_wrong_token(pair, person, server):
+	from urllib.error import HTTPError
+	import sync as sync_mod
+	a, b = pair
+	a.save_person(person)
+	for token in (None, '不对'):
+		with pytest.raises(HTTPError) as e:
+			sync_mod.sync(a, server.url, token=token)
+		assert e.value.code == 401
+	assert b.persons() == []
+
+def test_lan_bind_needs_token(tmp_path):
+	from sync import SyncServer
+	with pytest.raises(ValueError):
+		SyncServer(str(tmp_path / 'a.db'), '0.0.0.0', 0)
@@ -0,0 +1,109 @@
+import os, sys, json, datetime
+
+# ---------------- 路径 ----------------
+# 兼容 PyInstaller 与常规运行
+if getattr(sys, 'frozen', False):
+	# 打包后的可执行文件目录
+	BASE_DIR = os.path.dirname(sys.executable)
+else:
+	# 源码运行时脚本所在目录
+	BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(BASE_DIR, 'config.json')
+DB_PATH = os.path.join(BASE_DIR, 'slim.db')
+
+# ---------------- 配置 ----------------
+# config.json 只存界面设置（时间维度、叠加线等）；人物资料在库里，见 RecordStore.persons()
+SAVE_DELAY_MS = 1500 # 界面设置改动后静默这么久才写盘，连点按钮只写一次
+WATCH_MS = 1000 # 隔多久看一次其他进程有没有写过库，没写过只是一条 PRAGMA
+
+def load_cfg():
+	if not os.path.exists(CONFIG_PATH):
+		return {}
+	with open(CONFIG_PATH, encoding='utf-8') as f:
+		return json.load(f)
+
+def save_cfg(cfg):
+	"""先写临时文件再改名替换，写到一半断电也不会留下半个 config.json"""
+	tmp = f'{CONFIG_PATH}.tmp'
+	with open(tmp, 'w', encoding='utf-8') as f:
+		json.dump(cfg, f, ensure_ascii=False, indent=2)
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(tmp, CONFIG_PATH)
+
+def load_persons(store):
+	"""库里的人物；库里还没有而旧版 config.json 里有的，搬进库里并从配置里去掉（只搬一次）"""
+	persons = store.persons()
+	if persons:
+		return persons
+	cfg = load_cfg()
+	if not cfg.get('persons'):
+		return persons
+	for p in cfg.pop('persons'):
+		try:
+			store.save_person(p)
+		except ValueError: # 旧配置没查重，同名的只留第一个
+			pass
+	save_cfg(cfg)
+	return store.persons()
+
+# ---------------- 时间维度 ----------------
+# 时间维度 → 往前推的月数，0 表示全部
+SCOPE_MONTHS = {'7天': 0.25, '15天': 0.5, '1月': 1, '3月': 3, '半年': 6, '1年': 12, '3年': 12*3, '5年': 12*5, '全部': 0}
+ROLLUP_SCOPES = ('1年', '3年', '5年', '全部') # 这些维度点数多时画日/周/月汇总，不画原始点
+# 数据跨度达到这么多天才显示对应的维度，“全部”总是有
+SCOPE_MIN_DAYS = {'7天': 0, '15天': 7, '1月': 15, '3月': 30, '半年': 90, '1年': 365, '3年': 365*3, '5年': 365*5, '全部': 0}
+
+def available_scopes(span):
+	"""span 为 (最早, 最晚) epoch 秒，返回按按钮顺序排列的可用维度；没有数据时只有“全部”"""
+	if not span:
+		return ['全部']
+	days = (span[1] - span[0]) // 86400
+	return [s for s, d in SCOPE_MIN_DAYS.items() if days >= d]
+
+# ---------------- 图表 ----------------
+CHART_SIZE = (500, 280) # 画布还没布局好时的默认像素尺寸
+COMPARE_METRICS = ('体重', 'BMI', '变化%') # 对比模式的纵轴：体重（当前人物的单位）、BMI、相对窗口内首条的变化
+OVERLAYS = ('7日均线', '30日均线', '趋势', '目标预测') # 单人图上可叠加的分析线，见 analytics
+
+# 划时间区间 当前时间 - 时间维度
+def subtract_months(date, months):
+	if months == 0:
+		return date.replace(year=1900, month=1, day=1)  # 全部：远早起点
+	elif months < 1:
+		days = int(months * 30.44)  # 平均每月天数
+		return date - datetime.timedelta(days=days)
+	else:
+		month = date.month - months
+		year = date.year
+		while month <= 0:
+			month += 12
+			year -= 1
+		return date.replace(year=year, month=month, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+# ---------------- BMI 评价 ----------------
+BMI_MALE = [(0, 18.4, '偏瘦'), (18.5, 23.9, '正常'), (24, 27.9, '超重'), (28, 999, '肥胖')]
+BMI_FEMALE = [(0, 17.4, '偏瘦'), (17.5, 22.9, '正常'), (23, 26.9, '超重'), (27, 999, '肥胖')]
+
+def bmi_level(bmi, sex):
+	tbl = BMI_MALE if sex == '男' else BMI_FEMALE
+	for low, high, level in tbl:
+		if low <= bmi <= high:
+			return level
+	return '未知'
+
+def calc_bmi(weight: float, height: float) -> float:
+	"""计算 BMI，保留 2 位小数"""
+	if height <= 0:
+		return 0.0
+	return round(weight / ((height / 100) ** 2), 2)
+
+# ---------------- 单位换算 ----------------
+UNIT2KG = {'kg': 1, '公斤': 1, '斤': 0.5, 'lb': 0.453592}
+KG2UNIT = {k: 1/v for k, v in UNIT2KG.items()}
+
+def to_kg(val, unit): # 用户输入 → kg
+	return val * UNIT2KG[unit]
+
+def to_show_unit(val, unit): # kg → 用户单位
+	return round(val * KG2UNIT[unit], 2)